@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+
+# Copyright (c) 2026 Megh Computing, Inc.
+
+# All rights reserved. No warranty, explicit or implied, provided.
+# Unauthorized use, modification, or distribution is strictly prohibited.
+
+"""Compare the bounded header reader with the old text-mode readline reader on huge files.
+
+Usage: python -m benchmarks.bench_header_reader [--max-size-gb N] [--legacy-max-mb N]
+"""
+
+import argparse
+import os
+import resource
+import tempfile
+import time
+import typing
+
+from megh_pch.copyrighter import copyrighter
+
+header = b"// Copyright (c) 2020-2022 Megh Computing, Inc.\n"
+
+
+def legacy_read_tombstone(file: typing.TextIO, max_lines: int = 9) -> str:
+    """The text-mode reader this benchmark compares against."""
+    lines = ""
+    for _ in range(max_lines):
+        line = file.readline()
+        if not line:
+            break
+        lines += line
+    return lines
+
+
+def make_file(path: str, size: int, single_line: bool) -> None:
+    """Write a header followed by size bytes. Most of the file is sparse, so this is quick even for GBs."""
+    with open(path, "wb") as file:
+        file.write(header)
+        filler = b"x" * (1 << 16) if single_line else (b"x" * 79 + b"\n") * 819
+        # Enough real text that the header reader never sees the sparse (NUL) part.
+        for _ in range(4):
+            file.write(filler)
+        file.truncate(size)
+
+
+def time_reader(path: str, legacy: bool) -> float:
+    start = time.perf_counter()
+    if legacy:
+        with open(path, "r") as text_file:
+            legacy_read_tombstone(text_file)
+    else:
+        with open(path, "rb") as binary_file:
+            copyrighter.read_tombstone(binary_file)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--max-size-gb", type=float, default=4, help="The largest file to read with the bounded reader.")
+    parser.add_argument("--legacy-max-mb", type=float, default=256, help="The largest file to read with the legacy reader, which loads a whole single-line file.")
+    args = parser.parse_args()
+
+    sizes = [1 << 20, 64 << 20, 1 << 30, int(args.max_size_gb * (1 << 30))]
+    sizes = sorted(set(size for size in sizes if size <= args.max_size_gb * (1 << 30)))
+
+    print(f"{'shape':>12} {'size':>10} {'bounded (ms)':>14} {'legacy (ms)':>12}")
+    with tempfile.TemporaryDirectory() as root:
+        for single_line in (False, True):
+            for size in sizes:
+                path = os.path.join(root, "big.cpp")
+                make_file(path, size, single_line)
+                bounded = time_reader(path, legacy=False) * 1000
+                if size <= args.legacy_max_mb * (1 << 20):
+                    legacy = f"{time_reader(path, legacy=True) * 1000:>12.2f}"
+                else:
+                    legacy = f"{'skipped':>12}"
+                shape = "single line" if single_line else "80 col lines"
+                print(f"{shape:>12} {size / (1 << 20):>8.0f}MB {bounded:>14.2f} {legacy}")
+                os.remove(path)
+
+    print(f"Peak RSS: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
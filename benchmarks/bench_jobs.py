@@ -0,0 +1,55 @@
+#!/usr/bin/env python
+
+# Copyright (c) 2026 Megh Computing, Inc.
+
+# All rights reserved. No warranty, explicit or implied, provided.
+# Unauthorized use, modification, or distribution is strictly prohibited.
+
+"""Measure how check_all scales with --jobs.
+
+Usage: python -m benchmarks.bench_jobs [--files N]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+
+from benchmarks import synthetic
+from megh_pch.copyrighter import copyrighter
+
+
+def job_counts() -> list:
+    counts = [1]
+    cpus = os.cpu_count() or 1
+    while counts[-1] * 2 < cpus:
+        counts.append(counts[-1] * 2)
+    if cpus > 1:
+        counts.append(cpus)
+    return counts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=20000, help="The number of files to generate.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        paths = synthetic.generate(root, synthetic.TreeSpec(files=args.files, header_mix={"megh": 1}))
+        print(f"{'jobs':>6} {'seconds':>10} {'files/sec':>12} {'speedup':>8}")
+        baseline = None
+        for jobs in job_counts():
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                passed = copyrighter.check_all(None, paths, autofix=False, jobs=jobs)
+            elapsed = time.perf_counter() - start
+            if not passed:
+                raise SystemExit(f"The check failed with --jobs {jobs}, so its time is not comparable.")
+            baseline = baseline or elapsed
+            print(f"{jobs:>6} {elapsed:>10.3f} {len(paths) / elapsed:>12.0f} {baseline / elapsed:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+
+# Copyright (c) 2026 Megh Computing, Inc.
+
+# All rights reserved. No warranty, explicit or implied, provided.
+# Unauthorized use, modification, or distribution is strictly prohibited.
+
+"""Compare reading and matching headers through the reused buffer with opening a file object and decoding each header.
+
+Usage: python -m benchmarks.bench_read_path [--files N] [--repeat N]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import typing
+
+from benchmarks import synthetic
+from megh_pch.copyrighter import copyrighter, report
+
+
+def check_file_object(path: str) -> None:
+    """The per-file read path this benchmark compares against: a file object, then decoding before matching."""
+    with open(path, "rb") as file:
+        lines = copyrighter.read_tombstone(file)
+    if lines is not None:
+        copyrighter.check_tombstone(path, lines, autofix=False)
+
+
+def check_buffer(path: str) -> None:
+    size = copyrighter.g_reader.read(path)
+    copyrighter.check_header(path, copyrighter.g_reader.buffer, size, autofix=False)
+
+
+def run(check: typing.Callable[[str], None], paths: list) -> float:
+    start = time.perf_counter()
+    for path in paths:
+        check(path)
+    elapsed = time.perf_counter() - start
+    copyrighter.g_reporter.take()  # type: ignore
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=20000, help="The number of files to generate.")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs of each reader. The best time is kept.")
+    args = parser.parse_args()
+
+    copyrighter.g_reporter = report.Collector()
+    with tempfile.TemporaryDirectory() as root:
+        spec = synthetic.TreeSpec(files=args.files, extension_mix={".py": 1})
+        paths = synthetic.generate(os.path.join(root, "tree"), spec)
+        # Read everything once, so both readers run on a warm page cache.
+        run(check_buffer, paths)
+
+        print(f"{'reader':>12} {'seconds':>10} {'files/sec':>12} {'us/file':>9}")
+        for name, check in (("file object", check_file_object), ("buffer", check_buffer)):
+            elapsed = min(run(check, paths) for _ in range(args.repeat))
+            print(f"{name:>12} {elapsed:>10.3f} {len(paths) / elapsed:>12.0f} {elapsed / len(paths) * 1e6:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+#!/usr/bin/env python
+
+# Copyright (c) 2026 Megh Computing, Inc.
+
+# All rights reserved. No warranty, explicit or implied, provided.
+# Unauthorized use, modification, or distribution is strictly prohibited.
+
+"""Run the copyrighter benchmark suite and optionally compare it against a baseline.
+
+Usage: python -m benchmarks.suite [--files N] [--output results.json] [--baseline old.json]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import subprocess  # nosec
+import sys
+import tempfile
+import time
+import typing
+
+from benchmarks import synthetic
+from megh_pch.copyrighter import cache, copyrighter
+
+# Constants.
+default_threshold = 0.15
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, check=True).stdout.decode().strip()  # nosec
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def run_check(paths: list, autofix: bool = False, cache_dir: typing.Optional[str] = None, jobs: int = 1) -> float:
+    """Run check_all quietly and return the wall time."""
+    copyrighter.g_cache = cache.VerificationCache(cache_dir) if cache_dir else None
+    start = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            copyrighter.check_all(None, paths, autofix, jobs)
+    finally:
+        copyrighter.g_cache = None
+    return time.perf_counter() - start
+
+
+def backdate(paths: list) -> None:
+    """Make the files old enough for the cache to trust them."""
+    for path in paths:
+        os.utime(path, (1600000000, 1600000000))
+
+
+class Suite:
+    """Benchmark scenarios over one synthetic tree. Each returns its best time over the repeats."""
+
+    def __init__(self, root: str, spec: synthetic.TreeSpec, repeat: int, jobs: int):
+        self.root = root
+        self.spec = spec
+        self.repeat = repeat
+        self.jobs = jobs
+        self.paths = synthetic.generate(os.path.join(root, "tree"), spec)
+        backdate(self.paths)
+
+    def best(self, run: typing.Callable[[], float]) -> float:
+        return min(run() for _ in range(self.repeat))
+
+    def cold(self) -> dict:
+        return {"files": len(self.paths), "seconds": self.best(lambda: run_check(self.paths, jobs=self.jobs))}
+
+    def cold_cache(self) -> dict:
+        """A run that has to fill an empty cache."""
+
+        def run() -> float:
+            cache_dir = tempfile.mkdtemp(dir=self.root)
+            try:
+                return run_check(self.paths, cache_dir=cache_dir, jobs=self.jobs)
+            finally:
+                shutil.rmtree(cache_dir)
+
+        return {"files": len(self.paths), "seconds": self.best(run)}
+
+    def warm(self) -> dict:
+        cache_dir = os.path.join(self.root, "warm-cache")
+        run_check(self.paths, cache_dir=cache_dir)
+        return {"files": len(self.paths), "seconds": self.best(lambda: run_check(self.paths, cache_dir=cache_dir, jobs=self.jobs))}
+
+    def fix(self) -> dict:
+        """--fix over a tree where every header is stale."""
+        spec = synthetic.TreeSpec(**dict(vars(self.spec), header_mix={"megh": 0, "stale": 1}))
+
+        def run() -> float:
+            tree = tempfile.mkdtemp(dir=self.root)
+            try:
+                paths = synthetic.generate(tree, spec)
+                return run_check(paths, autofix=True, jobs=self.jobs)
+            finally:
+                shutil.rmtree(tree)
+
+        return {"files": spec.files, "seconds": self.best(run)}
+
+    def pathological(self) -> dict:
+        """A huge single-line file, a huge sparse file, and a binary file."""
+        directory = os.path.join(self.root, "pathological")
+        os.makedirs(directory, exist_ok=True)
+        paths = [os.path.join(directory, name) for name in ("minified.js", "sparse.cpp", "binary.h")]
+        synthetic.write_single_line_file(paths[0], 64 << 20)
+        synthetic.write_sparse_file(paths[1], 4 << 30)
+        with open(paths[2], "wb") as file:
+            file.write(bytes(range(256)) * 4096)
+        return {"files": len(paths), "seconds": self.best(lambda: run_check(paths))}
+
+    def startup(self) -> dict:
+        """The console entry point in a new process on a few files, as a hook runs it for a small commit."""
+        paths = self.paths[:3]
+        command = [sys.executable, "-m", "megh_pch.copyrighter.copyrighter"] + paths
+
+        def run() -> float:
+            start = time.perf_counter()
+            subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)  # nosec
+            return time.perf_counter() - start
+
+        return {"files": len(paths), "seconds": self.best(run)}
+
+    def run(self, names: list) -> dict:
+        results = {}
+        for name in names:
+            result = getattr(self, name)()
+            result["files_per_sec"] = result["files"] / result["seconds"] if result["seconds"] else 0.0
+            results[name] = result
+            print(f"{name:>14} {result['seconds']:>10.3f}s {result['files_per_sec']:>12.0f} files/s", file=sys.stderr)
+        return results
+
+
+scenarios = ["cold", "cold_cache", "warm", "fix", "pathological", "startup"]
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """Return a message for each scenario that got slower than the baseline by more than the threshold."""
+    regressions = []
+    for name, result in results["results"].items():
+        old = baseline.get("results", {}).get(name)
+        if not old or not old["seconds"]:
+            continue
+        change = result["seconds"] / old["seconds"] - 1
+        if change > threshold:
+            regressions.append(f"{name}: {old['seconds']:.3f}s -> {result['seconds']:.3f}s ({change:+.0%}, threshold {threshold:+.0%})")
+    return regressions
+
+
+def make_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=10000, help="The number of files in the synthetic tree.")
+    parser.add_argument("--seed", type=int, default=0, help="The random seed of the synthetic tree.")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per scenario. The best time is kept.")
+    parser.add_argument("--jobs", type=copyrighter.parse_jobs, default=1, help="Passed to check_all.")
+    parser.add_argument("--scenarios", default=",".join(scenarios), help=f"Comma-separated scenarios to run. Defaults to {','.join(scenarios)}.")
+    parser.add_argument("-o", "--output", default=None, help="Write the results as JSON to this file. Defaults to stdout.")
+    parser.add_argument("--baseline", default=None, help="A results file from an earlier commit to compare against.")
+    parser.add_argument("--threshold", type=float, default=default_threshold, help=f"The allowed slowdown against the baseline. Defaults to {default_threshold}.")
+    return parser
+
+
+def main() -> int:
+    args = make_parser().parse_args()
+    names = [name for name in args.scenarios.split(",") if name]
+    unknown = set(names) - set(scenarios)
+    if unknown:
+        print(f"Unknown scenarios: {', '.join(sorted(unknown))}", file=sys.stderr)
+        return 2
+
+    spec = synthetic.TreeSpec(files=args.files, seed=args.seed)
+    with tempfile.TemporaryDirectory() as root:
+        suite = Suite(root, spec, args.repeat, args.jobs)
+        results = {
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "spec": vars(spec),
+            "jobs": args.jobs,
+            "results": suite.run(names),
+        }
+
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(text + "\n")
+    else:
+        print(text)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            regressions = compare(results, json.load(file), args.threshold)
+        for regression in regressions:
+            print(f"Regression: {regression}", file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,193 @@
+#!/usr/bin/env python
+
+# Copyright (c) 2026 Megh Computing, Inc.
+
+# All rights reserved. No warranty, explicit or implied, provided.
+# Unauthorized use, modification, or distribution is strictly prohibited.
+
+"""Generate synthetic source trees for benchmarking copyrighter.
+
+Usage: python -m benchmarks.synthetic OUTPUT_DIR [--files N] [--seed N] ...
+"""
+
+import argparse
+import datetime
+import os
+import random
+import typing
+
+# Constants.
+megh_notice = "Copyright (c) {years} Megh Computing, Inc."
+apache_notice = "Copyright {years} Megh Computing, Inc."
+megh_body = [
+    "",
+    "All rights reserved. No warranty, explicit or implied, provided.",
+    "Unauthorized use, modification, or distribution is strictly prohibited.",
+]
+apache_body = [
+    "",
+    'Licensed under the Apache License, Version 2.0 (the "License");',
+    "you may not use this file except in compliance with the License.",
+    "You may obtain a copy of the License at",
+    "",
+    "http://www.apache.org/licenses/LICENSE-2.0",
+    "",
+    "Unless required by applicable law or agreed to in writing, software",
+    'distributed under the License is distributed on an "AS IS" BASIS,',
+    "WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.",
+    "See the License for the specific language governing permissions and",
+    "limitations under the License.",
+]
+# Line comment prefix, or None for a /* */ block.
+comment_styles = {".py": "# ", ".c": None, ".cpp": None, ".cs": None, ".css": None, ".h": None, ".hpp": None, ".java": None, ".js": "// ", ".php": "// "}
+shebangs = {".py": "#!/usr/bin/env python3\n", ".js": "#!/usr/bin/env node\n", ".php": "#!/usr/bin/env php\n"}
+default_extension_mix = {".py": 30, ".cpp": 20, ".h": 15, ".js": 10, ".java": 5, ".c": 5, ".css": 2, ".txt": 8, ".md": 5}
+default_header_mix = {"megh": 70, "apache": 20, "missing": 5, "stale": 5}
+
+
+class TreeSpec:
+    """The shape of a synthetic tree. Mixes are {choice: weight} dicts."""
+
+    def __init__(
+        self,
+        files: int = 10000,
+        median_size: int = 4096,
+        max_size: int = 1 << 20,
+        extension_mix: typing.Optional[dict] = None,
+        header_mix: typing.Optional[dict] = None,
+        shebang_ratio: float = 0.1,
+        blank_line_ratio: float = 0.1,
+        files_per_dir: int = 200,
+        seed: int = 0,
+    ):
+        self.files = files
+        self.median_size = median_size
+        self.max_size = max_size
+        self.extension_mix = extension_mix or default_extension_mix
+        self.header_mix = header_mix or default_header_mix
+        self.shebang_ratio = shebang_ratio
+        self.blank_line_ratio = blank_line_ratio
+        self.files_per_dir = files_per_dir
+        self.seed = seed
+
+
+def render_header(ext: str, kind: str, current_year: int, rng: random.Random) -> str:
+    """Return the header text for one file."""
+    if kind == "missing":
+        return ""
+
+    end_year = rng.randint(2015, current_year - 1) if kind == "stale" else current_year
+    start_year = rng.randint(2015, end_year)
+    years = str(start_year) if start_year == end_year else f"{start_year}-{end_year}"
+
+    if kind == "apache":
+        lines = [apache_notice.format(years=years)] + apache_body
+    else:
+        lines = [megh_notice.format(years=years)] + megh_body
+
+    prefix = comment_styles.get(ext)
+    if prefix is None:
+        return "/" + "*" * 79 + "\n" + "".join(f"* {line}".rstrip() + "\n" for line in lines) + "*" * 79 + "/\n"
+    return "".join(f"{prefix}{line}".rstrip() + "\n" for line in lines)
+
+
+def file_size(spec: TreeSpec, rng: random.Random) -> int:
+    """Draw a size from a log-normal distribution around the median, capped at max_size."""
+    return min(spec.max_size, int(rng.lognormvariate(0, 1) * spec.median_size))
+
+
+def generate(root: str, spec: TreeSpec, current_year: typing.Optional[int] = None) -> list:
+    """Write the tree under root and return the paths of the files, in creation order."""
+    rng = random.Random(spec.seed)
+    current_year = current_year or datetime.date.today().year
+    extensions, extension_weights = zip(*spec.extension_mix.items())
+    kinds, kind_weights = zip(*spec.header_mix.items())
+    filler_line = "x = 1  # filler to reach the requested file size.\n"
+
+    paths = []
+    for i in range(spec.files):
+        directory = os.path.join(root, f"d{i // spec.files_per_dir:05}")
+        if i % spec.files_per_dir == 0:
+            os.makedirs(directory, exist_ok=True)
+        ext = rng.choices(extensions, extension_weights)[0]
+        kind = rng.choices(kinds, kind_weights)[0]
+
+        text = ""
+        if ext in shebangs and rng.random() < spec.shebang_ratio:
+            text += shebangs[ext]
+        if rng.random() < spec.blank_line_ratio:
+            text += "\n" * rng.randint(1, 3)
+        text += render_header(ext, kind, current_year, rng)
+        size = file_size(spec, rng)
+        if size > len(text):
+            text += filler_line * ((size - len(text)) // len(filler_line) + 1)
+
+        path = os.path.join(directory, f"f{i:07}{ext}")
+        with open(path, "w", newline="\n") as file:
+            file.write(text)
+        paths.append(path)
+    return paths
+
+
+def write_single_line_file(path: str, size: int) -> None:
+    """A minified-style file: a valid header, then one line of size bytes."""
+    with open(path, "w", newline="\n") as file:
+        file.write("// " + megh_notice.format(years=datetime.date.today().year) + " ")
+        chunk = "x" * (1 << 20)
+        for _ in range(size // len(chunk)):
+            file.write(chunk)
+        file.write("x" * (size % len(chunk)) + "\n")
+
+
+def write_sparse_file(path: str, size: int) -> None:
+    """A huge file with a valid header, then a hole. Costs no disk space."""
+    with open(path, "wb") as file:
+        file.write(("// " + megh_notice.format(years=datetime.date.today().year) + "\n").encode())
+        file.write(b"x = 1;\n" * 2048)
+        file.truncate(size)
+
+
+def parse_mix(value: str) -> dict:
+    """Parse "a=3,b=1" into {"a": 3, "b": 1}."""
+    mix = {}
+    for item in value.split(","):
+        name, _, weight = item.partition("=")
+        try:
+            mix[name.strip()] = float(weight)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f'expected "name=weight,...", got "{value}"')
+    return mix
+
+
+def make_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("output", help="The directory to generate the tree in.")
+    parser.add_argument("--files", type=int, default=10000, help="The number of files.")
+    parser.add_argument("--median-size", type=int, default=4096, help="The median file size in bytes.")
+    parser.add_argument("--max-size", type=int, default=1 << 20, help="The largest file size in bytes.")
+    parser.add_argument("--extensions", type=parse_mix, default=None, help='Extension weights, e.g. ".py=3,.cpp=1".')
+    parser.add_argument("--headers", type=parse_mix, default=None, help='Header weights, e.g. "megh=7,apache=2,missing=1,stale=1".')
+    parser.add_argument("--shebang-ratio", type=float, default=0.1, help="The fraction of scripts that start with a shebang.")
+    parser.add_argument("--blank-line-ratio", type=float, default=0.1, help="The fraction of files with blank lines before the header.")
+    parser.add_argument("--seed", type=int, default=0, help="The random seed. The same seed generates the same tree.")
+    return parser
+
+
+def main() -> None:
+    args = make_parser().parse_args()
+    spec = TreeSpec(
+        files=args.files,
+        median_size=args.median_size,
+        max_size=args.max_size,
+        extension_mix=args.extensions,
+        header_mix=args.headers,
+        shebang_ratio=args.shebang_ratio,
+        blank_line_ratio=args.blank_line_ratio,
+        seed=args.seed,
+    )
+    paths = generate(args.output, spec)
+    print(f"Generated {len(paths)} files in {args.output}")
+
+
+if __name__ == "__main__":
+    main()
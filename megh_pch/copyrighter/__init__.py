@@ -0,0 +1,21 @@
+# Copyright (c) 2026 Megh Computing, Inc.
+
+# All rights reserved. No warranty, explicit or implied, provided.
+# Unauthorized use, modification, or distribution is strictly prohibited.
+
+"""Copyright header checks. check_paths is the API for using them from Python; see api for the details.
+
+Nothing is imported until check_paths is called, so the command-line client, in this package too, starts no slower.
+"""
+
+import typing
+
+
+def check_paths(paths: typing.Iterable[str], **kwargs: typing.Any) -> typing.Iterator[typing.Any]:
+    """Check the files, and the files under the directories, in paths. Yield an api.FileResult for each, in order.
+
+    Keyword arguments: fix, jobs, extensions, profiles_file, cache_dir, include, and exclude. See api.check_paths.
+    """
+    from megh_pch.copyrighter import api
+
+    return api.check_paths(paths, **kwargs)
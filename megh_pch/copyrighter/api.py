@@ -0,0 +1,158 @@
+# Copyright (c) 2026 Megh Computing, Inc.
+
+# All rights reserved. No warranty, explicit or implied, provided.
+# Unauthorized use, modification, or distribution is strictly prohibited.
+
+"""Checking files from Python, without starting copyrighter or parsing its output.
+
+A Checker compiles the profiles and loads the cache once, and keeps them for every call. Results are yielded as the
+files are checked, so a build system can act on the first one before the last is read.
+"""
+
+import os
+import typing
+
+from megh_pch.copyrighter import cache, copyrighter, filters, fixer, profiles, report
+
+# Globals.
+# Checkers kept between check_paths calls, by their settings. See copyrighter.reuse.
+g_checkers: dict = {}
+
+
+class FileResult:
+    """The verdict on one file.
+
+    status is "passed", "failed", "fixed" (it failed, and its years were rewritten), or "skipped" (not checked, because
+    of its path or because it is binary). profile, start_year, and end_year describe the notice found, before any fix,
+    and are None if there is none. profile is also None if the cache vouched for the file. fix is the (start year, end
+    year) written to the file, if any. findings are the report.Result objects copyrighter -v would print for it.
+    """
+
+    __slots__ = ("path", "status", "profile", "start_year", "end_year", "fix", "findings")
+
+    def __init__(
+        self,
+        path: str,
+        status: str,
+        profile: typing.Optional[str] = None,
+        start_year: typing.Optional[int] = None,
+        end_year: typing.Optional[int] = None,
+        fix: typing.Optional[typing.Tuple[int, int]] = None,
+        findings: typing.Tuple[report.Result, ...] = (),
+    ):
+        self.path = path
+        self.status = status
+        self.profile = profile
+        self.start_year = start_year
+        self.end_year = end_year
+        self.fix = fix
+        self.findings = findings
+
+    def __repr__(self) -> str:
+        return f"FileResult({self.path!r}, {self.status!r}, {self.profile!r}, {self.start_year}, {self.end_year}, {self.fix})"
+
+    @property
+    def passed(self) -> bool:
+        return self.status in ("passed", "skipped")
+
+
+class Checker:
+    """Checks files with the same settings as the copyrighter options of the same names.
+
+    Globs are relative to root, which defaults to the working directory when the checker is made. Raises OSError or
+    ValueError if the profiles file cannot be read.
+    """
+
+    def __init__(
+        self,
+        extensions: typing.Iterable[str] = copyrighter.default_extensions,
+        profiles_file: typing.Optional[str] = None,
+        cache_dir: typing.Optional[str] = None,
+        include: typing.Iterable[str] = (),
+        exclude: typing.Iterable[str] = (),
+        root: typing.Optional[str] = None,
+    ):
+        self.extensions = list(extensions)
+        self.path_filter = filters.PathFilter(self.extensions, include, exclude, root=root)
+        if profiles_file:
+            self.registry = profiles.HeaderRegistry(list(profiles.default_profiles) + profiles.load_profiles(os.path.abspath(profiles_file)))
+        else:
+            self.registry = profiles.HeaderRegistry()
+        self.cache = cache.VerificationCache(cache_dir) if cache_dir else None
+
+    def check_paths(self, paths: typing.Iterable[str], fix: bool = False, jobs: int = 1) -> typing.Iterator[FileResult]:
+        """Check the files, and the files under the directories, in paths. Yield a FileResult for each, in order.
+
+        With fix, each file's years are rewritten before its result is yielded. With jobs > 1, files are checked in a
+        process pool, which costs its start-up time on every call. The cache is saved when the iteration ends.
+        """
+        if self.cache is not None:
+            self.cache.load(cache.make_fingerprint(copyrighter.time.localtime().tm_year, self.extensions, self.registry.fingerprint))
+        collector = report.Collector()
+        fixes = fixer.FixBatch() if fix else None
+        settings = {
+            # Verbose, so the reasons files are skipped are among their findings.
+            "g_verbose": True,
+            "g_cache": self.cache,
+            "g_registry": self.registry,
+            "g_history": None,
+            "g_stats": None,
+            "g_reporter": collector,
+            "g_fixes": fixes,
+            "g_manifest": None,
+            "g_deep": False,
+            "g_budget": None,
+        }
+
+        checked = copyrighter.check_expanded(copyrighter.expand_paths(paths, self.path_filter), self.path_filter, fix, jobs)
+        try:
+            while True:
+                # The globals are only set while this checker runs, so checkers and command-line runs can interleave.
+                saved = swap_globals(settings)
+                try:
+                    entry = next(checked, None)
+                    if entry is None:
+                        break
+                    path, passed, notice, findings = entry
+                    findings = (*findings, *collector.take())
+                    written = None
+                    for filepath, fix_start, fix_end, match in fixes.take() if fixes is not None else ():
+                        copyrighter.write_current_year(filepath, fix_start, fix_end, match)
+                        written = fix_start, fix_end
+                finally:
+                    swap_globals(saved)
+
+                if passed:
+                    status = "passed" if notice is not None else "skipped"
+                else:
+                    status = "fixed" if written is not None else "failed"
+                profile, start_year, end_year = notice or (None, None, None)
+                yield FileResult(path, status, profile, start_year, end_year, written, findings)
+        finally:
+            checked.close()
+            if self.cache is not None:
+                self.cache.save()
+
+
+def swap_globals(settings: dict) -> dict:
+    """Set the copyrighter globals to settings. Return the values they had."""
+    saved = {name: getattr(copyrighter, name) for name in settings}
+    vars(copyrighter).update(settings)
+    return saved
+
+
+def check_paths(
+    paths: typing.Iterable[str],
+    *,
+    fix: bool = False,
+    jobs: int = 1,
+    extensions: typing.Iterable[str] = copyrighter.default_extensions,
+    profiles_file: typing.Optional[str] = None,
+    cache_dir: typing.Optional[str] = None,
+    include: typing.Iterable[str] = (),
+    exclude: typing.Iterable[str] = (),
+) -> typing.Iterator[FileResult]:
+    """Check paths with a Checker made for these settings, or the one kept from an earlier call with the same ones."""
+    key = ("checker", tuple(extensions), copyrighter.file_key(profiles_file), cache_dir and os.path.abspath(cache_dir), tuple(include), tuple(exclude), os.getcwd())
+    checker = copyrighter.reuse(g_checkers, key, lambda: Checker(extensions, profiles_file, cache_dir, include, exclude))
+    return checker.check_paths(paths, fix, jobs)
@@ -0,0 +1,312 @@
+# Copyright (c) 2026 Megh Computing, Inc.
+
+# All rights reserved. No warranty, explicit or implied, provided.
+# Unauthorized use, modification, or distribution is strictly prohibited.
+
+"""Persistent cache of checked files, so unchanged files are not re-read on the next run."""
+
+import array
+import collections
+import contextlib
+import marshal
+import os
+import time
+import typing
+
+try:
+    import fcntl
+except ImportError:  # Windows. Writes are still atomic, concurrent updates may be lost.
+    fcntl = None  # type: ignore
+
+# Constants.
+cache_filename = "verified.bin"
+lock_filename = "lock"
+format_version = 5
+default_max_entries = 500000
+# Files modified this recently are not cached. Another write in the same mtime tick would go unnoticed.
+racy_seconds = 2
+
+# Number of values per entry in the "stats" and "years" columns.
+stats_width = 5  # size, mtime_ns, inode, last used (days since epoch), microseconds the last check took
+years_width = 3  # start year, end year, passed
+
+Entry = collections.namedtuple("Entry", "size mtime_ns inode start_year end_year passed content_hash used check_us")
+
+
+def make_fingerprint(current_year: int, extensions: list, profiles: str = "") -> str:
+    """Return the cache fingerprint. Entries written under a different fingerprint are discarded."""
+    return f"{format_version}:{marshal.version}:{current_year}:{','.join(sorted(extensions))}:{profiles}"
+
+
+def hash_file(filepath: str) -> bytes:
+    """Return a digest of the file's contents."""
+    import hashlib
+
+    digest = hashlib.blake2b(digest_size=16)
+    with open(filepath, "rb") as file:
+        for chunk in iter(lambda: file.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.digest()
+
+
+class VerificationCache:
+    """Parsed years and verdicts of checked files, keyed by path and validated by size, mtime, and inode.
+
+    The file is stored in columns so a warm load of a large tree is a single marshal.loads. Saving takes a
+    lock, merges with whatever other processes wrote in the meantime, evicts the least recently used entries
+    over max_entries, and atomically replaces the file.
+    """
+
+    def __init__(self, directory: typing.Optional[str], paranoid: bool = False, max_entries: int = default_max_entries):
+        # Empty for a cache kept only in memory, like the one check_parallel records workers' entries in.
+        self.directory = directory or ""
+        self.paranoid = paranoid
+        self.max_entries = max_entries
+        self.fingerprint = ""
+        self.hits = 0
+        self.misses = 0
+        self._index: typing.Dict[str, int] = {}
+        self._stats = array.array("q")
+        self._years = array.array("h")
+        self._hashes: typing.Dict[str, bytes] = {}
+        self._updates: typing.Dict[str, Entry] = {}
+        # Keys of git blobs that passed, by object ID and comment syntax. Blobs never change, so they need no validation.
+        self._blobs: typing.Set[str] = set()
+        self._new_blobs: typing.List[str] = []
+        self._touched = False
+        self._today = int(time.time() // 86400)
+        # (size, mtime, inode) of the cache file as last read or written, so a reused cache can skip reading it again.
+        self._file_id: typing.Optional[tuple] = None
+
+    @property
+    def path(self) -> str:
+        return os.path.join(self.directory, cache_filename)
+
+    def load(self, fingerprint: str) -> None:
+        """Load the entries written under the given fingerprint, if any.
+
+        A cache can be loaded again for another run, as by a long-lived server. If the fingerprint is the same and no
+        other process has written the file since, the entries in memory are kept and the file is not read.
+        """
+        self.hits = self.misses = 0
+        self._today = int(time.time() // 86400)
+        if self._file_id is not None and fingerprint == self.fingerprint and self._file_id == self._stat_file():
+            return
+
+        self.fingerprint = fingerprint
+        self._index, self._stats, self._years, self._hashes, blobs = {}, array.array("q"), array.array("h"), {}, []
+        self._updates = {}
+        self._new_blobs = []
+        columns = self._read()
+        if columns:
+            self._index, self._stats, self._years, self._hashes, blobs = columns
+        self._blobs = set(blobs)
+
+    def _stat_file(self) -> typing.Optional[tuple]:
+        try:
+            file_stat = os.stat(self.path)
+        except OSError:
+            return None
+        return file_stat.st_size, file_stat.st_mtime_ns, file_stat.st_ino
+
+    def _read(self) -> typing.Optional[tuple]:
+        if not self.directory:
+            return None
+
+        try:
+            with open(self.path, "rb") as file:
+                file_stat = os.fstat(file.fileno())
+                data = marshal.load(file)
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+        self._file_id = file_stat.st_size, file_stat.st_mtime_ns, file_stat.st_ino
+
+        if not isinstance(data, dict) or data.get("fingerprint") != self.fingerprint:
+            return None
+
+        paths = data["paths"].split("\0") if data["paths"] else []
+        stats = array.array("q")
+        stats.frombytes(data["stats"])
+        years = array.array("h")
+        years.frombytes(data["years"])
+        if len(stats) != len(paths) * stats_width or len(years) != len(paths) * years_width:
+            return None
+        blobs = data["blobs"].split("\n") if data["blobs"] else []
+        return dict(zip(paths, range(len(paths)))), stats, years, data["hashes"], blobs
+
+    def lookup(self, filepath: str, file_stat: os.stat_result) -> typing.Optional[Entry]:
+        """Return the entry for the file, or None if it is not cached or the file has changed.
+
+        Only entries of files that passed count as hits. A file that failed is read and checked again.
+        """
+        entry = self._updates.get(filepath)
+        if entry is not None:
+            if (entry.size, entry.mtime_ns, entry.inode) != (file_stat.st_size, file_stat.st_mtime_ns, file_stat.st_ino):
+                self.misses += 1
+                return None
+        else:
+            i = self._index.get(filepath)
+            base = -1 if i is None else i * stats_width
+            # Compare the columns directly. Most lookups on a warm run are hits, so this is the hot path.
+            if i is None or self._stats[base] != file_stat.st_size or self._stats[base + 1] != file_stat.st_mtime_ns or self._stats[base + 2] != file_stat.st_ino:
+                self.misses += 1
+                return None
+            entry = self._entry(filepath, i)
+
+        if self.paranoid and entry.content_hash != hash_file(filepath):
+            self.misses += 1
+            return None
+
+        # Refresh the entry for eviction. This only dirties the cache once a day.
+        i = self._index.get(filepath)
+        if i is not None and self._stats[i * stats_width + 3] != self._today:
+            self._stats[i * stats_width + 3] = self._today
+            self._touched = True
+
+        if entry.passed:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return entry
+
+    def _entry(self, filepath: str, i: int) -> Entry:
+        stats = self._stats[i * stats_width : (i + 1) * stats_width]
+        years = self._years[i * years_width : (i + 1) * years_width]
+        return Entry(stats[0], stats[1], stats[2], years[0], years[1], bool(years[2]), self._hashes.get(filepath), stats[3], stats[4])
+
+    def store(self, filepath: str, file_stat: os.stat_result, start_year: int, end_year: int, passed: bool, check_us: int = 0) -> None:
+        """Record the parsed years and verdict for the file as it was when file_stat was taken, and how many
+        microseconds checking it took.
+        """
+        if file_stat.st_mtime_ns >= (time.time() - racy_seconds) * 1e9:
+            return
+
+        content_hash = hash_file(filepath) if self.paranoid else None
+        self._updates[filepath] = Entry(file_stat.st_size, file_stat.st_mtime_ns, file_stat.st_ino, start_year or 0, end_year or 0, passed, content_hash, self._today, check_us)
+
+    def past_check_us(self, filepath: str) -> typing.Optional[int]:
+        """Return how many microseconds the last check of the file took, even if it has changed since, or None if it
+        was never timed.
+        """
+        entry = self._updates.get(filepath)
+        if entry is not None:
+            return entry.check_us or None
+        i = self._index.get(filepath)
+        if i is None:
+            return None
+        return self._stats[i * stats_width + 4] or None
+
+    def is_verified_blob(self, key: str) -> bool:
+        """Return whether a git blob passed, by its key from copyrighter.blob_key."""
+        if key in self._blobs:
+            self.hits += 1
+            return True
+        self.misses += 1
+        return False
+
+    def add_verified_blob(self, key: str) -> None:
+        if key not in self._blobs:
+            self._blobs.add(key)
+            self._new_blobs.append(key)
+
+    def take_updates(self) -> dict:
+        """Return and forget the entries stored since the last call. Used to send results back from workers."""
+        updates, self._updates = self._updates, {}
+        return updates
+
+    def merge(self, updates: dict) -> None:
+        """Add entries stored by another process, for example a --jobs worker."""
+        self._updates.update(updates)
+
+    def entries(self) -> typing.Iterator[typing.Tuple[str, Entry]]:
+        """Yield every (path, entry), including the ones stored during this run."""
+        for filepath, i in self._index.items():
+            if filepath not in self._updates:
+                yield filepath, self._entry(filepath, i)
+        yield from self._updates.items()
+
+    @contextlib.contextmanager
+    def _lock(self) -> typing.Iterator[None]:
+        if fcntl is None:
+            yield
+            return
+
+        with open(os.path.join(self.directory, lock_filename), "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def save(self) -> None:
+        """Merge this run's entries into the cache file."""
+        if not self.directory or not (self._updates or self._new_blobs or self._touched):
+            return
+
+        os.makedirs(self.directory, exist_ok=True)
+        with self._lock():
+            # Another hook process may have saved since this one loaded.
+            records = dict(self.entries())
+            new_blobs = set(self._new_blobs)
+            blobs = [oid for oid in self._blobs if oid not in new_blobs]
+            columns = self._read()
+            if columns:
+                index, stats, years, hashes, disk_blobs = columns
+                blobs = disk_blobs + blobs
+                for filepath, i in index.items():
+                    if filepath in self._updates:
+                        continue
+                    entry_stats = stats[i * stats_width : (i + 1) * stats_width]
+                    entry_years = years[i * years_width : (i + 1) * years_width]
+                    entry = Entry(entry_stats[0], entry_stats[1], entry_stats[2], entry_years[0], entry_years[1], bool(entry_years[2]), hashes.get(filepath), entry_stats[3], entry_stats[4])
+                    ours = records.get(filepath)
+                    if ours is not None:
+                        entry = entry._replace(used=max(entry.used, ours.used))
+                    records[filepath] = entry
+
+            if len(records) > self.max_entries:
+                newest = sorted(records.items(), key=lambda item: item[1].used, reverse=True)
+                records = dict(newest[: self.max_entries])
+            # Blobs added by this run go last, so they are evicted last.
+            blobs = list(dict.fromkeys(blobs + self._new_blobs))
+            blobs = blobs[max(len(blobs) - self.max_entries, 0) :]
+
+            self._write(records, blobs)
+
+        self._updates = {}
+        self._new_blobs = []
+        self._touched = False
+
+    def _write(self, records: dict, blobs: list) -> None:
+        stats = array.array("q")
+        years = array.array("h")
+        hashes = {}
+        for filepath, entry in records.items():
+            stats.extend((entry.size, entry.mtime_ns, entry.inode, entry.used, entry.check_us))
+            years.extend((entry.start_year, entry.end_year, int(entry.passed)))
+            if entry.content_hash is not None:
+                hashes[filepath] = entry.content_hash
+
+        data = {
+            "fingerprint": self.fingerprint,
+            "paths": "\0".join(records),
+            "stats": stats.tobytes(),
+            "years": years.tobytes(),
+            "hashes": hashes,
+            "blobs": "\n".join(blobs),
+        }
+
+        import tempfile
+
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, prefix=".verified-")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                marshal.dump(data, file)
+            os.replace(temp_path, self.path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+        # Keep what was written, so loading again for another run need not read it back.
+        self._index, self._stats, self._years, self._hashes = dict(zip(records, range(len(records)))), stats, years, hashes
+        self._blobs = set(blobs)
+        self._file_id = self._stat_file()
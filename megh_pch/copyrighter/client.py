@@ -0,0 +1,135 @@
+# Copyright (c) 2026 Megh Computing, Inc.
+
+# All rights reserved. No warranty, explicit or implied, provided.
+# Unauthorized use, modification, or distribution is strictly prohibited.
+
+"""A thin copyrighter that sends its arguments to the repository's server, or checks in process if none is running.
+
+It imports only the standard library modules it needs, so that starting it costs little more than starting Python.
+"""
+
+import json
+import os
+import socket
+import stat
+import sys
+import typing
+import zlib
+
+# Constants.
+protocol_version = 1
+# Environment variables that change what git commands see, passed on to the server.
+env_prefix = "GIT_"
+buffer_size = 65536
+
+
+class NoServer(Exception):
+    """No server is listening, or it speaks another protocol version. The request was not run."""
+
+
+def repository_root(directory: str) -> str:
+    """Return the nearest directory at or above the given one that contains .git, or the directory itself."""
+    current = os.path.abspath(directory)
+    while not os.path.exists(os.path.join(current, ".git")):
+        parent = os.path.dirname(current)
+        if parent == current:
+            return os.path.abspath(directory)
+        current = parent
+    return current
+
+
+def socket_path(root: str) -> str:
+    """Return the path of the server socket for a repository root, in a directory only this user can enter. See
+    check_directory.
+    """
+    directory = os.path.join(os.environ.get("XDG_RUNTIME_DIR") or "/tmp", f"copyrighter-{os.getuid()}")  # nosec
+    return os.path.join(directory, f"{zlib.crc32(root.encode(errors='surrogateescape')):08x}.sock")
+
+
+def check_directory(directory: str) -> None:
+    """Raise PermissionError unless the socket directory is a directory, not a symlink, that this user owns and only
+    this user can enter. Anyone can make the /tmp fallback first, to listen in on or answer the requests.
+    """
+    directory_stat = os.lstat(directory)
+    if not stat.S_ISDIR(directory_stat.st_mode) or directory_stat.st_uid != os.getuid() or stat.S_IMODE(directory_stat.st_mode) != 0o700:
+        raise PermissionError(f"{directory} must be a directory with mode 0700 owned by user {os.getuid()}")
+
+
+def reads_stdin(argv: list) -> bool:
+    """Return whether the arguments list the files on standard input, which the server cannot read."""
+    for i, arg in enumerate(argv):
+        if arg == "--":
+            return False
+        if arg in ("--stdin", "--files-from=-") or (arg == "--files-from" and argv[i + 1 : i + 2] == ["-"]):
+            return True
+    return False
+
+
+def request(path: str, message: dict) -> dict:
+    """Send one request to the server at path and return its response. Raises NoServer if none is listening, or if the
+    socket's directory is not safe to connect in.
+    """
+    try:
+        check_directory(os.path.dirname(path))
+    except OSError as e:
+        raise NoServer(str(e)) from e
+
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        try:
+            client.connect(path)
+        except OSError as e:
+            raise NoServer(str(e)) from e
+        client.sendall(json.dumps(message).encode() + b"\n")
+        client.shutdown(socket.SHUT_WR)
+        chunks = []
+        while True:
+            chunk = client.recv(buffer_size)
+            if not chunk:
+                break
+            chunks.append(chunk)
+    finally:
+        client.close()
+    response = json.loads(b"".join(chunks))
+    if response.get("version") != protocol_version:
+        raise NoServer(f"protocol version {response.get('version')}")
+    return response
+
+
+def main(argv: typing.Optional[list] = None) -> int:
+    if argv is None:
+        argv = sys.argv[1:]
+    cwd = os.getcwd()
+    root = repository_root(cwd)
+    message = {
+        "version": protocol_version,
+        "root": root,
+        "cwd": cwd,
+        "argv": argv,
+        "prog": os.path.basename(sys.argv[0]),
+        "env": {name: value for name, value in os.environ.items() if name.startswith(env_prefix)},
+    }
+
+    try:
+        if reads_stdin(argv):
+            raise NoServer("standard input is not sent to the server")
+        response = request(socket_path(root), message)
+        if response.get("root", root) != root:
+            raise NoServer(f"the server is for {response['root']}")
+    except NoServer:
+        # No server, or one from another version of copyrighter or for another repository. Check in this process
+        # instead.
+        from megh_pch.copyrighter import copyrighter
+
+        return copyrighter.main(argv)
+    except (OSError, ValueError) as e:
+        print(f"Copyrighter server failed: {e}", file=sys.stderr)
+        return 1
+
+    sys.stdout.write(response.get("stdout", ""))
+    sys.stderr.write(response.get("stderr", ""))
+    return response.get("returncode", 1)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
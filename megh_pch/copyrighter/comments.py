@@ -0,0 +1,105 @@
+# Copyright (c) 2026 Megh Computing, Inc.
+
+# All rights reserved. No warranty, explicit or implied, provided.
+# Unauthorized use, modification, or distribution is strictly prohibited.
+
+"""Comment syntax by file extension, to find where the leading comments of a file end. A header is only looked for
+there: a notice after the first line of code is not a header.
+"""
+
+import os
+import re
+import typing
+
+# Constants.
+# Without a known comment syntax, the header is looked for in this many lines.
+fallback_lines = 9
+
+
+class CommentSyntax:
+    """How a language writes comments: line comment prefixes, (open, close) block comment delimiters, and regexes of
+    declarations that can come before the header, like <?xml ...?>. A #! line is allowed first in every language.
+    """
+
+    def __init__(self, line: typing.Iterable[str] = (), blocks: typing.Iterable[tuple] = (), preambles: typing.Iterable[str] = ()):
+        self.line = tuple(line)
+        self.blocks = tuple(blocks)
+        self.preambles = tuple(preambles)
+        # Compiled on first use, since a run only sees a few languages.
+        self._pattern: typing.Optional[typing.Pattern] = None
+        self._bytes_pattern: typing.Optional[typing.Pattern] = None
+
+    def __repr__(self) -> str:
+        return f"CommentSyntax({self.line!r}, {self.blocks!r}, {self.preambles!r})"
+
+    def regex(self) -> str:
+        # Blocks go first, so that Lua's --[[ is not taken for a -- line.
+        tokens = [r"\s+"]
+        tokens += [re.escape(start) + r".*?(?:" + re.escape(end) + r"|\Z)" for start, end in self.blocks]
+        tokens += [re.escape(prefix) + r"[^\n]*" for prefix in self.line]
+        tokens += self.preambles
+        return r"(?:#![^\n]*)?(?:" + "|".join(tokens) + ")*"
+
+    def end(self, data: typing.Union[str, bytes, bytearray], start: int = 0, size: typing.Optional[int] = None) -> int:
+        """Return the offset of the first code in data[start:size], or size if there is none. An unclosed block
+        comment runs to size.
+        """
+        size = len(data) if size is None else size
+        if isinstance(data, str):
+            if self._pattern is None:
+                self._pattern = re.compile(self.regex(), re.S)
+            pattern = self._pattern
+        else:
+            if self._bytes_pattern is None:
+                self._bytes_pattern = re.compile(self.regex().encode(), re.S)
+            pattern = self._bytes_pattern
+        return pattern.match(data, start, size).end()  # type: ignore
+
+
+hash_comments = CommentSyntax(line=["#"])
+# A module docstring can hold the notice, so it is part of the header too.
+python_comments = CommentSyntax(line=["#"], preambles=[r"[rRuU]?(?:\"\"\".*?(?:\"\"\"|\Z)|'''.*?(?:'''|\Z))"])
+c_comments = CommentSyntax(line=["//"], blocks=[("/*", "*/")])
+syntaxes = {
+    **dict.fromkeys([".py", ".pyi", ".pyx"], python_comments),
+    **dict.fromkeys([".sh", ".bash", ".zsh", ".rb", ".pl", ".pm", ".r", ".cmake", ".yaml", ".yml", ".toml"], hash_comments),
+    **dict.fromkeys(
+        [".c", ".h", ".cc", ".cpp", ".cxx", ".hh", ".hpp", ".hxx", ".cu", ".cs", ".java", ".kt", ".scala", ".groovy", ".go", ".rs", ".swift"],
+        c_comments,
+    ),
+    **dict.fromkeys([".js", ".jsx", ".mjs", ".cjs", ".ts", ".tsx", ".dart", ".proto", ".scss", ".less", ".v", ".sv"], c_comments),
+    ".css": CommentSyntax(blocks=[("/*", "*/")]),
+    ".php": CommentSyntax(line=["//", "#"], blocks=[("/*", "*/")], preambles=[r"<\?php\b"]),
+    **dict.fromkeys(
+        [".html", ".htm", ".xml", ".xsd", ".xsl", ".svg", ".vue", ".md"],
+        CommentSyntax(blocks=[("<!--", "-->")], preambles=[r"<\?xml.*?\?>", r"<!DOCTYPE[^>]*>"]),
+    ),
+    ".sql": CommentSyntax(line=["--"], blocks=[("/*", "*/")]),
+    ".lua": CommentSyntax(line=["--"], blocks=[("--[[", "]]")]),
+    ".hs": CommentSyntax(line=["--"], blocks=[("{-", "-}")]),
+    **dict.fromkeys([".lisp", ".el", ".clj", ".scm", ".asm"], CommentSyntax(line=[";"])),
+    **dict.fromkeys([".tex", ".sty", ".erl"], CommentSyntax(line=["%"])),
+    **dict.fromkeys([".vb", ".vbs"], CommentSyntax(line=["'"])),
+}
+
+
+def lines_end(data: typing.Union[str, bytes, bytearray], start: int = 0, size: typing.Optional[int] = None, max_lines: int = fallback_lines) -> int:
+    """Return the offset just past the first max_lines lines of data[start:size]."""
+    size = len(data) if size is None else size
+    newline = "\n" if isinstance(data, str) else b"\n"
+    end = start - 1
+    for _ in range(max_lines):
+        end = data.find(newline, end + 1, size)  # type: ignore
+        if end < 0:
+            return size
+    return end + 1
+
+
+def header_end(filepath: str, data: typing.Union[str, bytes, bytearray], start: int = 0, size: typing.Optional[int] = None) -> int:
+    """Return the offset where the header of the file, whose start is data[:size], ends: the first code, or after the
+    first fallback_lines lines for an extension without a known comment syntax. start skips a byte order mark.
+    """
+    syntax = syntaxes.get(os.path.splitext(filepath)[1].lower())
+    if syntax is None:
+        return lines_end(data, start, size)
+    return syntax.end(data, start, size)
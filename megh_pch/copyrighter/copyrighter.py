@@ -1,34 +1,136 @@
 #!/usr/bin/env python
 
-# Copyright (c) 2022 Megh Computing, Inc.
+# Copyright (c) 2022-2026 Megh Computing, Inc.
 
 # All rights reserved. No warranty, explicit or implied, provided.
 # Unauthorized use, modification, or distribution is strictly prohibited.
 
+# Modules needed only by some options, like concurrent.futures for --jobs and this package's cache, gitio, and fixer
+# modules, are imported where they are used. Most runs check a few staged files, and for those, startup is most of the
+# time. See tests/copyrighter/test_startup.py.
 import argparse
-import datetime
+import codecs
 import os
 import re
+import stat
 import sys
+import time
 import typing
 
+from megh_pch.copyrighter import comments, filters, profiles, reader, report, stats
+
+if typing.TYPE_CHECKING:
+    from megh_pch.copyrighter import cache, fixer, gitio, manifest, schedule, shard
+
 # Constants.
 default_extensions = (".c", ".cpp", ".cs", ".css", ".h", ".hpp", ".java", ".js", ".php", ".py")
+# The most bytes read from the start of a file. A header is never longer than this.
+header_bytes = 8192
+# Checked before the NUL byte test, since UTF-16 and UTF-32 text is full of NULs.
+byte_order_marks = (
+    (codecs.BOM_UTF8, "utf-8"),
+    (codecs.BOM_UTF32_LE, "utf-32-le"),
+    (codecs.BOM_UTF32_BE, "utf-32-be"),
+    (codecs.BOM_UTF16_LE, "utf-16-le"),
+    (codecs.BOM_UTF16_BE, "utf-16-be"),
+)
+# Headers that start with these are decoded before matching. Everything else is matched as bytes.
+wide_byte_order_marks = tuple(bom for bom, encoding in byte_order_marks if encoding != "utf-8")
+# The most paths the process pool holds at once, and the bytes of a --files-from list read at a time.
+parallel_window = 65536
+files_from_chunk_bytes = 65536
+# The choices of --recover and --shard-weight. See fixer.recover and shard.Shard.select.
+recover_modes = ("resume", "rollback")
+shard_weights = ("count", "size")
+# The exit code of a check that --max-failures or --time-budget stopped before every file was checked.
+stopped_exit_code = 3
 
 # Globals.
 g_verbose = False
+g_cache: "typing.Optional[cache.VerificationCache]" = None
+g_registry = profiles.HeaderRegistry()
+# The notices found in the headers seen, in this process.
+g_headers = profiles.HeaderMemo()
+# If set, the start year must be the year the file was added to git.
+g_history: "typing.Optional[gitio.History]" = None
+# Set by --stats. Every use is guarded, so a normal run pays nothing for it.
+g_stats: typing.Optional[stats.Stats] = None
+# Every finding goes through the reporter, which writes them out in batches.
+g_reporter: report.Reporter = report.TextReporter()
+# Every file's header is read into this reader's buffer.
+g_reader = reader.HeaderReader(header_bytes)
+# Trees verified by earlier --staged and --rev runs, with --tree-manifest.
+g_manifest: "typing.Optional[manifest.TreeManifest]" = None
+# Set by check_all with --fix. Fixes are queued here and written together once every file is checked.
+g_fixes: "typing.Optional[fixer.FixBatch]" = None
+# Set by --deep. Every notice in a file is checked, not just the header's.
+g_deep = False
+# Set by --max-failures and --time-budget.
+g_budget: "typing.Optional[schedule.Budget]" = None
+
+
+def phase(name: str):
+    """Time the with block under the given phase name if --stats is on."""
+    return g_stats.phase(name) if g_stats is not None else stats.null_phase
+
+
+def add_result(filepath: str, rule: str, message: str, **kwargs) -> None:
+    """Report a finding about the file. See report.Result for the keyword arguments."""
+    g_reporter.add(report.Result(filepath, rule, message, **kwargs))
+
+
+def detect_encoding(data: bytes) -> typing.Optional[tuple]:
+    """Return the length of the byte order mark and the encoding of the first bytes of a file, or None if binary."""
+    for bom, encoding in byte_order_marks:
+        if data.startswith(bom):
+            return len(bom), encoding
+
+    if b"\0" in data:
+        return None
+
+    try:
+        # The data may end in the middle of a character, which the incremental decoder holds back.
+        codecs.getincrementaldecoder("utf-8")().decode(data)
+        return 0, "utf-8"
+    except UnicodeDecodeError:
+        # Not UTF-8. The notice is ASCII, so any 8-bit encoding finds it.
+        return 0, "latin-1"
+
+
+def decode_header(data: bytes) -> typing.Optional[str]:
+    """Decode the first bytes of a file. Return None if the file looks binary."""
+    detected = detect_encoding(data)
+    if detected is None:
+        return None
+
+    bom_length, encoding = detected
+    return codecs.getincrementaldecoder(encoding)(errors="replace").decode(data[bom_length:])
+
 
+def read_tombstone(file: typing.BinaryIO, max_lines: int = 9, max_bytes: int = header_bytes) -> typing.Optional[str]:
+    """Extract and return the tombstone from the file. Return None if the file is binary.
 
-def read_tombstone(file: typing.TextIO, max_lines: int = 9) -> str:
-    """Extract and return the tombstone from the file."""
-    lines = ""
+    At most max_bytes are read and decoded, however long the file or its first line is.
+    """
+    data = file.read(max_bytes)
+    if g_stats is not None:
+        g_stats.count("bytes_read", len(data))
+    return tombstone_text(data, max_lines)
+
+
+def tombstone_text(data: bytes, max_lines: int = 9) -> typing.Optional[str]:
+    """Decode the first max_lines lines of the first bytes of a file. Return None if the file is binary."""
+    lines = decode_header(data)
+    if lines is None:
+        return None
+
+    end = -1
     for _ in range(max_lines):
-        line = file.readline()
-        if not line:
-            break
-        lines += line
+        end = lines.find("\n", end + 1)
+        if end < 0:
+            return lines
 
-    return lines
+    return lines[: end + 1]
 
 
 def read_file(filepath: str) -> list:
@@ -37,125 +139,474 @@ def read_file(filepath: str) -> list:
         return file.readlines()
 
 
-def write_file(filepath: str, lines: list) -> None:
-    """Useful for unit testing."""
-    with open(filepath, "w") as file:
-        file.writelines(lines)
+def write_current_year(filepath: str, start_year: int, current_year: int, match: typing.Optional[profiles.HeaderMatch] = None):
+    """Replace the years of the file's copyright notice with start_year-current_year.
 
+    match is the notice found by the check. Its offsets are reused if the header has not changed since. When
+    the years keep their length, only those bytes are overwritten. Otherwise the file is streamed into a
+    temporary file that replaces it.
+    """
+    with open(filepath, "r+b") as file:
+        data, years_start, years_end, years = locate_years(file, start_year, current_year, match)
 
-def write_current_year(filepath: str, start_year: int, current_year: int):
-    lines = read_file(filepath)
+        if years_end - years_start == len(years):
+            file.seek(years_start)
+            file.write(years)
+            return
 
-    # The subbing RE has to work for Megh and Apache.
-    copyright_regex = R" 20\d\d(-20\d\d)? Megh Computing, Inc."
-    copyright_replace = " {0}-{1} Megh Computing, Inc."
+        import shutil
+        import tempfile
 
-    regex = re.compile(copyright_regex)
-    for i, line in enumerate(lines):
-        match = regex.search(line)
-        if match:
-            to_write = lines[:]
-            to_write[i] = regex.sub(copyright_replace.format(start_year, current_year), line)
-            # Write out.
-            write_file(filepath, to_write)
-            return
-    raise AssertionError()
+        # Replace a symlink's target, not the symlink.
+        filepath = os.path.realpath(filepath)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(filepath), prefix=".copyrighter-")
+        try:
+            with os.fdopen(fd, "wb") as temp_file:
+                temp_file.write(data[:years_start])
+                temp_file.write(years)
+                temp_file.write(data[years_end:])
+                shutil.copyfileobj(file, temp_file, 1 << 20)
+            shutil.copymode(filepath, temp_path)
+            os.replace(temp_path, filepath)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
 
 
-def parse_copyright_megh(lines: str) -> tuple:
-    """Return the start year and end year of the copyright header. If there is no range, start year will equal end year."""
-    copyright_regex_megh = R"Copyright \(c\) 20\d\d(-20\d\d)? Megh Computing, Inc."
-    match = re.search(copyright_regex_megh, lines)
-    if not match:
-        return None, None
+def locate_years(file: typing.BinaryIO, start_year: int, current_year: int, match: typing.Optional[profiles.HeaderMatch] = None) -> tuple:
+    """Read the header of the file, open at its start, and find the years of its notice.
+
+    Return the header bytes, the offsets of the years in them, and the start_year-current_year bytes to put there.
+    The file is left just past the header. Raise ValueError if the file changed since it was checked.
+    """
+    data = file.read(header_bytes)
+    detected = detect_encoding(data)
+    if detected is None:
+        raise ValueError(f"{getattr(file, 'name', 'A file')} changed after it was checked.")
+    bom_length, encoding = detected
+    lines = codecs.getincrementaldecoder(encoding)(errors="replace").decode(data[bom_length:])
+
+    if match is None or lines[match.years_start : match.years_end] != format_years(match.start_year, match.end_year):
+        match = g_registry.match(lines)
+        if match is None:
+            raise ValueError(f"{getattr(file, 'name', 'A file')} changed after it was checked.")
+
+    years = format_years(start_year, current_year).encode(encoding)
+    years_start = bom_length + len(lines[: match.years_start].encode(encoding))
+    years_end = bom_length + len(lines[: match.years_end].encode(encoding))
+    return data, years_start, years_end, years
+
 
-    start_year = int(match.group()[14:18])
-    end_year = int(match.group()[-25:-21])
+def fix_edits(file: typing.BinaryIO, start_year: int, current_year: int, match: typing.Any) -> list:
+    """The rewrite of fixer.FixBatch: return the edits of a fix found by check_years or, with --deep, of the notices
+    outside the header.
+    """
+    from megh_pch.copyrighter import deep
 
-    return start_year, end_year
+    if isinstance(match, deep.StrayNotices):
+        return match.edits(file, format_years(start_year, current_year).encode())
+    file.seek(0)
+    _, years_start, years_end, years = locate_years(file, start_year, current_year, match)
+    return [(years_start, years_end, years)]
+
+
+def format_years(start_year: int, end_year: int) -> str:
+    if start_year == end_year:
+        return str(start_year)
+    return f"{start_year}-{end_year}"
+
+
+def parse_copyright_megh(lines: str) -> tuple:
+    """Return the start year and end year of the copyright header. If there is no range, start year will equal end year."""
+    return parse_copyright(lines, "megh")
 
 
 def parse_copyright_apache(lines: str) -> tuple:
     """Return the start year and end year of the copyright header. If there is no range, start year will equal end year."""
-    copyright_regex_apache = R"Copyright 20\d\d(-20\d\d)? Megh Computing, Inc."
-    match = re.search(copyright_regex_apache, lines)
+    return parse_copyright(lines, "apache-2.0")
+
+
+def parse_copyright(lines: str, profile_name: str) -> tuple:
+    """Return the start year and end year of the given profile's notice, ignoring markers."""
+    match = g_registry.profile(profile_name).search(lines)
     if not match:
         return None, None
+    return match.start_year, match.end_year
 
-    start_year = match.group()[10:14]
-    end_year = match.group()[-25:-21]
 
-    return int(start_year), int(end_year)
+def stat_file(filepath: str) -> typing.Optional[os.stat_result]:
+    """Return the stat of a regular file, or None like os.path.isfile would return False."""
+    try:
+        file_stat = os.stat(filepath)
+    except (OSError, ValueError):
+        return None
+    if not stat.S_ISREG(file_stat.st_mode):
+        return None
+    return file_stat
 
 
-def check_file(extensions: list, filepath: str, autofix: bool) -> bool:
-    if not os.path.isfile(filepath):
-        print(f"File does not exist: {filepath}")
+def is_exempt(path_filter: filters.PathFilter, filepath: str) -> bool:
+    """Return True if the file is not checked because of its path. No filesystem access is needed to tell."""
+    return report_exemption(filepath, path_filter.reason(filepath))
+
+
+def report_exemption(filepath: str, reason: typing.Optional[str]) -> bool:
+    """Report why the path filter rejected the file, if it did. Return True if it did."""
+    if reason is None:
         return False
 
-    ext = os.path.splitext(filepath)[1]
-    if ext not in extensions:
+    if reason == "extension":
         if g_verbose:
-            print(f"File extension not on to-check list: {filepath} (automatic success)")
-        return True
+            add_result(filepath, "skipped", f"File extension not on to-check list: {filepath} (automatic success)", level="note")
+        if g_stats is not None:
+            g_stats.count("skipped_extension")
+    elif reason == "name":
+        # __init__.py files are ignored silently.
+        if g_stats is not None:
+            g_stats.count("skipped_init")
+    else:
+        if g_verbose:
+            how = "excluded by --exclude" if reason == "excluded" else "not included by --include"
+            add_result(filepath, "skipped", f"File is {how}: {filepath} (automatic success)", level="note")
+        if g_stats is not None:
+            g_stats.count("skipped_excluded")
+    return True
+
+
+def check_file(path_filter: typing.Union[filters.PathFilter, list], filepath: str, autofix: bool, file_stat: typing.Optional[os.stat_result] = None) -> bool:
+    """Check one file. file_stat is the file's stat if the caller already has it, so it is not stat'ed twice.
 
-    # Ignore __init__.py files.
-    if os.path.basename(filepath) == "__init__.py":
+    A list of extensions can be given instead of a path filter, for a filter without globs.
+    """
+    if not isinstance(path_filter, filters.PathFilter):
+        path_filter = filters.PathFilter(path_filter)
+    if is_exempt(path_filter, filepath):
         return True
+    return check_accepted_file(filepath, autofix, file_stat)
+
+
+def check_accepted_file(filepath: str, autofix: bool, file_stat: typing.Optional[os.stat_result] = None) -> bool:
+    """Check a file the path filter accepted."""
+    return check_notice(filepath, autofix, file_stat)[0]
 
-    # Read the file's tombstone.
+
+def check_notice(filepath: str, autofix: bool, file_stat: typing.Optional[os.stat_result] = None) -> tuple:
+    """Check a file the path filter accepted. Return whether it passed, and the notice found in it as (profile name,
+    start year, end year), or None if there is none. The profile name is None if the cache vouched for the file.
+    """
+    if g_stats is None:
+        return _check_file(filepath, autofix, file_stat)
+
+    start = time.perf_counter()
+    checked = _check_file(filepath, autofix, file_stat)
+    g_stats.file_done(filepath, time.perf_counter() - start)
+    return checked
+
+
+def _check_file(filepath: str, autofix: bool, file_stat: typing.Optional[os.stat_result]) -> tuple:
+    if file_stat is None:
+        with phase("stat"):
+            file_stat = stat_file(filepath)
+    if file_stat is None:
+        add_result(filepath, "missing-file", f"File does not exist: {filepath}")
+        return False, None
+
+    # Skip files that passed on a previous run and have not changed since.
+    if g_cache is not None:
+        with phase("cache"):
+            entry = g_cache.lookup(filepath, file_stat)
+        if entry is not None and entry.passed:
+            return True, (None, entry.start_year, entry.end_year)
+
+    # Read the start of the file into the reused buffer.
+    start = time.perf_counter()
     try:
-        with open(filepath, "r") as file:
-            lines = read_tombstone(file)
+        with phase("read"):
+            size = g_reader.read(filepath, file_stat.st_size)
     except FileNotFoundError as e:
-        print(str(e))
-        return False
+        add_result(filepath, "missing-file", str(e))
+        return False, None
+    if g_stats is not None:
+        g_stats.count("bytes_read", size)
 
-    # Locate the copyright year.
-    # Note: We chose not to support commas. Only YYYY and YYYY-YYYY are supported.
-    if re.search(R"Licensed under the Apache License, Version 2", lines):
-        # Special case for Apache license.
-        start_year, end_year = parse_copyright_apache(lines)
-    else:
-        start_year, end_year = parse_copyright_megh(lines)
-
-    if not start_year or not end_year:
-        print(f"Copyright header check failed for file: {filepath}")
-        print("Copyright message not found in file header.")
-        print_lines = lines.split("\n")
-        print_lines = "\n    > ".join(print_lines)  # type: ignore  # mypy confused about type
-        print_lines = "    > " + print_lines  # type: ignore
-        print(f"Beginning of file:\n{print_lines}")
-        return False
+    checked = check_header(filepath, g_reader.buffer, size, autofix)
+    if checked is None:
+        if g_verbose:
+            add_result(filepath, "skipped", f"File is binary: {filepath} (automatic success)", level="note")
+        if g_stats is not None:
+            g_stats.count("skipped_binary")
+        return True, None
+
+    passed, match = checked
+    if g_deep and not g_reader.buffer.startswith(wide_byte_order_marks, 0, size):
+        with phase("deep"):
+            try:
+                passed = check_deep(filepath, match, size, file_stat.st_size, autofix) and passed
+            except FileNotFoundError as e:
+                add_result(filepath, "missing-file", str(e))
+                return False, None
+
+    if g_cache is not None:
+        g_cache.store(filepath, file_stat, match and match.start_year, match and match.end_year, passed, int((time.perf_counter() - start) * 1e6))
+
+    return passed, match and (match.profile.name, match.start_year, match.end_year)
+
+
+def check_header(filepath: str, data: typing.Union[bytes, bytearray], size: int, autofix: bool, max_lines: int = 9) -> typing.Optional[tuple]:
+    """Check the first size bytes of data, the start of the file. Return whether it passed and the notice found in it,
+    or None if the file is binary.
+
+    The notice is looked for in the leading comments of the file (see comments.header_end), and found in the bytes, so
+    most headers are never decoded. UTF-16 and UTF-32 headers, and headers without a notice, whose first max_lines
+    lines are reported, are decoded and checked by check_tombstone.
+    """
+    if data.startswith(wide_byte_order_marks, 0, size):
+        lines = tombstone_text(bytes(data[:size]), max_lines)
+        if lines is None:
+            return None
+        text = decode_header(bytes(data[:size]))
+        return check_tombstone(filepath, lines, autofix, text[: comments.header_end(filepath, text)])  # type: ignore
+    if data.find(b"\0", 0, size) >= 0:
+        return None
+
+    start = len(codecs.BOM_UTF8) if data.startswith(codecs.BOM_UTF8, 0, size) else 0
+    # Locate the copyright year. One scan finds the profile and its years.
+    with phase("parse"):
+        end = comments.header_end(filepath, data, start, size)
+        misses = g_headers.misses
+        match = g_headers.match_bytes(g_registry, data, end)
+    if g_stats is not None:
+        g_stats.count("header_memo_misses" if g_headers.misses > misses else "header_memo_hits")
+    if not match:
+        # Notices with non-ASCII characters are only found in the decoded header.
+        header = decode_header(bytes(data[:end]))
+        return check_tombstone(filepath, tombstone_text(bytes(data[:size]), max_lines), autofix, header)  # type: ignore
+
+    return check_years(filepath, match, data.count(b"\n", start, match.years_start) + 1, autofix), match
+
+
+def check_tombstone(filepath: str, lines: str, autofix: bool, header: typing.Optional[str] = None) -> tuple:
+    """Check the tombstone read from the file. Return whether it passed and the notice found in it, if any.
+
+    The notice is looked for in header, the decoded leading comments of the file, if given, and else in lines.
+    """
+    if header is None:
+        header = lines
+    # Locate the copyright year. One scan finds the profile and its years.
+    with phase("parse"):
+        match = g_registry.match(header)
+    if not match:
+        add_result(filepath, "missing-notice", "Copyright message not found in file header.", excerpt=lines)
+        return False, None
+
+    return check_years(filepath, match, header.count("\n", 0, match.years_start) + 1, autofix), match
+
+
+def check_years(filepath: str, match: profiles.HeaderMatch, line: int, autofix: bool) -> bool:
+    """Check the years of the notice found on the given line of the file. Return whether they passed."""
+    start_year, end_year = match.start_year, match.end_year
 
     # Verify the given copyright year is the current year.
-    current_year = datetime.date.today().year
+    current_year = time.localtime().tm_year
 
     if start_year > current_year:
-        print(f"Copyright header check failed for file: {filepath}")
-        print(f"File header copyright start year {start_year} is in the future.")
+        add_result(filepath, "future-year", f"File header copyright start year {start_year} is in the future.", line=line)
         return False
 
     if start_year > end_year:
-        print(f"Copyright header check failed for file: {filepath}")
-        print(f"File header copyright start year {start_year} must be smaller than end year {end_year}.")
+        add_result(filepath, "backward-years", f"File header copyright start year {start_year} must be smaller than end year {end_year}.", line=line)
         return False
 
+    correct_start_year = start_year
+    if g_history is not None:
+        correct_start_year = g_history.first_year(filepath, current_year)
+        if start_year != correct_start_year:
+            message = f"File header copyright start year {start_year} does not match year {correct_start_year} the file was added to git."
+            add_result(filepath, "wrong-start-year", message, line=line)
+
     if end_year != current_year:
-        print(f"Copyright header check failed for file: {filepath}")
-        print(f"File header copyright year {end_year} does not match current year {current_year}.")
-        if not autofix:
-            return False
+        add_result(filepath, "stale-year", f"File header copyright year {end_year} does not match current year {current_year}.", line=line)
+
+    if start_year == correct_start_year and end_year == current_year:
+        return True
+
+    if not autofix:
+        return False
+    else:
+        add_result(filepath, "fixed", f"File will be overwritten with the correct year: {filepath}", level="note", line=line)
+        with phase("fix"):
+            if g_fixes is not None:
+                g_fixes.add(filepath, correct_start_year, current_year, match)
+            else:
+                write_current_year(filepath, correct_start_year, current_year, match)
+        if g_stats is not None:
+            g_stats.count("files_rewritten")
+        # Return false if a file was modified.
+        return False
+
+
+def check_deep(filepath: str, header: typing.Optional[profiles.HeaderMatch], size: int, file_size: int, autofix: bool) -> bool:
+    """Check the notices outside the header of the file, found in the whole of it. Return whether they passed.
+
+    A notice with the years the header should have is a warning. Any other is an error, whose years --fix corrects.
+    """
+    from megh_pch.copyrighter import deep
+
+    notices = deep.find_notices(g_registry, filepath, g_reader.buffer, size, file_size)
+    if g_stats is not None:
+        g_stats.count("bytes_scanned", file_size)
+
+    years = None
+    if header is not None:
+        current_year = time.localtime().tm_year
+        years = g_history.first_year(filepath, current_year) if g_history is not None else header.start_year, current_year
+    strays = []
+    for notice, line in notices:
+        if header is not None and notice.years_start == header.years_start:
+            continue
+        found = format_years(notice.start_year, notice.end_year)
+        if (notice.start_year, notice.end_year) == years:
+            add_result(filepath, "duplicate-notice", f"Copyright notice repeated at byte {notice.years_start}: {found}.", level="warning", line=line)
         else:
-            print(f"File will be overwritten with the correct year: {filepath}")
-            write_current_year(filepath, start_year, current_year)
-            # Return false if a file was modified.
-            return False
+            add_result(filepath, "stray-notice", f"Copyright notice outside the header at byte {notice.years_start} has years {found}.", line=line)
+            strays.append((notice.years_start, notice.years_end, found.encode()))
+    if not strays:
+        return True
 
-    return True
+    # Stray notices are only fixed in a batch, whose edits are all made to the file as it was checked.
+    if autofix and years is not None and g_fixes is not None:
+        add_result(filepath, "fixed", f"Notices outside the header will be overwritten with the correct years: {filepath}", level="note")
+        g_fixes.add(filepath, years[0], years[1], deep.StrayNotices(strays))
+        if g_stats is not None:
+            g_stats.count("files_rewritten")
+    return False
+
+
+def check_git(path_filter: filters.PathFilter, paths: list, autofix: bool, rev: str, in_shard: "typing.Optional[shard.Shard]" = None) -> typing.Iterator[tuple]:
+    """Check the files' contents in the index (rev ":") or a commit. Yield (path, passed) in input order.
+
+    All blobs are read through one "git cat-file --batch" process, and none of the files are opened. With in_shard, only
+    the files of that shard are checked, once directories are expanded to the files in them.
+    """
+    from megh_pch.copyrighter import gitio
+
+    with phase("git-list"):
+        root = gitio.toplevel(os.getcwd())
+    with gitio.BlobReader(root) as blob_reader:
+        with phase("git-list"):
+            walk = None
+            if g_manifest is None:
+                blobs = gitio.list_blobs(root, rev)
+            else:
+                # Only the trees that were not verified before are read.
+                relative = [gitio.relative_path(root, path) for path in paths]
+                walk = gitio.TreeWalk(blob_reader, gitio.root_tree(root, rev), ["" if path == "." else path for path in relative], g_manifest.is_verified)
+                blobs = walk.blobs
+            paths = gitio.expand_directories(root, blobs, paths, path_filter, walk.directories if walk is not None else ())
+        if in_shard is not None:
+            # Blobs have no stat, so sizes are not known up front.
+            paths = [path for path in paths if in_shard.owns(path)]
+        where = "the index" if rev == gitio.index_rev else rev
 
+        # Find the blobs that need reading first, so they can all be requested at once.
+        exempt = set()
+        to_read = []
+        for path in paths:
+            if is_exempt(path_filter, path):
+                exempt.add(path)
+                continue
+            oid = blobs.get(gitio.relative_path(root, path))
+            if oid is not None and not (g_cache is not None and g_cache.is_verified_blob(blob_key(oid, path))):
+                to_read.append(oid)
 
-def get_extensions(extensions_file: str) -> list:
+        with phase("git-read"):
+            headers = dict(blob_reader.read_headers(list(dict.fromkeys(to_read)), header_bytes))
+
+    results: typing.Dict[str, bool] = {}
+    for path in paths:
+        if out_of_budget():
+            # The trees of the files not checked cannot be recorded.
+            return
+        if path in exempt:
+            yield path, True
+            continue
+
+        relative_path = gitio.relative_path(root, path)
+        oid = blobs.get(relative_path)
+        if oid is None:
+            if walk is not None and walk.is_skipped(relative_path):
+                # In a verified tree.
+                yield path, True
+                continue
+            add_result(path, "missing-file", f"File does not exist in {where}: {path}")
+            yield path, False
+            continue
+
+        if oid not in headers:
+            # Verified on an earlier run, under the same comment syntax.
+            results[relative_path] = True
+            yield path, True
+            continue
+
+        data = headers[oid]
+        if data is None:
+            add_result(path, "missing-file", f"Object {oid} is missing from the repository for file: {path}")
+            yield path, False
+            continue
+
+        if g_stats is not None:
+            g_stats.count("bytes_read", len(data))
+        # Fixes go to the working tree. pre-commit stashes unstaged changes, so it matches the index.
+        checked = check_header(path, data, len(data), autofix)
+        if checked is None:
+            if g_verbose:
+                add_result(path, "skipped", f"File is binary: {path} (automatic success)", level="note")
+            if g_stats is not None:
+                g_stats.count("skipped_binary")
+            results[relative_path] = True
+            yield path, True
+            continue
+
+        passed, _ = checked
+        if passed and g_cache is not None:
+            g_cache.add_verified_blob(blob_key(oid, path))
+        results[relative_path] = passed
+        yield path, passed
+
+    if walk is not None:
+        record_verified_trees(walk, results, root, path_filter)
+
+
+def blob_key(oid: str, path: str) -> str:
+    """Return the key of a blob in the cache: its object ID, and the extension that picks its comment syntax, which
+    decides where its header ends. The same contents under another extension can pass or fail differently.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    return oid + extension if extension in comments.syntaxes else oid
+
+
+def record_verified_trees(walk: "gitio.TreeWalk", results: typing.Dict[str, bool], root: str, path_filter: filters.PathFilter) -> None:
+    """Add the trees whose files all passed to the manifest, deepest first.
+
+    A file the filter skips by its path (--include, --exclude) could be checked elsewhere, where the same tree may be
+    found again, so a tree with one is not recorded. Files skipped by their extension or name are skipped everywhere.
+    """
+    verified = set(walk.skipped)
+    for directory, oid, files, subdirectories in reversed(walk.trees):
+        if not all(subdirectory in verified for subdirectory in subdirectories):
+            continue
+        for path in files:
+            if path in results:
+                if not results[path]:
+                    break
+            elif path_filter.reason(os.path.join(root, *path.split("/"))) not in ("extension", "name"):
+                break
+        else:
+            verified.add(directory)
+            g_manifest.add(oid)  # type: ignore
+
+
+def get_extensions(extensions_file: typing.Optional[str]) -> list:
     # Load extensions from file if filename is given.
     if not extensions_file:
         return list(default_extensions)
@@ -184,36 +635,412 @@ def get_extensions(extensions_file: str) -> list:
     return extensions
 
 
-def check_all(extensions_file: str, filenames: list, autofix: bool) -> bool:
+def get_excludes(globs: list, exclude_files: list, dir_names: list) -> typing.Optional[list]:
+    """Return the exclude globs given on the command line and in the exclude files, or None if a file is unreadable."""
+    excludes = list(globs)
+    for exclude_file in exclude_files:
+        try:
+            excludes.extend(read_file(os.path.abspath(exclude_file)))
+        except OSError as e:
+            print(str(e))
+            return None
+    excludes.extend(f"{name.strip('/')}/" for name in dir_names)
+    return excludes
+
+
+def get_registry(profiles_file: str) -> typing.Optional[profiles.HeaderRegistry]:
+    """Return the default header profiles plus the ones in the given profiles file."""
+    if not profiles_file:
+        return profiles.HeaderRegistry()
+
+    profiles_file = os.path.abspath(profiles_file)
+
+    try:
+        return profiles.HeaderRegistry(list(profiles.default_profiles) + profiles.load_profiles(profiles_file))
+    except (OSError, ValueError) as e:
+        print(str(e))
+        return None
+
+
+def parse_jobs(value: str) -> int:
+    """Parse the --jobs argument. "auto" uses one job per CPU."""
+    if value == "auto":
+        return os.cpu_count() or 1
+
+    try:
+        jobs = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'expected a positive integer or "auto", got "{value}"')
+
+    if jobs < 1:
+        raise argparse.ArgumentTypeError(f'expected a positive integer or "auto", got "{value}"')
+    return jobs
+
+
+def worker_settings(recorder: "typing.Optional[cache.VerificationCache]", filepaths: list) -> dict:
+    """Return the globals a worker process needs to check the files like this process would."""
+    from megh_pch.copyrighter import fixer
+
+    return {
+        "g_verbose": g_verbose,
+        "g_cache": recorder,
+        "g_registry": g_registry,
+        "g_history": g_history.restrict(filepaths) if g_history is not None else None,
+        "g_stats": stats.Stats(g_stats.slowest) if g_stats is not None else None,
+        "g_reporter": report.Collector(),
+        "g_fixes": fixer.FixBatch() if g_fixes is not None else None,
+        "g_deep": g_deep,
+    }
+
+
+def check_files_captured(autofix: bool, settings: dict, filepaths: list) -> tuple:
+    """Run check_notice in a worker process.
+
+    Return the result, notice, findings, new cache entries, and queued fixes for each file, and the chunk's stats.
+    """
+    # The worker's cache only records entries. Lookups were already done by the parent process.
+    globals().update(settings)
+
+    results = []
+    for filepath in filepaths:
+        passed, notice = check_notice(filepath, autofix)
+        results.append((passed, notice, g_reporter.take(), g_cache.take_updates() if g_cache else None, g_fixes.take() if g_fixes else None))  # type: ignore
+    return results, g_stats.to_dict() if g_stats is not None else None
+
+
+def cached_notice(filepath: str) -> typing.Optional[tuple]:
+    """Return the notice like check_notice does if the cache says the file passed and it has not changed since, else
+    None.
+    """
+    if g_cache is None:
+        return None
+    with phase("stat"):
+        file_stat = stat_file(filepath)
+    if file_stat is None:
+        return None
+    with phase("cache"):
+        entry = g_cache.lookup(filepath, file_stat)
+    if entry is None or not entry.passed:
+        return None
+    return None, entry.start_year, entry.end_year
+
+
+def chunk_results(future: typing.Any) -> list:
+    """Return the per-file results of a check_files_captured call, merging the worker's stats into ours."""
+    results, worker_stats = future.result()
+    if worker_stats is not None:
+        g_stats.merge(worker_stats)  # type: ignore
+    return results
+
+
+def check_parallel(path_filter: filters.PathFilter, expanded: typing.Iterable[tuple], autofix: bool, jobs: int) -> typing.Iterator[tuple]:
+    """Check the entries of expand_paths in a process pool. Yield (path, passed, notice, findings) in input order, like
+    check_expanded.
+
+    Entries are taken parallel_window at a time, so a long stream of them is never held in memory at once. The next
+    window is submitted before the results of the last one are consumed, which keeps the workers busy across windows.
+    """
+    import concurrent.futures
+    import itertools
+
+    from megh_pch.copyrighter import cache
+
+    recorder = cache.VerificationCache(None, paranoid=g_cache.paranoid) if g_cache is not None else None
+    expanded = iter(expanded)
+    with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as executor:
+        previous = submitted = None
+        try:
+            while not out_of_budget():
+                window = list(itertools.islice(expanded, parallel_window))
+                if not window:
+                    break
+                submitted = submit_window(executor, path_filter, window, autofix, jobs, recorder)
+                if previous is not None:
+                    yield from collect_window(*previous)
+                previous = submitted
+            if previous is not None:
+                yield from collect_window(*previous)
+        finally:
+            # If the budget ran out, or the caller stopped, the chunks not started yet are dropped, not waited for.
+            for window_args in (previous, submitted):
+                if window_args is not None:
+                    for future in window_args[-1]:
+                        future.cancel()
+
+
+def submit_window(executor: typing.Any, path_filter: filters.PathFilter, entries: list, autofix: bool, jobs: int, recorder: "typing.Optional[cache.VerificationCache]") -> tuple:
+    """Submit the files of one window to the pool, costliest first. Return the arguments of collect_window."""
+    from megh_pch.copyrighter import schedule
+
+    paths = [path for path, _, _ in entries]
+    file_stats = {path: file_stat for path, file_stat, _ in entries}
+    # Each file is checked once per window, so two workers can never fix the same file at the same time.
+    unique_paths = list(dict.fromkeys(paths))
+    # Files the filter rejects are reported here, in order, and never sent to a worker.
+    reasons = {path: path_filter.reason(path) for path in unique_paths}
+    # Path -> (passed, notice), for cached files now, and for the others as their results come.
+    results: typing.Dict[str, tuple] = {}
+    for path in unique_paths:
+        notice = cached_notice(path) if reasons[path] is None else None
+        if notice is not None:
+            results[path] = True, notice
+    to_check = [path for path in unique_paths if path not in results and reasons[path] is None]
+
+    # --deep reads whole files. Otherwise only the header is read, however large the file.
+    max_bytes = None if g_deep else header_bytes
+    costs = [schedule.predicted_cost(file_stats[path], max_bytes, g_cache.past_check_us(path) if g_cache is not None else None) for path in to_check]
+    chunks = schedule.plan_chunks(to_check, costs, jobs)
+    # Each chunk carries only the settings its files need.
+    futures = [executor.submit(check_files_captured, autofix, worker_settings(recorder, chunk), chunk) for chunk in chunks]
+    return paths, reasons, results, [path for chunk in chunks for path in chunk], futures
+
+
+def collect_window(paths: list, reasons: dict, results: typing.Dict[str, tuple], submitted: list, futures: list) -> typing.Iterator[tuple]:
+    """Yield (path, passed, notice, findings) for the files of one window, in order, as their chunks finish. Stop if
+    the budget runs out.
+
+    submitted are the paths sent to the workers, in the order of the chunks of futures. Results are consumed in that
+    order, so the output does not depend on which worker finishes first.
+    """
+    pending = zip(submitted, (result for future in futures for result in chunk_results(future)))
+    # Results that came before those of earlier paths of the window, since costly files were submitted first.
+    ready: typing.Dict[str, tuple] = {}
+    for path in paths:
+        if out_of_budget():
+            return
+        if reasons[path] is not None:
+            report_exemption(path, reasons[path])
+            yield path, True, None, []
+        elif path not in results:
+            while path not in ready:
+                unique_path, result = next(pending)
+                ready[unique_path] = result
+            passed, notice, findings, updates, fixes = ready.pop(path)
+            results[path] = passed, notice
+            if updates:
+                g_cache.merge(updates)  # type: ignore
+            if fixes:
+                g_fixes.extend(fixes)  # type: ignore
+            yield path, passed, notice, findings
+        else:
+            # Cached or repeated path. A repeated path's findings were already reported.
+            yield (path, *results[path], [])
+
+
+def check_expanded(expanded: typing.Iterable[tuple], path_filter: filters.PathFilter, autofix: bool, jobs: int) -> typing.Generator[tuple, None, None]:
+    """Check the entries of expand_paths, in a process pool if jobs > 1. Yield (path, passed, notice, findings) in input
+    order, where notice is as check_notice returns it, or None for files that were not checked. Stop if the budget runs
+    out.
+
+    The findings of files checked in this process go straight to g_reporter, and only those of workers are yielded.
+    """
+    if jobs > 1:
+        import itertools
+
+        # A single file is checked here rather than paying for a process pool.
+        expanded = iter(expanded)
+        head = list(itertools.islice(expanded, 2))
+        expanded = itertools.chain(head, expanded)
+        if len(head) > 1:
+            yield from check_parallel(path_filter, expanded, autofix, jobs)
+            return
+
+    for path, file_stat, reason in expanded:
+        if out_of_budget():
+            return
+        if report_exemption(path, reason):
+            yield path, True, None, []
+        else:
+            yield (path, *check_notice(path, autofix, file_stat), [])
+
+
+def out_of_budget() -> bool:
+    """Return whether --max-failures or --time-budget stops the check before the next file."""
+    return g_budget is not None and g_budget.exhausted()
+
+
+def read_filenames(file: typing.BinaryIO, separator: bytes = b"\n") -> typing.Iterator[str]:
+    """Yield the paths in a --files-from stream as they are read. Empty entries are skipped.
+
+    The stream is read a chunk at a time, so memory stays flat however many paths it holds. Paths are decoded like
+    os.listdir decodes them, so undecodable names round-trip.
+    """
+    rest = b""
+    while True:
+        chunk = file.read(files_from_chunk_bytes)
+        if not chunk:
+            break
+        entries = (rest + chunk).split(separator)
+        rest = entries.pop()
+        for entry in entries:
+            if separator == b"\n":
+                entry = entry.rstrip(b"\r")
+            if entry:
+                yield os.fsdecode(entry)
+    if separator == b"\n":
+        rest = rest.rstrip(b"\r")
+    if rest:
+        yield os.fsdecode(rest)
+
+
+def expand_paths(filenames: typing.Iterable[str], path_filter: filters.PathFilter) -> typing.Iterator[tuple]:
+    """Yield (absolute path, stat or None, reason the filter rejected it or None) for each file argument, and for each
+    file to check under each directory argument.
+
+    Rejected arguments are not stat'ed, unless they could be directories: names without an extension, or given with a
+    trailing slash. Files are yielded as the directories are walked, so checking starts right away.
+    """
+    for filename in filenames:
+        path = os.path.abspath(filename)
+        reason = path_filter.reason(path)
+        if reason is not None and not (reason == "extension" and (filename.endswith(("/", os.sep)) or not os.path.splitext(path)[1])):
+            yield path, None, reason
+            continue
+
+        try:
+            with phase("stat"):
+                file_stat = os.stat(path)
+        except (OSError, ValueError):
+            # check_accepted_file reports it.
+            yield path, None, reason
+            continue
+
+        if stat.S_ISDIR(file_stat.st_mode):
+            from megh_pch.copyrighter import walk
+
+            for entry in walk.walk(path, path_filter):
+                with phase("stat"):
+                    entry_stat = entry.stat()
+                yield entry.path, entry_stat, None
+        else:
+            yield path, file_stat if stat.S_ISREG(file_stat.st_mode) else None, reason
+
+
+def check_all(
+    extensions_file: typing.Optional[str],
+    filenames: typing.Iterable[str],
+    autofix: bool,
+    jobs: int = 1,
+    rev: typing.Optional[str] = None,
+    include: typing.Iterable[str] = (),
+    exclude: typing.Iterable[str] = (),
+    in_shard: "typing.Optional[shard.Shard]" = None,
+) -> bool:
     extensions = get_extensions(extensions_file)
     if not extensions:
         return False
+    path_filter = filters.PathFilter(extensions, include, exclude)
+
+    if g_cache is not None:
+        from megh_pch.copyrighter import cache
 
-    # Check each file.
+        # With --start-year-from-git, every new commit can change a verdict.
+        history_head = g_history.head if g_history is not None else ""
+        with phase("cache-load"):
+            g_cache.load(cache.make_fingerprint(time.localtime().tm_year, extensions, g_registry.fingerprint + history_head + (":deep" if g_deep else "")))
+    if g_manifest is not None:
+        from megh_pch.copyrighter import manifest
+
+        with phase("cache-load"):
+            g_manifest.load(manifest.make_fingerprint(time.localtime().tm_year, extensions, g_registry.fingerprint, g_history.head if g_history is not None else ""))
+
+    global g_fixes
+    g_fixes = None
+    if autofix:
+        from megh_pch.copyrighter import fixer
+
+        g_fixes = fixer.FixBatch()
+    try:
+        return _check_all(filenames, path_filter, autofix, jobs, rev, in_shard)
+    finally:
+        g_fixes = None
+
+
+def _check_all(filenames: typing.Iterable[str], path_filter: filters.PathFilter, autofix: bool, jobs: int, rev: typing.Optional[str], in_shard: "typing.Optional[shard.Shard]") -> bool:
+    # Check each file as the file arguments come, so a long --files-from list is never held in memory at once.
     failed_paths = []
-    for rel_path in filenames:
-        path = os.path.abspath(rel_path)
-        if not check_file(extensions, path, autofix):
-            failed_paths.append(path)
-            print()
+    checked = 0
+    if rev is not None:
+        from megh_pch.copyrighter import gitio
 
-    if g_verbose:
-        if failed_paths:
-            print("Files failed:")
-            for path in failed_paths:
-                print(f"    {path}")
+        paths = [os.path.abspath(filename) for filename in filenames]
+        try:
+            for path, passed in check_git(path_filter, paths, autofix, rev, in_shard):
+                checked += 1
+                if g_budget is not None:
+                    g_budget.record(passed)
+                g_reporter.end_file(path, passed)
+                if not passed:
+                    failed_paths.append(path)
+        except gitio.GitError as e:
+            g_reporter.flush()
+            print(str(e))
+            return False
+    else:
+        expanded: typing.Iterable[tuple] = expand_paths(filenames, path_filter)
+        if in_shard is not None:
+            expanded = in_shard.select(expanded, header_bytes)
+        for path, passed, _, findings in check_expanded(expanded, path_filter, autofix, jobs):
+            checked += 1
+            if g_budget is not None:
+                g_budget.record(passed)
+            for finding in findings:
+                g_reporter.add(finding)
+            g_reporter.end_file(path, passed)
+            if not passed:
+                failed_paths.append(path)
 
-        print(f"{len(failed_paths)}/{len(filenames)} files failed.\n")
+    if g_fixes:
+        try:
+            with phase("fix"):
+                g_fixes.commit(fix_edits)
+        except (OSError, ValueError) as e:
+            # Every file was left as it was.
+            g_reporter.flush()
+            print(f"Could not fix the files, none were changed: {e}")
+            return False
+
+    if g_cache is not None:
+        with phase("cache-save"):
+            g_cache.save()
+    if g_manifest is not None:
+        with phase("cache-save"):
+            try:
+                g_manifest.save()
+            except OSError as e:
+                print(f"Could not save the tree manifest: {e}")
+
+    if g_stats is not None:
+        g_stats.count("files_seen", checked)
+        g_stats.count("files_failed", len(failed_paths))
+        if g_cache is not None:
+            g_stats.count("cache_hits", g_cache.hits)
+            g_stats.count("cache_misses", g_cache.misses)
+        if g_manifest is not None:
+            g_stats.count("trees_skipped", g_manifest.hits)
+
+    if g_verbose:
+        g_reporter.summary(failed_paths, checked)
+    with phase("report"):
+        g_reporter.finish()
 
     if failed_paths:
         return False
-    return True
+    # Files were left unchecked, which may have failed.
+    return g_budget is None or g_budget.reason is None
+
+
+class ArgumentParser(argparse.ArgumentParser):
+    """Ends the help with the Python version, which is only looked up when the help is printed."""
+
+    def format_help(self) -> str:
+        self.epilog = f"You ran with Python {sys.version}."
+        return super().format_help()
 
 
 def make_parser() -> argparse.ArgumentParser:
-    parser = argparse.ArgumentParser(
-        description="Verify the copyright tombstone in a file.",
-        epilog=f"You ran with Python {sys.version}.",
+    parser = ArgumentParser(
+        description='Verify the copyright tombstone in a file. Run "copyrighter rollover --help" for updating every stale end year at once, and "copyrighter merge --help" for combining the results of --shard runs.',
     )
     parser.add_argument(
         "-f",
@@ -221,7 +1048,37 @@ def make_parser() -> argparse.ArgumentParser:
         action="store_true",
         help="If given, automatically update the copyright year to the current year.",
     )
-    parser.add_argument("filename", help="The path(s) of the file(s) to check.", nargs="+", default=[])
+    parser.add_argument(
+        "--recover",
+        choices=recover_modes,
+        default=None,
+        help="Finish (resume) or undo (rollback) the fixes of a --fix run that was interrupted, from its journal in the working directory.",
+    )
+    parser.add_argument(
+        "filename",
+        help="The path(s) of the file(s) to check. Directories are searched for files with the checked extensions.",
+        nargs="*",
+        default=[],
+    )
+    parser.add_argument(
+        "--files-from",
+        default=None,
+        metavar="FILE",
+        help='Also check the paths listed in this file, one per line, or "-" for standard input. The list is read as the files are checked, so it can be of any length.',
+    )
+    parser.add_argument(
+        "--stdin",
+        dest="files_from",
+        action="store_const",
+        const="-",
+        help="Also check the paths listed on standard input. The same as --files-from -.",
+    )
+    parser.add_argument(
+        "-0",
+        "--null",
+        action="store_true",
+        help="The paths of --files-from and --stdin are separated by NUL bytes rather than newlines, as printed by find -print0 and git ls-files -z.",
+    )
     parser.add_argument("-v", "--verbose", action="store_true", help="Print more context.")
     parser.add_argument(
         "-e",
@@ -229,22 +1086,378 @@ def make_parser() -> argparse.ArgumentParser:
         default=None,
         help="The path of a file with a list of extensions to check.\nDefaults: {', '.join(default_extensions)}.",
     )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=parse_jobs,
+        default=1,
+        help='The number of files to check in parallel, or "auto" for one per CPU. Defaults to 1.',
+    )
+    parser.add_argument(
+        "--max-failures",
+        type=int,
+        default=None,
+        metavar="N",
+        help=f"Stop once N files have failed, and exit with {stopped_exit_code}. The files not checked yet are not reported.",
+    )
+    parser.add_argument(
+        "--time-budget",
+        type=float,
+        default=None,
+        metavar="SECONDS",
+        help=f"Stop checking files once this many seconds have passed, and exit with {stopped_exit_code}, to get the findings so far within a fixed time.",
+    )
+    parser.add_argument(
+        "--include",
+        action="append",
+        default=[],
+        metavar="GLOB",
+        help="Only check files that match this gitignore-style glob, relative to the working directory. Can be repeated.",
+    )
+    parser.add_argument(
+        "--exclude",
+        action="append",
+        default=[],
+        metavar="GLOB",
+        help="Do not check files that match this gitignore-style glob, or are under a directory that does. Can be repeated.",
+    )
+    parser.add_argument(
+        "--exclude-from",
+        action="append",
+        default=[],
+        metavar="FILE",
+        help="Read more --exclude globs from this file, one per line. Can be repeated.",
+    )
+    parser.add_argument(
+        "--exclude-dir",
+        action="append",
+        default=[],
+        metavar="NAME",
+        help="Do not check files under any directory with this name, e.g. a vendored dependency directory. Can be repeated.",
+    )
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument(
+        "--staged",
+        action="store_true",
+        help="Check the files' staged contents in the git index instead of the working tree.",
+    )
+    source.add_argument(
+        "--rev",
+        default=None,
+        help="Check the files' contents in the given git commit instead of the working tree. Cannot be used with --fix.",
+    )
+    parser.add_argument(
+        "--tree-manifest",
+        default=None,
+        metavar="FILE",
+        help="With --staged or --rev, skip the directories whose git tree passed before, as recorded in this file, and record the trees that pass.",
+    )
+    parser.add_argument(
+        "--shard",
+        type=str,
+        default=None,
+        metavar="INDEX/COUNT",
+        help='Only check the files of shard INDEX of COUNT, e.g. "2/8", numbered from 1. Every runner must give the same paths from the same directory.',
+    )
+    parser.add_argument(
+        "--shard-weight",
+        choices=shard_weights,
+        default="count",
+        help="Split the files by a hash of their paths (count), or so that shards take about the same time (size). Defaults to count.",
+    )
+    parser.add_argument(
+        "--results",
+        default=None,
+        metavar="FILE",
+        help='Also write the verdict and findings to this JSON file, to be combined by "copyrighter merge".',
+    )
+    parser.add_argument(
+        "--start-year-from-git",
+        action="store_true",
+        help="Require the start year to be the year the file was added to git. With --fix, also correct the start year.",
+    )
+    parser.add_argument(
+        "--deep",
+        action="store_true",
+        help="Also search the whole of each file for copyright notices, and report each one outside the header. Those with other years than the header's fail, and --fix corrects them. Cannot be used with --staged or --rev.",
+    )
+    parser.add_argument(
+        "-p",
+        "--profiles",
+        default=None,
+        help="The path of a JSON file with extra header profiles to accept. See the README for the format.",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=None,
+        help="If given, remember files that passed in this directory (e.g. .cache/copyrighter) and skip them while they are unchanged.",
+    )
+    parser.add_argument(
+        "--cache-paranoid",
+        action="store_true",
+        help="Also compare a hash of the file contents before trusting a cache entry.",
+    )
+    parser.add_argument(
+        "--cache-max-entries",
+        type=int,
+        default=None,
+        help="The maximum number of files kept in the cache. The least recently used are evicted. Defaults to 500000.",
+    )
+    parser.add_argument(
+        "--format",
+        choices=report.formats,
+        default="text",
+        help="How findings are printed: text, JSON Lines (one object per finding), or a SARIF log for code scanning. Defaults to text.",
+    )
+    parser.add_argument(
+        "--max-details",
+        type=int,
+        default=None,
+        help="With text output, print full details for this many failing files only, and one line per finding after that.",
+    )
+    parser.add_argument(
+        "--stats",
+        choices=("text", "json"),
+        default=None,
+        help="Print the time spent in each phase, counters, and the slowest files to stderr, as text or JSON.",
+    )
+    parser.add_argument(
+        "--stats-slowest",
+        type=int,
+        default=stats.default_slowest,
+        help=f"The number of slowest files listed by --stats. Defaults to {stats.default_slowest}.",
+    )
+    parser.add_argument(
+        "--profile",
+        default=None,
+        help="Write a cProfile dump of the check to this file, for viewing with pstats or snakeviz.",
+    )
+    parser.set_defaults(command="check")
     return parser
 
 
-def main() -> int:
-    # Parse the arguments.
-    parser = make_parser()
-    args = parser.parse_args()
+def reuse(state: typing.Optional[dict], key: tuple, make: typing.Callable[[], typing.Any]) -> typing.Any:
+    """Return the object kept in state under key, making it first if needed. Without a state, always make a new one.
+
+    A long-lived server passes the same state to every run, so compiled profiles and loaded caches are kept warm.
+    """
+    if state is None:
+        return make()
+    if key not in state:
+        made = make()
+        if made is None:
+            return None
+        state[key] = made
+    return state[key]
 
-    global g_verbose
-    if args.verbose:
-        g_verbose = True
 
-    if check_all(args.extensions, args.filename, args.fix):
+def file_key(filepath: typing.Optional[str]) -> tuple:
+    """Identify a file's current contents by its path and stat, so an object built from it is rebuilt when it changes."""
+    if not filepath:
+        return (None,)
+    filepath = os.path.abspath(filepath)
+    try:
+        file_stat = os.stat(filepath)
+    except OSError:
+        return (filepath,)
+    return filepath, file_stat.st_size, file_stat.st_mtime_ns
+
+
+def run(args: argparse.Namespace, state: typing.Optional[dict] = None) -> int:
+    """Run a check with parsed arguments and return the exit code. See reuse for the state."""
+    if args.command != "check":
+        return subcommand(args.command).run(args, state)  # type: ignore
+
+    global g_verbose, g_cache, g_manifest, g_registry, g_history, g_stats, g_reporter, g_deep, g_budget
+    # Every global is set, since a server runs many checks in one process.
+    g_verbose = args.verbose
+    g_deep = args.deep
+    g_budget = None
+    g_reporter = report.make_reporter(args.format, args.max_details)
+    if args.results:
+        g_reporter = report.Recorder(g_reporter)
+    g_history = None
+    g_cache = None
+    g_manifest = None
+    if args.tree_manifest:
+        from megh_pch.copyrighter import manifest
+
+        g_manifest = manifest.TreeManifest(args.tree_manifest)
+    if g_stats is None or not args.stats:
+        g_stats = stats.Stats(args.stats_slowest) if args.stats else None
+
+    if args.recover or args.fix:
+        from megh_pch.copyrighter import fixer
+
+        journal = fixer.journal_path()
+    if args.recover:
+        if not os.path.exists(journal):
+            print(f"There is no interrupted --fix run to recover: {journal} does not exist.")
+        else:
+            try:
+                count = fixer.recover(journal, args.recover)
+            except (OSError, ValueError) as e:
+                print(f"Could not recover the interrupted --fix run: {e}")
+                return 1
+            print(f"{'Finished' if args.recover == 'resume' else 'Undid'} the interrupted --fix run: {count} file(s) {'fixed' if args.recover == 'resume' else 'restored'}.")
+        if not args.filename and not args.files_from:
+            return 0
+    elif args.fix and os.path.exists(journal):
+        print(f"An interrupted --fix run left {journal}. Run again with --recover resume or --recover rollback.")
+        return 1
+
+    registry = reuse(state, ("registry",) + file_key(args.profiles), lambda: get_registry(args.profiles))
+    if registry is None:
+        return 1
+    g_registry = registry
+
+    excludes = get_excludes(args.exclude, args.exclude_from, args.exclude_dir)
+    if excludes is None:
+        return 1
+
+    if args.start_year_from_git:
+        from megh_pch.copyrighter import gitio
+
+        try:
+            with phase("history"):
+                g_history = gitio.History.load(gitio.toplevel(os.getcwd()), args.cache_dir)
+        except gitio.GitError as e:
+            print(str(e))
+            return 1
+
+    if args.cache_dir:
+        from megh_pch.copyrighter import cache
+
+        max_entries = cache.default_max_entries if args.cache_max_entries is None else args.cache_max_entries
+        cache_key = ("cache", os.path.abspath(args.cache_dir), args.cache_paranoid, max_entries)
+        g_cache = reuse(state, cache_key, lambda: cache.VerificationCache(args.cache_dir, paranoid=args.cache_paranoid, max_entries=max_entries))
+
+    filenames: typing.Iterable[str] = args.filename
+    files_from = None
+    if args.files_from:
+        import itertools
+
+        try:
+            files_from = sys.stdin.buffer if args.files_from == "-" else open(args.files_from, "rb")
+        except OSError as e:
+            print(f"Could not read the list of files: {e}")
+            return 1
+        filenames = itertools.chain(args.filename, read_filenames(files_from, b"\0" if args.null else b"\n"))
+
+    profiler = None
+    if args.profile:
+        import cProfile
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+    if args.max_failures is not None or args.time_budget is not None:
+        from megh_pch.copyrighter import schedule
+
+        g_budget = schedule.Budget(args.max_failures, args.time_budget)
+    try:
+        with phase("total"):
+            passed = check_all(args.extensions, filenames, args.fix, args.jobs, args.rev, args.include, excludes, args.shard)
+    finally:
+        if files_from is not None and files_from is not sys.stdin.buffer:
+            files_from.close()
+    if profiler is not None:
+        profiler.disable()
+        profiler.dump_stats(args.profile)
+
+    if args.results:
+        from megh_pch.copyrighter import shard
+
+        try:
+            shard.write_results(args.results, args.shard, passed, g_reporter)  # type: ignore
+        except OSError as e:
+            print(f"Could not write the results file: {e}")
+            return 1
+
+    if g_stats is not None:
+        print(g_stats.format(args.stats), file=sys.stderr)
+        g_stats = None
+
+    if g_budget is not None and g_budget.reason is not None:
+        # On stderr, so --format jsonl and sarif output can still be parsed.
+        print(f"Stopped after checking {g_budget.checked} files, since {g_budget.reason}. The others were not checked.", file=sys.stderr)
+        return stopped_exit_code
+    if passed:
         return 0
     return 1
 
 
+def subcommand(name: str) -> typing.Any:
+    """Return the module of a subcommand, with its own parse_args and run, or None if there is no such subcommand."""
+    if name == "rollover":
+        from megh_pch.copyrighter import rollover
+
+        return rollover
+    if name == "merge":
+        from megh_pch.copyrighter import shard
+
+        return shard
+    return None
+
+
+def parse_args(argv: typing.Optional[list] = None, prog: typing.Optional[str] = None) -> argparse.Namespace:
+    if argv is None:
+        argv = sys.argv[1:]
+    module = subcommand(argv[0]) if argv else None
+    if module is not None:
+        return module.parse_args(argv[1:], f"{prog or os.path.basename(sys.argv[0])} {argv[0]}")
+
+    parser = make_parser()
+    if prog:
+        parser.prog = prog
+    args = parser.parse_args(argv)
+    if not args.filename and not args.recover and not args.files_from:
+        parser.error("the following arguments are required: filename")
+    if args.null and not args.files_from:
+        parser.error("--null needs --files-from or --stdin.")
+    if args.max_failures is not None and args.max_failures < 1:
+        parser.error("--max-failures must be at least 1.")
+    if args.time_budget is not None and not args.time_budget > 0:
+        parser.error("--time-budget must be more than 0 seconds.")
+    if args.cache_max_entries is not None and args.cache_max_entries < 1:
+        parser.error("--cache-max-entries must be at least 1.")
+    if args.stats_slowest < 1:
+        parser.error("--stats-slowest must be at least 1.")
+    if args.staged:
+        from megh_pch.copyrighter import gitio
+
+        args.rev = gitio.index_rev
+    elif args.fix and args.rev is not None:
+        parser.error("--fix cannot be used with --rev.")
+    if args.deep and args.rev is not None:
+        parser.error("--deep cannot be used with --staged or --rev.")
+    if args.tree_manifest and args.rev is None:
+        parser.error("--tree-manifest needs --staged or --rev.")
+    if args.shard_weight == "size" and args.rev is not None:
+        parser.error("--shard-weight size cannot be used with --staged or --rev, whose files have no size up front.")
+    if args.shard is not None:
+        from megh_pch.copyrighter import shard
+
+        try:
+            args.shard = shard.parse_shard(args.shard)
+        except argparse.ArgumentTypeError as e:
+            parser.error(f"argument --shard: {e}")
+        args.shard.weight = args.shard_weight
+    return args
+
+
+def main(argv: typing.Optional[list] = None) -> int:
+    args = parse_args(argv)
+
+    global g_stats
+    if args.command == "check" and args.stats:
+        g_stats = stats.Stats(args.stats_slowest)
+        # Interpreter startup and imports, up to here.
+        startup = stats.process_age()
+        if startup is not None:
+            g_stats.add_phase("startup", startup, time.process_time())
+
+    return run(args)
+
+
 if __name__ == "__main__":
     sys.exit(main())
@@ -0,0 +1,101 @@
+# Copyright (c) 2026 Megh Computing, Inc.
+
+# All rights reserved. No warranty, explicit or implied, provided.
+# Unauthorized use, modification, or distribution is strictly prohibited.
+
+"""--deep: finding every copyright notice in a file, not just the one in its header.
+
+A file that fits in the header buffer is searched there. A larger one is memory-mapped a window at a time and searched
+with the bytes pattern of the registry, so it is neither read into memory nor decoded, whatever its size. Notices with
+non-ASCII characters are found in UTF-8 files only, and UTF-16 and UTF-32 files are not searched.
+"""
+
+import os
+import typing
+
+from megh_pch.copyrighter import profiles
+
+# Constants.
+# The most of a file mapped at once. A multiple of every mmap.ALLOCATIONGRANULARITY.
+window_bytes = 64 << 20
+# Newlines are counted this many bytes at a time, to number the lines of notices in a memory map.
+count_chunk_bytes = 1 << 20
+
+
+class StrayNotices:
+    """The notices outside the header of a file to fix, as the match of a fixer.FixBatch fix.
+
+    spans are the (start, end) byte offsets of each notice's years, and the years found there.
+    """
+
+    __slots__ = ("spans",)
+
+    def __init__(self, spans: typing.List[typing.Tuple[int, int, bytes]]):
+        self.spans = spans
+
+    def edits(self, file: typing.BinaryIO, years: bytes) -> list:
+        """Return the edits that replace the years of every notice. Raise ValueError if the file changed since."""
+        edits = []
+        for start, end, found in self.spans:
+            file.seek(start)
+            if file.read(end - start) != found:
+                raise ValueError(f"{getattr(file, 'name', 'A file')} changed after it was checked.")
+            edits.append((start, end, years))
+        return edits
+
+
+def find_notices(registry: profiles.HeaderRegistry, filepath: str, data: typing.Union[bytes, bytearray], size: int, file_size: int) -> list:
+    """Return (notice, line) for every notice in the file, in order, with byte offsets. data holds its first size bytes.
+
+    If that is all of the file, it is searched in place. Else the file is memory-mapped window_bytes at a time, so
+    files of any size can be searched, however little address space there is.
+    """
+    if size >= file_size:
+        return list(number_lines(data, registry.find_notices_bytes(data, 0, size)))
+
+    import mmap
+
+    notices = []
+    line = 1
+    # A notice with its years at or after accept_from, and before accept_to, is wholly in the current window.
+    overlap = registry.max_notice_bytes
+    window_start = accept_from = 0
+    with open(filepath, "rb") as file:
+        file_size = os.fstat(file.fileno()).st_size
+        while accept_from < file_size:
+            window_end = min(window_start + window_bytes, file_size)
+            accept_to = file_size if window_end == file_size else window_end - overlap
+            with mmap.mmap(file.fileno(), window_end - window_start, offset=window_start, access=mmap.ACCESS_READ) as mapped:
+                counted = accept_from - window_start
+                for notice in registry.find_notices_bytes(mapped, max(0, counted - overlap)):
+                    if notice.years_start < counted:
+                        # Found by the last window.
+                        continue
+                    if notice.years_start >= accept_to - window_start:
+                        break
+                    line += count_newlines(mapped, counted, notice.years_start)
+                    counted = notice.years_start
+                    notice.years_start += window_start
+                    notice.years_end += window_start
+                    notices.append((notice, line))
+                line += count_newlines(mapped, counted, accept_to - window_start)
+            accept_from = accept_to
+            window_start = (accept_to - overlap) // mmap.ALLOCATIONGRANULARITY * mmap.ALLOCATIONGRANULARITY
+    return notices
+
+
+def number_lines(data: typing.Any, notices: typing.Iterable[profiles.HeaderMatch]) -> typing.Iterator[tuple]:
+    """Yield (notice, line number of its years) for notices in order, counting the newlines of data between them."""
+    line = 1
+    position = 0
+    for notice in notices:
+        line += count_newlines(data, position, notice.years_start)
+        position = notice.years_start
+        yield notice, line
+
+
+def count_newlines(data: typing.Any, start: int, end: int) -> int:
+    if isinstance(data, (bytes, bytearray)):
+        return data.count(b"\n", start, end)
+    # A memory map has no count. Slices of it are copies, so they are kept small.
+    return sum(data[i : min(i + count_chunk_bytes, end)].count(b"\n") for i in range(start, end, count_chunk_bytes))
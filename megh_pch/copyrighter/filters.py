@@ -0,0 +1,156 @@
+# Copyright (c) 2026 Megh Computing, Inc.
+
+# All rights reserved. No warranty, explicit or implied, provided.
+# Unauthorized use, modification, or distribution is strictly prohibited.
+
+"""Deciding which paths to check from the path strings alone, before touching the filesystem."""
+
+import os
+import re
+import typing
+
+# Constants.
+default_exempt_names = ("__init__.py",)
+glob_chars = frozenset("*?[\\")
+
+
+def translate_glob(pattern: str) -> str:
+    """Translate a gitignore-style glob into a regular expression for a "/"-separated path, without the end anchor."""
+    regex = ""
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith("**/", i):
+            regex += "(?:.*/)?"
+            i += 3
+        elif pattern.startswith("/**", i) and i + 3 == len(pattern):
+            regex += "/.*"
+            i += 3
+        elif pattern.startswith("**", i):
+            regex += ".*"
+            i += 2
+        elif pattern[i] == "*":
+            regex += "[^/]*"
+            i += 1
+        elif pattern[i] == "?":
+            regex += "[^/]"
+            i += 1
+        elif pattern[i] == "[" and "]" in pattern[i + 2 :]:
+            end = pattern.index("]", i + 2)
+            members = pattern[i + 1 : end]
+            if members.startswith("!"):
+                members = "^" + members[1:]
+            regex += "[" + members.replace("\\", "\\\\") + "]"
+            i = end + 1
+        elif pattern[i] == "\\" and i + 1 < len(pattern):
+            regex += re.escape(pattern[i + 1])
+            i += 2
+        else:
+            regex += re.escape(pattern[i])
+            i += 1
+    return regex
+
+
+def has_glob(pattern: str) -> bool:
+    return not glob_chars.isdisjoint(pattern)
+
+
+class PatternSet:
+    """A list of gitignore-style globs, compiled so that thousands of them cost little more than a few.
+
+    A pattern without a slash matches a file or directory name at any depth, and one with a slash matches the path
+    from the root. A trailing slash matches directories only. A pattern that matches a directory matches everything
+    under it. Plain names and "*.suffix" patterns become set lookups and one endswith call. The rest are combined into
+    a single regular expression.
+    """
+
+    def __init__(self, patterns: typing.Iterable[str]):
+        # Names of files or directories, and names of directories only.
+        self.names: typing.Set[str] = set()
+        self.dir_names: typing.Set[str] = set()
+        suffixes = []
+        regexes = []
+        for pattern in patterns:
+            pattern = pattern.strip()
+            if not pattern or pattern.startswith("#"):
+                continue
+            dir_only = pattern.endswith("/")
+            pattern = pattern.rstrip("/")
+            anchored = "/" in pattern
+            if not pattern:
+                continue
+
+            if not anchored and not has_glob(pattern):
+                (self.dir_names if dir_only else self.names).add(pattern)
+            elif not anchored and not dir_only and pattern.startswith("*") and not has_glob(pattern[1:]):
+                suffixes.append(pattern[1:])
+            else:
+                regex = translate_glob(pattern.lstrip("/") if anchored else "**/" + pattern)
+                regexes.append(regex + ("/" if dir_only else r"(?:/|\Z)"))
+
+        self.suffixes = tuple(suffixes)
+        self.regex = re.compile("|".join(regexes)) if regexes else None
+        self.has_names = bool(self.names or self.dir_names or self.suffixes)
+
+    def __bool__(self) -> bool:
+        return self.has_names or self.regex is not None
+
+    def match(self, path: str, is_dir: bool = False) -> bool:
+        """Return True if the "/"-separated path, or a directory it is in, matches a pattern."""
+        parts = path.split("/") if self.has_names else [path.rpartition("/")[2]]
+        name = parts[-1]
+        if name in self.names or (is_dir and name in self.dir_names) or (self.suffixes and name.endswith(self.suffixes)):
+            return True
+        for part in parts[:-1]:
+            if part in self.names or part in self.dir_names or (self.suffixes and part.endswith(self.suffixes)):
+                return True
+        return self.regex is not None and self.regex.match(path + "/" if is_dir else path) is not None
+
+
+class PathFilter:
+    """Which files to check: their extensions, exempt names, and include and exclude globs, in one matcher.
+
+    Globs are matched against paths relative to root, which defaults to the working directory.
+    """
+
+    def __init__(
+        self,
+        extensions: typing.Iterable[str],
+        include: typing.Iterable[str] = (),
+        exclude: typing.Iterable[str] = (),
+        exempt_names: typing.Iterable[str] = default_exempt_names,
+        root: typing.Optional[str] = None,
+    ):
+        self.extensions = frozenset(extensions)
+        self.exempt_names = frozenset(exempt_names)
+        self.include = PatternSet(include)
+        self.exclude = PatternSet(exclude)
+        self.root = os.path.abspath(root or os.getcwd())
+        self.root_prefix = os.path.join(self.root, "")
+        self.has_globs = bool(self.include or self.exclude)
+
+    def relative(self, filepath: str) -> str:
+        if filepath.startswith(self.root_prefix):
+            filepath = filepath[len(self.root_prefix) :]
+        return filepath.replace(os.sep, "/") if os.sep != "/" else filepath
+
+    def reason(self, filepath: str) -> typing.Optional[str]:
+        """Return why the file is not checked, or None if it is.
+
+        The reasons are "extension", "name" (an exempt name like __init__.py), "excluded", and "not-included".
+        """
+        name = os.path.basename(filepath)
+        if os.path.splitext(name)[1] not in self.extensions:
+            return "extension"
+        if name in self.exempt_names:
+            return "name"
+        if self.has_globs:
+            path = self.relative(filepath)
+            if self.exclude and self.exclude.match(path):
+                return "excluded"
+            if self.include and not self.include.match(path):
+                return "not-included"
+        return None
+
+    def excludes_dir(self, dirpath: str) -> bool:
+        """Return True if nothing under the directory can be checked, so a walk need not enter it."""
+        return bool(self.exclude) and self.exclude.match(self.relative(dirpath), is_dir=True)
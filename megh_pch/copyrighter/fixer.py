@@ -0,0 +1,269 @@
+# Copyright (c) 2026 Megh Computing, Inc.
+
+# All rights reserved. No warranty, explicit or implied, provided.
+# Unauthorized use, modification, or distribution is strictly prohibited.
+
+"""Writing all of a run's --fix changes together, so a failed or interrupted run leaves every file as it was or fixed.
+
+Each fixed file is first written to a temporary file next to it, and the original is kept under a backup name. A
+journal listing them is then written, the temporary files are renamed over the originals, and the backups and the
+journal are removed. If the run is killed while renaming, the journal lets a later run finish or undo the renames.
+"""
+
+import os
+import typing
+
+# Constants.
+journal_filename = ".copyrighter-journal"
+journal_version = 1
+temp_prefix = ".copyrighter-"
+new_suffix = ".new"
+backup_suffix = ".orig"
+# Fewer fixes than this are written one after another. Starting threads costs more than it saves.
+min_parallel_fixes = 8
+max_threads = 16
+copy_chunk_bytes = 1 << 20
+
+
+def journal_path(directory: typing.Optional[str] = None) -> str:
+    return os.path.join(directory or os.getcwd(), journal_filename)
+
+
+def sync_directories(directories: typing.Iterable[str]) -> None:
+    """Make renames in the directories durable, with one fsync each. Not possible on Windows, where it is skipped."""
+    for directory in directories:
+        try:
+            fd = os.open(directory, os.O_RDONLY)
+        except OSError:
+            continue
+        try:
+            os.fsync(fd)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+
+def remove(path: str) -> None:
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+class FixBatch:
+    """The fixes found during a run, written by commit.
+
+    rewrite(source, start_year, end_year, match) is given the original file, open for reading, and returns the edits
+    to make for one fix: a list of (start offset, end offset, new bytes). The edits of every fix of a file are made in
+    one copy of it, and the rest of the file is copied unchanged.
+    """
+
+    def __init__(self) -> None:
+        # (path, start year, end year, the notice found by the check), in the order found.
+        self.fixes: typing.List[tuple] = []
+
+    def __len__(self) -> int:
+        return len(self.fixes)
+
+    def add(self, filepath: str, start_year: int, end_year: int, match: typing.Any) -> None:
+        self.fixes.append((filepath, start_year, end_year, match))
+
+    def take(self) -> list:
+        """Return and forget the fixes added since the last call. Used to send fixes back from workers."""
+        fixes, self.fixes = self.fixes, []
+        return fixes
+
+    def extend(self, fixes: list) -> None:
+        self.fixes.extend(fixes)
+
+    def commit(self, rewrite: typing.Callable, journal: typing.Optional[str] = None) -> None:
+        """Write every fix, or none of them. Raises the first error, after undoing what was done."""
+        if not self.fixes:
+            return
+        journal = journal or journal_path()
+        if os.path.exists(journal):
+            # Another run's fixes were interrupted. Overwriting its journal would lose them.
+            raise FileExistsError(f"An interrupted --fix run left a journal: {journal}")
+
+        prepared = self._prepare_all(rewrite)
+        try:
+            write_journal(journal, prepared)
+        except BaseException:
+            discard(prepared)
+            raise
+        done = 0
+        try:
+            for target, temp, _ in prepared:
+                os.replace(temp, target)
+                done += 1
+        except BaseException:
+            # Put back the originals of the files already replaced, and drop the rest.
+            for i, (target, temp, backup) in enumerate(prepared):
+                if i < done:
+                    os.replace(backup, target)
+                else:
+                    remove(temp)
+                    remove(backup)
+            sync_directories({os.path.dirname(target) for target, _, _ in prepared})
+            remove(journal)
+            raise
+
+        sync_directories({os.path.dirname(target) for target, _, _ in prepared})
+        for _, _, backup in prepared:
+            remove(backup)
+        remove(journal)
+        self.fixes = []
+
+    def _prepare_all(self, rewrite: typing.Callable) -> list:
+        """Write the temporary and backup files of every fix. If any fails, remove them all and raise."""
+        # Path -> its fixes. A file given twice is fixed once.
+        by_path: typing.Dict[str, list] = {}
+        for fix in self.fixes:
+            by_path.setdefault(fix[0], []).append(fix[1:])
+        fixes = list(by_path.items())
+        if len(fixes) < min_parallel_fixes:
+            prepared = []
+            try:
+                for fix in fixes:
+                    prepared.append(prepare(rewrite, *fix))
+            except BaseException:
+                discard(prepared)
+                raise
+            return prepared
+
+        import concurrent.futures
+
+        # Writing and syncing are mostly waiting on the disk, so threads overlap them.
+        with concurrent.futures.ThreadPoolExecutor(max_workers=min(max_threads, len(fixes))) as executor:
+            futures = [executor.submit(prepare, rewrite, *fix) for fix in fixes]
+            concurrent.futures.wait(futures)
+        prepared = [future.result() for future in futures if future.exception() is None]
+        for future in futures:
+            if future.exception() is not None:
+                discard(prepared)
+                raise future.exception()  # type: ignore
+        return prepared
+
+
+def prepare(rewrite: typing.Callable, filepath: str, fixes: list) -> tuple:
+    """Write the fixed file to a synced temporary file next to it, and keep the original under a backup name. fixes
+    are the (start year, end year, match) of each fix of the file.
+
+    Return (path, temporary path, backup path).
+    """
+    import shutil
+    import tempfile
+
+    # Replace a symlink's target, not the symlink.
+    target = os.path.realpath(filepath)
+    with open(target, "rb") as source:
+        # The same fix found twice gives the same edits.
+        edits = sorted({edit for fix in fixes for edit in rewrite(source, *fix)})
+        for previous, edit in zip(edits, edits[1:]):
+            if edit[0] < previous[1]:
+                raise ValueError(f"Overlapping fixes in {filepath}.")
+        fd, temp = tempfile.mkstemp(dir=os.path.dirname(target), prefix=temp_prefix, suffix=new_suffix)
+        try:
+            with os.fdopen(fd, "wb") as temp_file:
+                copy_edited(source, temp_file, edits)
+                temp_file.flush()
+                os.fsync(temp_file.fileno())
+            shutil.copymode(target, temp)
+        except BaseException:
+            remove(temp)
+            raise
+
+    backup = temp[: -len(new_suffix)] + backup_suffix
+    try:
+        # A hard link keeps the original without copying it.
+        os.link(target, backup)
+    except OSError:
+        try:
+            shutil.copy2(target, backup)
+        except BaseException:
+            remove(temp)
+            remove(backup)
+            raise
+    return target, temp, backup
+
+
+def copy_edited(source: typing.BinaryIO, destination: typing.BinaryIO, edits: list) -> None:
+    """Copy source to destination with the (start, end, new bytes) edits made, in order, a chunk at a time."""
+    import shutil
+
+    position = 0
+    for start, end, replacement in edits:
+        source.seek(position)
+        remaining = start - position
+        while remaining > 0:
+            chunk = source.read(min(remaining, copy_chunk_bytes))
+            if not chunk:
+                raise ValueError(f"A fix is past the end of {getattr(source, 'name', 'the file')}.")
+            destination.write(chunk)
+            remaining -= len(chunk)
+        destination.write(replacement)
+        position = end
+    source.seek(position)
+    shutil.copyfileobj(source, destination, copy_chunk_bytes)
+
+
+def discard(prepared: list) -> None:
+    for _, temp, backup in prepared:
+        remove(temp)
+        remove(backup)
+
+
+def write_journal(path: str, prepared: list) -> None:
+    import json
+    import tempfile
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp = tempfile.mkstemp(dir=directory, prefix=temp_prefix)
+    try:
+        with os.fdopen(fd, "w") as file:
+            json.dump({"version": journal_version, "entries": prepared}, file)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp, path)
+    except BaseException:
+        remove(temp)
+        raise
+    sync_directories([directory])
+
+
+def read_journal(path: str) -> list:
+    """Return the (path, temporary path, backup path) entries of a journal. Raise ValueError if it is malformed."""
+    import json
+
+    with open(path, "r") as file:
+        try:
+            data = json.load(file)
+        except json.JSONDecodeError as e:
+            raise ValueError(f'Could not parse journal "{path}": {e}')
+    if not isinstance(data, dict) or data.get("version") != journal_version or not isinstance(data.get("entries"), list):
+        raise ValueError(f'Journal "{path}" is not a copyrighter journal of version {journal_version}.')
+    return [tuple(entry) for entry in data["entries"]]
+
+
+def recover(path: str, mode: str) -> int:
+    """Finish ("resume") or undo ("rollback") the fixes of an interrupted run from its journal. Return how many
+    files were replaced or restored.
+    """
+    entries = read_journal(path)
+    count = 0
+    for target, temp, backup in entries:
+        if mode == "resume":
+            if os.path.exists(temp):
+                os.replace(temp, target)
+                count += 1
+        elif os.path.exists(backup) and not (os.path.exists(target) and os.path.samefile(backup, target)):
+            # Files not replaced yet are still the original, which the backup is a link to.
+            os.replace(backup, target)
+            count += 1
+    sync_directories({os.path.dirname(target) for target, _, _ in entries})
+    for target, temp, backup in entries:
+        remove(temp)
+        remove(backup)
+    remove(path)
+    return count
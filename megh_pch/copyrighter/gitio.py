@@ -0,0 +1,357 @@
+# Copyright (c) 2026 Megh Computing, Inc.
+
+# All rights reserved. No warranty, explicit or implied, provided.
+# Unauthorized use, modification, or distribution is strictly prohibited.
+
+"""Reading file lists and contents straight from git, instead of the working tree."""
+
+import marshal
+import os
+import typing
+
+from megh_pch.copyrighter import filters
+
+# Constants.
+# The --rev value that means the index (staged content), as in "git show :path".
+index_rev = ":"
+# Regular files and executables. Symlinks (120000) and submodules (160000) are not checked.
+blob_modes = ("100644", "100755")
+history_prefix = "history-"
+# Each commit starts with \x01 and its author date, then NUL-separated "status, path(s)" records.
+history_log_args = ["log", "-M", "--name-status", "-z", "--date=short", "--format=%x01%ad"]
+
+
+class GitError(Exception):
+    pass
+
+
+def run_git(args: list, cwd: str) -> str:
+    """Run a git command and return its output."""
+    import subprocess  # nosec
+
+    try:
+        result = subprocess.run(["git"] + args, cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True)  # nosec
+    except FileNotFoundError:
+        raise GitError("git is not installed.")
+    except subprocess.CalledProcessError as e:
+        raise GitError(f"git {' '.join(args)} failed: {e.stderr.decode(errors='replace').strip()}")
+    return result.stdout.decode(errors="surrogateescape")
+
+
+def toplevel(cwd: str) -> str:
+    """Return the root of the working tree containing cwd."""
+    return run_git(["rev-parse", "--show-toplevel"], cwd).strip()
+
+
+def list_blobs(root: str, rev: str) -> typing.Dict[str, str]:
+    """Return {repo-relative path: blob object ID} for the index (rev ":") or a commit-ish."""
+    if rev == index_rev:
+        # "<mode> <oid> <stage>\t<path>"
+        output = run_git(["ls-files", "--stage", "-z"], root)
+    else:
+        # "<mode> <type> <oid>\t<path>"
+        output = run_git(["ls-tree", "-r", "-z", "--full-tree", rev], root)
+
+    blobs = {}
+    for record in output.split("\0"):
+        if not record:
+            continue
+        info, path = record.split("\t", 1)
+        fields = info.split()
+        if fields[0] not in blob_modes:
+            continue
+        oid = fields[1] if rev == index_rev else fields[2]
+        # During a merge conflict a path has several stages. Stage 0 is absent, and the last one listed is kept.
+        blobs[path] = oid
+    return blobs
+
+
+def root_tree(root: str, rev: str) -> str:
+    """Return the object ID of the tree of the index (rev ":") or a commit-ish."""
+    if rev == index_rev:
+        # Writes the index's trees to the object database, as a commit would. Fails during a merge conflict.
+        return run_git(["write-tree"], root).strip()
+    return run_git(["rev-parse", "--verify", "--end-of-options", f"{rev}^{{tree}}"], root).strip()
+
+
+def parse_tree(data: bytes, oid_bytes: int) -> typing.Iterator[typing.Tuple[str, str, str]]:
+    """Yield (mode, name, object ID) for each entry of a raw tree object: "<mode> <name>\0<binary oid>" records."""
+    i = 0
+    while i < len(data):
+        space = data.index(b" ", i)
+        nul = data.index(b"\0", space)
+        end = nul + 1 + oid_bytes
+        yield data[i:space].decode(), data[space + 1 : nul].decode(errors="surrogateescape"), data[nul + 1 : end].hex()
+        i = end
+
+
+class TreeWalk:
+    """The files under some paths of a git tree, found by reading tree objects level by level, without descending into
+    trees that skip(oid) says were verified.
+
+    Only trees on the way to the paths, or under them, are read. Paths are relative to the root, "" for all of it.
+    """
+
+    def __init__(self, reader: "BlobReader", tree: str, paths: typing.Iterable[str], skip: typing.Callable[[str], bool]):
+        # {repo-relative path: blob object ID} of the files under the paths, or given as paths, like list_blobs.
+        self.blobs: typing.Dict[str, str] = {}
+        # (directory, tree object ID, file paths, subdirectory paths) of each tree read under the paths, parents first.
+        self.trees: typing.List[tuple] = []
+        # Directory -> tree object ID of the trees skipped as verified.
+        self.skipped: typing.Dict[str, str] = {}
+        self.directories: typing.Set[str] = set()
+
+        wanted = set(paths)
+        on_the_way = {path.rsplit("/", i)[0] for path in wanted if path for i in range(1, path.count("/") + 1)}
+        if "" in wanted and skip(tree):
+            self.skipped[""] = tree
+            self.directories.add("")
+            return
+        level = [("", tree, "" in wanted)]
+        while level:
+            oids = list(dict.fromkeys(oid for _, oid, _ in level))
+            contents = dict(reader.read_headers(oids, 1 << 62))
+            next_level = []
+            for directory, oid, under in level:
+                data = contents[oid]
+                if data is None:
+                    raise GitError(f"Tree {oid} of {directory or '.'} is missing from the repository.")
+                files, subdirectories = [], []
+                for mode, name, child in parse_tree(data, len(oid) // 2):
+                    path = f"{directory}/{name}" if directory else name
+                    if mode == "40000":
+                        if under or path in wanted:
+                            subdirectories.append(path)
+                            self.directories.add(path)
+                            if skip(child):
+                                self.skipped[path] = child
+                                continue
+                            next_level.append((path, child, True))
+                        elif path in on_the_way:
+                            self.directories.add(path)
+                            next_level.append((path, child, False))
+                    elif mode in blob_modes and (under or path in wanted):
+                        self.blobs[path] = child
+                        files.append(path)
+                if under:
+                    self.directories.add(directory)
+                    self.trees.append((directory, oid, files, subdirectories))
+            level = next_level
+
+    def is_skipped(self, path: str) -> bool:
+        """Return whether the path is in a tree skipped as verified."""
+        while True:
+            if path in self.skipped:
+                return True
+            if not path:
+                return False
+            path = path.rsplit("/", 1)[0] if "/" in path else ""
+
+
+def relative_path(root: str, filepath: str) -> str:
+    """Return the path as git spells it: relative to the root, with forward slashes."""
+    return os.path.relpath(os.path.abspath(filepath), root).replace(os.sep, "/")
+
+
+def expand_directories(root: str, blobs: typing.Dict[str, str], filepaths: list, path_filter: filters.PathFilter, directories: typing.Collection[str] = ()) -> list:
+    """Replace each path that is a directory in the listing, or in directories, with the files under it that the filter
+    accepts.
+    """
+    expanded = []
+    for filepath in filepaths:
+        path = relative_path(root, filepath)
+        if path in blobs:
+            expanded.append(filepath)
+            continue
+
+        prefix = "" if path == "." else path + "/"
+        files = [os.path.join(root, *name.split("/")) for name in blobs if name.startswith(prefix)]
+        if files or (path if path != "." else "") in directories:
+            expanded.extend(filepath for filepath in files if path_filter.reason(filepath) is None)
+        else:
+            # Not in the listing at all. The caller reports it.
+            expanded.append(filepath)
+    return expanded
+
+
+class BlobReader:
+    """One long-lived "git cat-file --batch" process that streams the start of many blobs.
+
+    Requests are written from a thread while responses are read, so neither pipe fills up and blocks git.
+    """
+
+    def __init__(self, root: str):
+        import subprocess  # nosec
+
+        try:
+            self.process = subprocess.Popen(["git", "cat-file", "--batch"], cwd=root, stdin=subprocess.PIPE, stdout=subprocess.PIPE)  # nosec
+        except FileNotFoundError:
+            raise GitError("git is not installed.")
+
+    def __enter__(self) -> "BlobReader":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.process.stdin.close()  # type: ignore
+        self.process.wait()
+
+    def _write_requests(self, oids: list) -> None:
+        stdin = self.process.stdin
+        try:
+            for oid in oids:
+                stdin.write(oid.encode() + b"\n")  # type: ignore
+            stdin.flush()  # type: ignore
+        except BrokenPipeError:
+            pass
+
+    def read_headers(self, oids: list, max_bytes: int) -> typing.Iterator[typing.Tuple[str, typing.Optional[bytes]]]:
+        """Yield (oid, first max_bytes of the blob) in order. The bytes are None if the object is missing."""
+        import threading
+
+        writer = threading.Thread(target=self._write_requests, args=(oids,), daemon=True)
+        writer.start()
+
+        stdout = self.process.stdout
+        for oid in oids:
+            # "<oid> <type> <size>\n<contents>\n" or "<oid> missing\n"
+            fields = stdout.readline().split()  # type: ignore
+            if len(fields) != 3:
+                if not fields:
+                    raise GitError("git cat-file exited early.")
+                yield oid, None
+                continue
+
+            size = int(fields[2])
+            head = stdout.read(min(size, max_bytes))  # type: ignore
+            # The rest of the blob has to be drained. It is read in chunks so a huge blob is never in memory.
+            remaining = size - len(head)
+            while remaining > 0:
+                chunk = stdout.read(min(remaining, 1 << 20))  # type: ignore
+                if not chunk:
+                    raise GitError("git cat-file exited early.")
+                remaining -= len(chunk)
+            stdout.read(1)  # type: ignore
+            yield oid, head
+
+        writer.join()
+
+
+def _log_tokens(stream: typing.BinaryIO) -> typing.Iterator[str]:
+    """Yield the NUL-separated fields of "git log -z" output without holding all of it in memory."""
+    rest = b""
+    for chunk in iter(lambda: stream.read(1 << 20), b""):
+        fields = (rest + chunk).split(b"\0")
+        rest = fields.pop()
+        for field in fields:
+            yield field.decode(errors="surrogateescape")
+    if rest:
+        yield rest.decode(errors="surrogateescape")
+
+
+def read_first_years(root: str) -> typing.Dict[str, int]:
+    """Return {repo-relative path: year the file was added}, following renames, from one "git log" pass.
+
+    The log is newest first. A rename means the file's older history is under the old name, and an add means
+    older history under the same name belongs to some other, deleted file.
+    """
+    import subprocess  # nosec
+
+    try:
+        process = subprocess.Popen(["git"] + history_log_args, cwd=root, stdout=subprocess.PIPE, stderr=subprocess.PIPE)  # nosec
+    except FileNotFoundError:
+        raise GitError("git is not installed.")
+
+    years: typing.Dict[str, int] = {}
+    # Name at this point in history -> path at HEAD, or None if the name belongs to an unrelated file.
+    aliases: typing.Dict[str, typing.Optional[str]] = {}
+    year = 0
+    tokens = _log_tokens(process.stdout)  # type: ignore
+    for token in tokens:
+        if token.startswith("\x01"):
+            year = int(token[1:5])
+            continue
+
+        status = token.lstrip("\n")[:1]
+        if not status:
+            continue
+        # The old name comes first, for a rename or a copy.
+        old: typing.Optional[str] = next(tokens) if status in ("R", "C") else None
+        new = next(tokens)
+
+        path = aliases.get(new, new)
+        if path is not None and status != "D":
+            years[path] = year
+
+        if status in ("A", "C", "D", "R"):
+            aliases[new] = None
+        if status == "R":
+            aliases[old] = path  # type: ignore
+
+    _, stderr = process.communicate()
+    if process.returncode != 0:
+        raise GitError(f"git {' '.join(history_log_args)} failed: {stderr.decode(errors='replace').strip()}")
+    return years
+
+
+class History:
+    """The year each file was added to git. Built once per HEAD commit, and cached if a directory is given."""
+
+    def __init__(self, root: str, head: str, years: typing.Dict[str, int]):
+        self.root = root
+        self.head = head
+        self.years = years
+
+    @classmethod
+    def load(cls, root: str, cache_dir: typing.Optional[str] = None) -> "History":
+        try:
+            head = run_git(["rev-parse", "--verify", "-q", "HEAD"], root).strip()
+        except GitError:
+            # No commits yet. Every file is new.
+            return cls(root, "", {})
+
+        cache_path = os.path.join(cache_dir, f"{history_prefix}{head}.bin") if cache_dir else None
+        if cache_path:
+            try:
+                with open(cache_path, "rb") as file:
+                    return cls(root, head, marshal.load(file))
+            except (OSError, EOFError, ValueError, TypeError):
+                pass
+
+        history = cls(root, head, read_first_years(root))
+        if cache_path:
+            history._save(cache_path)
+        return history
+
+    def _save(self, cache_path: str) -> None:
+        import tempfile
+
+        directory = os.path.dirname(cache_path)
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix=f".{history_prefix}")
+        with os.fdopen(fd, "wb") as file:
+            marshal.dump(self.years, file)
+        os.replace(temp_path, cache_path)
+
+        # Only the index of the current HEAD is kept.
+        for name in os.listdir(directory):
+            if name.startswith(history_prefix) and os.path.join(directory, name) != cache_path:
+                try:
+                    os.remove(os.path.join(directory, name))
+                except OSError:
+                    pass
+
+    def first_year(self, filepath: str, default: int) -> int:
+        """Return the year the file was added, or default if git has never seen it."""
+        return self.years.get(relative_path(self.root, filepath), default)
+
+    def restrict(self, filepaths: list) -> "History":
+        """Return a copy that only knows the given files, small enough to send to a worker process."""
+        years = {}
+        for filepath in filepaths:
+            path = relative_path(self.root, filepath)
+            if path in self.years:
+                years[path] = self.years[path]
+        return History(self.root, self.head, years)
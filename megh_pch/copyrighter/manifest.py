@@ -0,0 +1,98 @@
+# Copyright (c) 2026 Megh Computing, Inc.
+
+# All rights reserved. No warranty, explicit or implied, provided.
+# Unauthorized use, modification, or distribution is strictly prohibited.
+
+"""A manifest of git trees whose files all passed, so --staged and --rev runs can skip them without listing them.
+
+A tree object ID covers everything under the directory, so a tree that passed once passes again, wherever it is in the
+repository, as long as the year, the extensions, and the profiles are the same. The file is a header line followed by
+the raw object IDs, most recently seen first. It does not depend on the Python version or the machine, so CI can save
+and restore it between jobs.
+"""
+
+import os
+import typing
+
+# Constants.
+manifest_magic = "copyrighter-trees"
+manifest_version = 1
+default_max_trees = 1000000
+
+
+def make_fingerprint(current_year: int, extensions: list, profiles: str = "", history: str = "") -> str:
+    """Return the manifest fingerprint. A manifest written under a different one is discarded."""
+    import hashlib
+
+    text = f"{current_year}:{','.join(sorted(extensions))}:{profiles}:{history}"
+    return hashlib.sha256(text.encode(errors="surrogateescape")).hexdigest()[:32]
+
+
+class TreeManifest:
+    def __init__(self, path: str, max_trees: int = default_max_trees):
+        self.path = path
+        self.max_trees = max_trees
+        self.fingerprint = ""
+        # Object ID -> None, in the order they were last seen. A dict keeps the order and finds IDs in O(1).
+        self.trees: typing.Dict[str, None] = {}
+        self.seen: typing.Dict[str, None] = {}
+        self.added = False
+        self.hits = 0
+
+    def load(self, fingerprint: str) -> None:
+        """Read the manifest. A missing, unreadable, or outdated one is treated as empty."""
+        self.fingerprint = fingerprint
+        self.trees = {}
+        self.seen = {}
+        self.added = False
+        self.hits = 0
+        try:
+            with open(self.path, "rb") as file:
+                header = file.readline().decode(errors="replace").split()
+                data = file.read()
+        except OSError:
+            return
+        if len(header) != 4 or header[:3] != [manifest_magic, str(manifest_version), fingerprint] or not header[3].isdigit():
+            return
+        width = int(header[3])
+        if not width or len(data) % width:
+            return
+        self.trees = dict.fromkeys(data[i : i + width].hex() for i in range(0, len(data), width))
+
+    def is_verified(self, oid: str) -> bool:
+        if oid in self.trees:
+            self.hits += 1
+            self.seen[oid] = None
+            return True
+        return False
+
+    def add(self, oid: str) -> None:
+        """Record a tree whose files all passed."""
+        self.seen[oid] = None
+        self.added = self.added or oid not in self.trees
+
+    def save(self) -> None:
+        """Write the trees seen by this run first, then the others, up to max_trees. Only if a tree was added."""
+        if not self.added:
+            return
+        trees = list(dict.fromkeys([*self.seen, *self.trees]))[: self.max_trees]
+        # SHA-1 or SHA-256 repositories. All IDs in one repository have the same length.
+        width = len(trees[0]) // 2
+        data = b"".join(bytes.fromhex(oid) for oid in trees if len(oid) == width * 2)
+
+        import tempfile
+
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".copyrighter-trees-")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                file.write(f"{manifest_magic} {manifest_version} {self.fingerprint} {width}\n".encode())
+                file.write(data)
+            os.replace(temp_path, self.path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+        self.trees = dict.fromkeys(trees)
+        self.seen = {}
+        self.added = False
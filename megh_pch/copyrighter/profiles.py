@@ -0,0 +1,236 @@
+# Copyright (c) 2026 Megh Computing, Inc.
+
+# All rights reserved. No warranty, explicit or implied, provided.
+# Unauthorized use, modification, or distribution is strictly prohibited.
+
+"""Header profiles: the license headers copyrighter recognizes, compiled into a single matcher."""
+
+import collections
+import os
+import re
+import typing
+
+# Constants.
+years_placeholder = "{years}"
+# Note: We chose not to support commas. Only YYYY and YYYY-YYYY are supported.
+years_regex = R"(?P<{0}>20\d\d)(?:-(?P<{1}>20\d\d))?"
+# Shorter common prefixes of the notices are found too often to be worth finding first.
+min_anchor_length = 4
+# The most headers a HeaderMemo keeps. A project has a few headers, and each year or so adds a few more.
+default_memo_size = 256
+
+
+class HeaderProfile:
+    """A license header, identified by its copyright notice and optionally by a marker elsewhere in the header.
+
+    The notice is literal text with a {years} placeholder, e.g. "Copyright (c) {years} Megh Computing, Inc.".
+    A profile with a marker only applies to headers containing the marker, and takes precedence over profiles
+    without one.
+    """
+
+    def __init__(self, name: str, notice: str, marker: typing.Optional[str] = None):
+        if notice.count(years_placeholder) != 1:
+            raise ValueError(f'Profile "{name}" notice must contain {years_placeholder} exactly once: "{notice}"')
+        self.name = name
+        self.notice = notice
+        self.marker = marker or None
+        # Compiled on first use. Checks go through HeaderRegistry, so most runs never need it.
+        self._regex: typing.Optional[typing.Pattern] = None
+
+    def __repr__(self) -> str:
+        return f"HeaderProfile({self.name!r}, {self.notice!r}, {self.marker!r})"
+
+    def notice_regex(self, start_group: str = "start", end_group: str = "end") -> str:
+        before, after = self.notice.split(years_placeholder)
+        return re.escape(before) + years_regex.format(start_group, end_group) + re.escape(after)
+
+    def search(self, text: str) -> typing.Optional["HeaderMatch"]:
+        """Return the first notice of this profile in the text, ignoring the marker."""
+        if self._regex is None:
+            self._regex = re.compile(self.notice_regex())
+        match = self._regex.search(text)
+        if not match:
+            return None
+        end = match.group("end")
+        years_end = match.end("end") if end else match.end("start")
+        start_year = int(match.group("start"))
+        return HeaderMatch(self, start_year, int(end) if end else start_year, match.start("start"), years_end)
+
+
+class HeaderMatch:
+    """The profile found in a header, its years, and the offsets of the years text within the header."""
+
+    __slots__ = ("profile", "start_year", "end_year", "years_start", "years_end")
+
+    def __init__(self, profile: HeaderProfile, start_year: int, end_year: int, years_start: int, years_end: int):
+        self.profile = profile
+        self.start_year = start_year
+        self.end_year = end_year
+        self.years_start = years_start
+        self.years_end = years_end
+
+    def __repr__(self) -> str:
+        return f"HeaderMatch({self.profile.name!r}, {self.start_year}, {self.end_year}, {self.years_start}, {self.years_end})"
+
+
+default_profiles = (
+    HeaderProfile("megh", "Copyright (c) {years} Megh Computing, Inc."),
+    HeaderProfile("apache-2.0", "Copyright {years} Megh Computing, Inc.", marker="Licensed under the Apache License, Version 2"),
+)
+
+
+class HeaderRegistry:
+    """Header profiles compiled into one alternation, so a header is scanned once however many profiles exist.
+
+    Every notice and marker is a named group of the combined pattern. A single finditer over the header
+    records the first occurrence of each, and the profile is then picked without looking at the text again.
+    """
+
+    def __init__(self, profiles: typing.Iterable[HeaderProfile] = default_profiles):
+        # Profiles with a marker are tried first, in the order given.
+        self.profiles = sorted(profiles, key=lambda profile: profile.marker is None)
+        names = [profile.name for profile in self.profiles]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Duplicate profile names: {', '.join(names)}")
+
+        # Profiles with the same notice share its group, e.g. one license with and one without a marker.
+        notices: typing.Dict[str, int] = {}
+        self._notice_of = [notices.setdefault(profile.notice, len(notices)) for profile in self.profiles]
+        notice_alternatives = [f"(?P<n{k}>{self.profiles[self._notice_of.index(k)].notice_regex(f's{k}', f'e{k}')})" for k in range(len(notices))]
+        marker_alternatives = [f"(?P<m{i}>{re.escape(profile.marker)})" for i, profile in enumerate(self.profiles) if profile.marker]
+        self.pattern = re.compile("|".join(notice_alternatives + marker_alternatives))
+        # The same pattern for raw bytes, and one of the notices alone, for --deep. Compiled on first use.
+        self._bytes_pattern: typing.Optional[typing.Pattern] = None
+        self._notices_source = "|".join(notice_alternatives)
+        self._notices_pattern: typing.Optional[typing.Pattern] = None
+        # Every notice starts with the text before its years, so a match starts where their common prefix is found.
+        self._notices_anchor = os.path.commonprefix([profile.notice.split(years_placeholder)[0] for profile in self.profiles]).encode()
+        # The longest a notice can be in UTF-8, with two years.
+        self.max_notice_bytes = max((len(profile.notice.replace(years_placeholder, "2000-2000").encode()) for profile in self.profiles), default=0)
+        # Notice group -> the profile a notice found without its header is attributed to: the last with that notice,
+        # which is one without a marker if there is one.
+        self._profile_of = {k: i for i, k in enumerate(self._notice_of)}
+        self.fingerprint = repr([(profile.name, profile.notice, profile.marker) for profile in self.profiles])
+
+    def profile(self, name: str) -> HeaderProfile:
+        for profile in self.profiles:
+            if profile.name == name:
+                return profile
+        raise KeyError(name)
+
+    def match(self, header: str) -> typing.Optional[HeaderMatch]:
+        """Return the profile and years of the header, or None if no profile's notice is found."""
+        return self._pick(self.pattern.finditer(header))
+
+    def match_bytes(self, data: typing.Union[bytes, bytearray], end: int) -> typing.Optional[HeaderMatch]:
+        """Like match, on the first end bytes of UTF-8 or other ASCII-compatible data, without decoding it.
+
+        The offsets of the match are byte offsets. Notices with non-ASCII characters are only found in UTF-8.
+        """
+        if self._bytes_pattern is None:
+            self._bytes_pattern = re.compile(self.pattern.pattern.encode())
+        return self._pick(self._bytes_pattern.finditer(data, 0, end))
+
+    def find_notices_bytes(self, data: typing.Any, start: int = 0, end: typing.Optional[int] = None) -> typing.Iterator[HeaderMatch]:
+        """Yield every notice of any profile in data, bytes or a memory map, with byte offsets, without decoding it.
+
+        Markers are not looked for, so a notice shared by several profiles is attributed to the one without a marker.
+        """
+        if self._notices_pattern is None:
+            self._notices_pattern = re.compile(self._notices_source.encode())
+        if end is None:
+            end = len(data)
+        anchor = self._notices_anchor
+        if len(anchor) < min_anchor_length:
+            for match in self._notices_pattern.finditer(data, start, end):
+                yield self._header_match(match, self._profile_of[int(match.lastgroup[1:])])  # type: ignore
+            return
+
+        # find skips through the data many times faster than the pattern does.
+        position = data.find(anchor, start, end)
+        while position >= 0:
+            found = self._notices_pattern.match(data, position, end)
+            if found:
+                yield self._header_match(found, self._profile_of[int(found.lastgroup[1:])])  # type: ignore
+                position = found.end()
+            else:
+                position += 1
+            position = data.find(anchor, position, end)
+
+    def _pick(self, matches: typing.Iterator) -> typing.Optional[HeaderMatch]:
+        found: typing.Dict[str, "re.Match"] = {}
+        for match in matches:
+            found.setdefault(match.lastgroup, match)  # type: ignore
+
+        for i, profile in enumerate(self.profiles):
+            notice = found.get(f"n{self._notice_of[i]}")
+            if profile.marker:
+                if f"m{i}" not in found:
+                    continue
+                # The marker decides the profile. Its notice must be present, even if another profile's is.
+                return self._header_match(notice, i)
+            if notice:
+                return self._header_match(notice, i)
+        return None
+
+    def _header_match(self, match: typing.Optional["re.Match"], i: int) -> typing.Optional[HeaderMatch]:
+        if match is None:
+            return None
+        k = self._notice_of[i]
+        start_year = int(match.group(f"s{k}"))
+        end = match.group(f"e{k}")
+        years_end = match.end(f"e{k}") if end else match.end(f"s{k}")
+        return HeaderMatch(self.profiles[i], start_year, int(end) if end else start_year, match.start(f"s{k}"), years_end)
+
+
+class HeaderMemo:
+    """The notices found by HeaderRegistry.match_bytes, by the header bytes they were found in, so a header shared by
+    many files is matched once.
+
+    The least recently used header is dropped when more than size are kept. hits and misses count the lookups.
+    """
+
+    __slots__ = ("size", "table", "hits", "misses")
+
+    def __init__(self, size: int = default_memo_size):
+        self.size = size
+        # (registry fingerprint, header bytes) -> the match, or None. Registries with the same profiles share entries.
+        self.table: "collections.OrderedDict[tuple, typing.Optional[HeaderMatch]]" = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def match_bytes(self, registry: HeaderRegistry, data: typing.Union[bytes, bytearray], end: int) -> typing.Optional[HeaderMatch]:
+        """Return registry.match_bytes(data, end), matching only if this header was not seen, or was forgotten."""
+        key = (registry.fingerprint, bytes(data[:end]))
+        try:
+            match = self.table[key]
+        except KeyError:
+            self.misses += 1
+            match = self.table[key] = registry.match_bytes(data, end)
+            if len(self.table) > self.size:
+                self.table.popitem(last=False)
+            return match
+        self.hits += 1
+        self.table.move_to_end(key)
+        return match
+
+
+def load_profiles(profiles_file: str) -> list:
+    """Read extra profiles from a JSON list of {"name", "notice", "marker"} objects. Raise ValueError if malformed."""
+    import json
+
+    with open(profiles_file, "r") as file:
+        try:
+            data = json.load(file)
+        except json.JSONDecodeError as e:
+            raise ValueError(f'Could not parse profiles file "{profiles_file}": {e}')
+
+    if not isinstance(data, list):
+        raise ValueError(f'Profiles file "{profiles_file}" must contain a list of profiles.')
+
+    profiles = []
+    for item in data:
+        if not isinstance(item, dict) or not isinstance(item.get("name"), str) or not isinstance(item.get("notice"), str):
+            raise ValueError(f'Profiles file "{profiles_file}" has a profile without a "name" and "notice": {item}')
+        profiles.append(HeaderProfile(item["name"], item["notice"], item.get("marker")))
+    return profiles
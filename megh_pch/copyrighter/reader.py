@@ -0,0 +1,59 @@
+# Copyright (c) 2026 Megh Computing, Inc.
+
+# All rights reserved. No warranty, explicit or implied, provided.
+# Unauthorized use, modification, or distribution is strictly prohibited.
+
+"""Reading the first bytes of many files into one reused buffer, without creating a file object for each."""
+
+import os
+import typing
+
+# Constants.
+open_flags = os.O_RDONLY | getattr(os, "O_CLOEXEC", 0) | getattr(os, "O_BINARY", 0)
+# Readahead beyond the header is wasted on a cold page cache, so it is turned off for files larger than the header.
+fadvise = getattr(os, "posix_fadvise", None)
+fadvise_random = getattr(os, "POSIX_FADV_RANDOM", None)
+preadv = getattr(os, "preadv", None)
+readv = getattr(os, "readv", None)
+
+
+class HeaderReader:
+    """Reads the first max_bytes of a file into self.buffer, which is overwritten by the next read.
+
+    Each process has its own reader, so the buffer is never shared. On platforms without os.preadv or os.readv, the
+    file is read with a file object instead.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.buffer = bytearray(max_bytes)
+        self._view = memoryview(self.buffer)
+
+    def read(self, filepath: str, size: typing.Optional[int] = None) -> int:
+        """Read the start of the file and return how many bytes of the buffer were filled. size is the file's size, if
+        known, for the readahead hint. Raises OSError like open.
+        """
+        if preadv is None and readv is None:
+            with open(filepath, "rb") as file:
+                return file.readinto(self.buffer)  # type: ignore
+
+        fd = os.open(filepath, open_flags)
+        try:
+            if fadvise is not None and size is not None and size > self.max_bytes:
+                fadvise(fd, 0, 0, fadvise_random)
+            return self._read_fd(fd)
+        finally:
+            os.close(fd)
+
+    def _read_fd(self, fd: int) -> int:
+        # A regular file returns everything asked for up to its end, but a read can still come up short.
+        filled = 0
+        while filled < self.max_bytes:
+            if preadv is not None:
+                count = preadv(fd, [self._view[filled:]], filled)
+            else:
+                count = readv(fd, [self._view[filled:]])  # type: ignore
+            if not count:
+                break
+            filled += count
+        return filled
@@ -0,0 +1,281 @@
+# Copyright (c) 2026 Megh Computing, Inc.
+
+# All rights reserved. No warranty, explicit or implied, provided.
+# Unauthorized use, modification, or distribution is strictly prohibited.
+
+"""Result records and the reporters that write them as text, JSON Lines, or SARIF."""
+
+import abc
+import os
+import sys
+import typing
+
+# Constants.
+formats = ("text", "jsonl", "sarif")
+# Buffered output is written once this many lines have piled up.
+batch_lines = 1024
+sarif_schema = "https://json.schemastore.org/sarif-2.1.0.json"
+# Rule ID -> description. Every result has one of these.
+rules = {
+    "missing-file": "The file does not exist.",
+    "missing-notice": "The copyright notice is missing from the file header.",
+    "future-year": "The copyright start year is in the future.",
+    "backward-years": "The copyright start year is after the end year.",
+    "wrong-start-year": "The copyright start year is not the year the file was added to git.",
+    "stale-year": "The copyright end year is not the current year.",
+    "stray-notice": "A copyright notice outside the file header has other years than the header should.",
+    "duplicate-notice": "A copyright notice outside the file header repeats the header's.",
+    "fixed": "The copyright years were corrected.",
+    "skipped": "The file was not checked.",
+}
+# In text output, these are preceded by a "check failed" line once per file.
+header_check_rules = ("missing-notice", "future-year", "backward-years", "wrong-start-year", "stale-year", "stray-notice")
+
+
+class Result:
+    """One finding about one file. A file can have several."""
+
+    __slots__ = ("path", "rule", "message", "level", "line", "excerpt")
+
+    def __init__(self, path: str, rule: str, message: str, level: str = "error", line: typing.Optional[int] = None, excerpt: typing.Optional[str] = None):
+        self.path = path
+        self.rule = rule
+        self.message = message
+        # "error" for a failed check, "note" for information.
+        self.level = level
+        self.line = line
+        # The start of the file, shown in detailed text output when the notice is missing.
+        self.excerpt = excerpt
+
+    def __repr__(self) -> str:
+        return f"Result({self.path!r}, {self.rule!r}, {self.message!r})"
+
+    def to_dict(self) -> dict:
+        record: typing.Dict[str, typing.Any] = {"path": self.path, "rule": self.rule, "level": self.level, "message": self.message}
+        if self.line is not None:
+            record["line"] = self.line
+        return record
+
+    @classmethod
+    def from_dict(cls, record: dict) -> "Result":
+        return cls(record["path"], record["rule"], record["message"], record.get("level", "error"), record.get("line"), record.get("excerpt"))
+
+
+class Reporter(abc.ABC):
+    """Collects results and writes them out in batches, so a run with many failures makes few writes.
+
+    The stream defaults to sys.stdout at the time of writing.
+    """
+
+    def __init__(self, stream: typing.Optional[typing.TextIO] = None):
+        self.stream = stream
+        self.buffer: typing.List[str] = []
+
+    @abc.abstractmethod
+    def add(self, result: Result) -> None:
+        """Take a result of the file being checked."""
+
+    def end_file(self, path: str, passed: bool) -> None:
+        """Called after all of a file's results were added."""
+
+    def summary(self, failed_paths: list, total: int) -> None:
+        """Called at the end of a verbose run."""
+
+    def write(self, text: str) -> None:
+        self.buffer.append(text)
+        if len(self.buffer) >= batch_lines:
+            self.flush()
+
+    def flush(self) -> None:
+        if self.buffer:
+            (self.stream or sys.stdout).write("".join(self.buffer))
+            self.buffer = []
+
+    def finish(self) -> None:
+        """Write everything still held back. The reporter can then be used for another run."""
+        self.flush()
+
+
+class Collector(Reporter):
+    """Keeps results in memory, for a worker process to send back to the parent."""
+
+    def __init__(self):
+        super().__init__()
+        self.results: typing.List[Result] = []
+
+    def add(self, result: Result) -> None:
+        self.results.append(result)
+
+    def take(self) -> typing.List[Result]:
+        results = self.results
+        self.results = []
+        return results
+
+
+class Recorder(Reporter):
+    """Passes results on to another reporter, and keeps each file's verdict and results, for a --results file."""
+
+    def __init__(self, reporter: Reporter):
+        super().__init__()
+        self.reporter = reporter
+        # {"path", "passed", "results"} per file, in the order the files were checked.
+        self.files: typing.List[dict] = []
+        self.pending: typing.List[Result] = []
+
+    def add(self, result: Result) -> None:
+        self.pending.append(result)
+        self.reporter.add(result)
+
+    def end_file(self, path: str, passed: bool) -> None:
+        self.files.append({"path": path, "passed": passed, "results": self.pending})
+        self.pending = []
+        self.reporter.end_file(path, passed)
+
+    def summary(self, failed_paths: list, total: int) -> None:
+        self.reporter.summary(failed_paths, total)
+
+    def flush(self) -> None:
+        self.reporter.flush()
+
+    def finish(self) -> None:
+        self.reporter.finish()
+
+
+class TextReporter(Reporter):
+    """Human-readable output. After max_details failing files, the rest get one line per result."""
+
+    def __init__(self, stream: typing.Optional[typing.TextIO] = None, max_details: typing.Optional[int] = None):
+        super().__init__(stream)
+        self.max_details = max_details
+        self.detailed_files = 0
+        self.compact_files = 0
+        self.current_path: typing.Optional[str] = None
+        self.current_detailed = True
+        self.header_written = False
+
+    def add(self, result: Result) -> None:
+        if result.rule == "skipped":
+            self.write(result.message + "\n")
+            return
+
+        if result.path != self.current_path:
+            self.current_path = result.path
+            self.current_detailed = self.max_details is None or self.detailed_files < self.max_details
+            self.header_written = False
+
+        if not self.current_detailed:
+            self.write(f"{result.path}: {result.message}\n")
+            return
+
+        if result.rule in header_check_rules and not self.header_written:
+            self.write(f"Copyright header check failed for file: {result.path}\n")
+            self.header_written = True
+        self.write(result.message + "\n")
+        if result.excerpt is not None:
+            self.write("Beginning of file:\n    > " + "\n    > ".join(result.excerpt.split("\n")) + "\n")
+
+    def end_file(self, path: str, passed: bool) -> None:
+        if self.current_path == path and not passed:
+            if self.current_detailed:
+                self.detailed_files += 1
+                self.write("\n")
+            else:
+                self.compact_files += 1
+        self.current_path = None
+
+    def summary(self, failed_paths: list, total: int) -> None:
+        if failed_paths:
+            self.write("Files failed:\n")
+            for path in failed_paths:
+                self.write(f"    {path}\n")
+        self.write(f"{len(failed_paths)}/{total} files failed.\n\n")
+
+    def finish(self) -> None:
+        if self.compact_files:
+            self.write(f"Details were shown for the first {self.detailed_files} failing files. {self.compact_files} more are listed without details.\n")
+        self.flush()
+        self.detailed_files = self.compact_files = 0
+
+
+class JsonLinesReporter(Reporter):
+    """One JSON object per result."""
+
+    def __init__(self, stream: typing.Optional[typing.TextIO] = None):
+        import json
+
+        super().__init__(stream)
+        self.dumps = json.dumps
+
+    def add(self, result: Result) -> None:
+        self.write(self.dumps(result.to_dict()) + "\n")
+
+
+class SarifReporter(Reporter):
+    """A SARIF 2.1.0 log, for code scanning tools. It can only be written once all results are in."""
+
+    def __init__(self, stream: typing.Optional[typing.TextIO] = None):
+        super().__init__(stream)
+        self.results: typing.List[Result] = []
+
+    def add(self, result: Result) -> None:
+        if result.rule != "skipped":
+            self.results.append(result)
+
+    def finish(self) -> None:
+        import json
+
+        self.write(json.dumps(self.to_sarif(), indent=2) + "\n")
+        self.flush()
+        self.results = []
+
+    def to_sarif(self) -> dict:
+        rule_ids = list(rules)
+        return {
+            "$schema": sarif_schema,
+            "version": "2.1.0",
+            "runs": [
+                {
+                    "tool": {
+                        "driver": {
+                            "name": "copyrighter",
+                            "rules": [{"id": rule_id, "shortDescription": {"text": rules[rule_id]}} for rule_id in rule_ids],
+                        }
+                    },
+                    "results": [
+                        {
+                            "ruleId": result.rule,
+                            "ruleIndex": rule_ids.index(result.rule),
+                            "level": result.level,
+                            "message": {"text": result.message},
+                            "locations": [
+                                {
+                                    "physicalLocation": {
+                                        "artifactLocation": {"uri": artifact_uri(result.path)},
+                                        "region": {"startLine": result.line or 1},
+                                    }
+                                }
+                            ],
+                        }
+                        for result in self.results
+                    ],
+                }
+            ],
+        }
+
+
+def artifact_uri(path: str) -> str:
+    """Return the path relative to the working directory, with forward slashes, as SARIF expects."""
+    try:
+        path = os.path.relpath(path)
+    except ValueError:
+        # On another Windows drive.
+        pass
+    return path.replace(os.sep, "/")
+
+
+def make_reporter(output_format: str, max_details: typing.Optional[int] = None, stream: typing.Optional[typing.TextIO] = None) -> Reporter:
+    if output_format == "jsonl":
+        return JsonLinesReporter(stream)
+    if output_format == "sarif":
+        return SarifReporter(stream)
+    return TextReporter(stream, max_details)
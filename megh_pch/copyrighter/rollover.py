@@ -0,0 +1,262 @@
+# Copyright (c) 2026 Megh Computing, Inc.
+
+# All rights reserved. No warranty, explicit or implied, provided.
+# Unauthorized use, modification, or distribution is strictly prohibited.
+
+"""The rollover command: bring the end year of every stale header in a tree up to the current year, once a year.
+
+Files are scanned in chunks, in a process pool with --jobs. The stale files of each chunk are fixed together, like
+--fix does, and the chunk's paths are then added to a checkpoint file. A run that was stopped skips the files in the
+checkpoint, and the checkpoint is removed when the whole tree is done.
+"""
+
+import argparse
+import codecs
+import os
+import sys
+import time
+import typing
+
+from megh_pch.copyrighter import comments, copyrighter, filters, fixer
+
+# Constants.
+checkpoint_filename = ".copyrighter-rollover"
+checkpoint_version = 1
+# The files scanned between checkpoints. Also the most work a stopped run loses.
+checkpoint_files = 2048
+default_progress_interval = 1.0
+
+
+def find_stale(filepath: str, year: int) -> typing.Optional[tuple]:
+    """Return the fix that brings the file's end year to year, or None if its header is not stale or has no notice."""
+    try:
+        size = copyrighter.g_reader.read(filepath)
+    except OSError:
+        return None
+    data = copyrighter.g_reader.buffer
+
+    if data.startswith(copyrighter.wide_byte_order_marks, 0, size):
+        text = copyrighter.decode_header(bytes(data[:size]))
+        match = copyrighter.g_registry.match(text[: comments.header_end(filepath, text)]) if text is not None else None  # type: ignore
+    elif data.find(b"\0", 0, size) >= 0:
+        return None
+    else:
+        start = len(codecs.BOM_UTF8) if data.startswith(codecs.BOM_UTF8, 0, size) else 0
+        match = copyrighter.g_registry.match_bytes(data, comments.header_end(filepath, data, start, size))  # type: ignore
+
+    if match is None or match.end_year >= year or match.start_year > year:
+        return None
+    return filepath, match.start_year, year, match
+
+
+def scan(registry: typing.Any, year: int, filepaths: list) -> list:
+    """Return the fixes of the stale files among filepaths. Runs in a worker process with --jobs."""
+    copyrighter.g_registry = registry
+    return [fix for fix in (find_stale(filepath, year) for filepath in filepaths) if fix is not None]
+
+
+class Checkpoint:
+    """The paths a run has finished, one per line after a header line naming the year they were rolled over to."""
+
+    def __init__(self, path: str, year: int):
+        self.path = path
+        self.year = year
+        self.done: typing.Set[str] = set()
+        self.file: typing.Optional[typing.TextIO] = None
+
+    def load(self) -> None:
+        """Read the paths finished by an earlier run to the same year. A checkpoint for another year is ignored."""
+        try:
+            with open(self.path, "r", encoding="utf-8", errors="surrogateescape") as file:
+                if file.readline() != self.header():
+                    return
+                self.done = {line[:-1] for line in file if line.endswith("\n")}
+        except FileNotFoundError:
+            pass
+
+    def header(self) -> str:
+        return f"copyrighter-rollover {checkpoint_version} {self.year}\n"
+
+    def add(self, filepaths: typing.Iterable[str]) -> None:
+        """Record the files as done, durably. A path with a newline in it is not recorded, and is scanned again."""
+        if self.file is None:
+            resume = bool(self.done)
+            self.file = open(self.path, "a" if resume else "w", encoding="utf-8", errors="surrogateescape")
+            if not resume:
+                self.file.write(self.header())
+        self.file.writelines(f"{filepath}\n" for filepath in filepaths if "\n" not in filepath)
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def close(self) -> None:
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def remove(self) -> None:
+        self.close()
+        fixer.remove(self.path)
+
+
+class Progress:
+    """Prints how far a run is to stderr, at most once per interval. On a terminal, the line is overwritten."""
+
+    def __init__(self, total: int, interval: typing.Optional[float]):
+        self.total = total
+        self.interval = interval
+        self.scanned = 0
+        self.updated = 0
+        self.start = time.perf_counter()
+        self.last = self.start
+        self.tty = sys.stderr.isatty()
+
+    def add(self, scanned: int, updated: int) -> None:
+        self.scanned += scanned
+        self.updated += updated
+        now = time.perf_counter()
+        if self.interval is not None and now - self.last >= self.interval:
+            self.last = now
+            print(self.line(now), end="\r" if self.tty else "\n", file=sys.stderr, flush=True)
+
+    def line(self, now: float) -> str:
+        rate = self.scanned / max(now - self.start, 1e-9)
+        return f"{self.scanned}/{self.total} files scanned, {self.updated} updated, {rate:.0f} files/s"
+
+    def finish(self) -> float:
+        now = time.perf_counter()
+        if self.interval is not None and self.tty:
+            # Leave the last progress line, with the final counts.
+            print(self.line(now), file=sys.stderr)
+        return now - self.start
+
+
+def chunks(registry: typing.Any, year: int, filepaths: list, jobs: int) -> typing.Iterator[tuple]:
+    """Yield (chunk of filepaths, fixes of its stale files), in order."""
+    if jobs == 1 or len(filepaths) <= checkpoint_files:
+        for i in range(0, len(filepaths), checkpoint_files):
+            chunk = filepaths[i : i + checkpoint_files]
+            yield chunk, scan(registry, year, chunk)
+        return
+
+    import concurrent.futures
+
+    # Smaller pieces than a checkpoint keep every worker busy. At most two checkpoints' worth are in flight, so a
+    # stopped run has not scanned much past its checkpoint.
+    size = max(1, min(256, checkpoint_files // jobs))
+    with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as executor:
+        pending: typing.List[tuple] = []
+        for i in range(0, len(filepaths), checkpoint_files):
+            chunk = filepaths[i : i + checkpoint_files]
+            pending.append((chunk, [executor.submit(scan, registry, year, chunk[j : j + size]) for j in range(0, len(chunk), size)]))
+            if len(pending) > 1:
+                chunk, futures = pending.pop(0)
+                yield chunk, [fix for future in futures for fix in future.result()]
+        for chunk, futures in pending:
+            yield chunk, [fix for future in futures for fix in future.result()]
+
+
+def make_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Update the end year of every stale copyright header to the current year, e.g. every January. Missing or otherwise invalid headers are left alone.",
+    )
+    parser.add_argument(
+        "filename",
+        help="The files and directories to update. Directories are searched for files with the checked extensions. Defaults to the working directory.",
+        nargs="*",
+        default=[],
+    )
+    parser.add_argument(
+        "-e",
+        "--extensions",
+        default=None,
+        help="The path of a file with a list of extensions to update.",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=copyrighter.parse_jobs,
+        default=1,
+        help='The number of processes scanning files, or "auto" for one per CPU. Defaults to 1.',
+    )
+    parser.add_argument("--include", action="append", default=[], metavar="GLOB", help="As for checks.")
+    parser.add_argument("--exclude", action="append", default=[], metavar="GLOB", help="As for checks.")
+    parser.add_argument("--exclude-from", action="append", default=[], metavar="FILE", help="As for checks.")
+    parser.add_argument("--exclude-dir", action="append", default=[], metavar="NAME", help="As for checks.")
+    parser.add_argument("-p", "--profiles", default=None, help="The path of a JSON file with extra header profiles to accept.")
+    parser.add_argument(
+        "--year",
+        type=int,
+        default=None,
+        help="The end year to update headers to. Defaults to the current year.",
+    )
+    parser.add_argument(
+        "--checkpoint",
+        default=checkpoint_filename,
+        metavar="FILE",
+        help=f"Where finished files are recorded, so a stopped run can resume. Defaults to {checkpoint_filename} in the working directory.",
+    )
+    parser.add_argument(
+        "--progress-interval",
+        type=float,
+        default=default_progress_interval,
+        metavar="SECONDS",
+        help=f"How often progress is printed to stderr. Defaults to {default_progress_interval:g}.",
+    )
+    parser.add_argument("-q", "--quiet", action="store_true", help="Do not print progress.")
+    parser.set_defaults(command="rollover")
+    return parser
+
+
+def parse_args(argv: typing.Optional[list] = None, prog: typing.Optional[str] = None) -> argparse.Namespace:
+    parser = make_parser()
+    if prog:
+        parser.prog = prog
+    return parser.parse_args(argv)
+
+
+def run(args: argparse.Namespace, state: typing.Optional[dict] = None) -> int:
+    """Run a rollover with parsed arguments and return the exit code. See copyrighter.reuse for the state."""
+    year = args.year or time.localtime().tm_year
+    registry = copyrighter.reuse(state, ("registry",) + copyrighter.file_key(args.profiles), lambda: copyrighter.get_registry(args.profiles))
+    if registry is None:
+        return 1
+    copyrighter.g_registry = registry
+    extensions = copyrighter.get_extensions(args.extensions)
+    excludes = copyrighter.get_excludes(args.exclude, args.exclude_from, args.exclude_dir)
+    if not extensions or excludes is None:
+        return 1
+    if os.path.exists(fixer.journal_path()):
+        print(f"An interrupted --fix run left {fixer.journal_path()}. Run copyrighter --recover resume or --recover rollback first.")
+        return 1
+
+    checkpoint = Checkpoint(os.path.abspath(args.checkpoint), year)
+    checkpoint.load()
+    path_filter = filters.PathFilter(extensions, args.include, excludes)
+    # Files are listed up front, for the progress total. Finished files are dropped before they are read.
+    filepaths = list(dict.fromkeys(path for path, file_stat, reason in copyrighter.expand_paths(args.filename or ["."], path_filter) if file_stat is not None and reason is None))
+    resumed = len(filepaths)
+    filepaths = [filepath for filepath in filepaths if filepath not in checkpoint.done]
+    resumed -= len(filepaths)
+
+    progress = Progress(len(filepaths), None if args.quiet else args.progress_interval)
+    try:
+        for chunk, fixes in chunks(registry, year, filepaths, args.jobs):
+            batch = fixer.FixBatch()
+            batch.extend(fixes)
+            batch.commit(copyrighter.fix_edits)
+            checkpoint.add(chunk)
+            progress.add(len(chunk), len(fixes))
+    except (OSError, ValueError) as e:
+        checkpoint.close()
+        print(f"Rollover stopped, and can be resumed: {e}")
+        return 1
+    except KeyboardInterrupt:
+        checkpoint.close()
+        print("Rollover stopped, and can be resumed.")
+        return 1
+
+    elapsed = progress.finish()
+    checkpoint.remove()
+    message = f"Updated {progress.updated} of {progress.scanned} files to {year} in {elapsed:.1f}s ({progress.scanned / max(elapsed, 1e-9):.0f} files/s)"
+    print(message + (f", after {resumed} files done by an earlier run." if resumed else "."))
+    return 0
@@ -0,0 +1,92 @@
+# Copyright (c) 2026 Megh Computing, Inc.
+
+# All rights reserved. No warranty, explicit or implied, provided.
+# Unauthorized use, modification, or distribution is strictly prohibited.
+
+"""Ordering the files of a parallel check by their predicted cost, and stopping a check early with --max-failures and
+--time-budget.
+
+A file's cost is predicted from how long its last check took, as recorded in the --cache-dir cache, whether it passed
+or failed. A file that was never timed is predicted like shard.Shard.select does: the bytes read of it plus a fixed
+overhead per file. Reads stop after the header, so without --deep, which searches whole files, files cost about the
+same, and the order matters little.
+"""
+
+import os
+import time
+import typing
+
+from megh_pch.copyrighter import shard
+
+# Constants.
+# The most files sent to a worker at once.
+max_chunk_files = 64
+# Bytes of a file that --deep searches in a microsecond, measured on a warm page cache. Converts past times to costs.
+bytes_per_microsecond = 1000
+
+
+def predicted_cost(file_stat: typing.Optional[os.stat_result], max_bytes: typing.Optional[int], past_us: typing.Optional[int] = None) -> int:
+    """Return the estimated time to check a file, in bytes: past_us, the microseconds its last check took, if known.
+    Else the bytes read of it, at most max_bytes if not None, plus shard.file_overhead_bytes.
+    """
+    if past_us is not None:
+        return past_us * bytes_per_microsecond
+    if file_stat is None:
+        return shard.file_overhead_bytes
+    size = file_stat.st_size if max_bytes is None else min(file_stat.st_size, max_bytes)
+    return size + shard.file_overhead_bytes
+
+
+def plan_chunks(paths: list, costs: list, jobs: int) -> typing.List[list]:
+    """Split paths into the chunks to send to jobs workers, costliest first.
+
+    Each chunk costs about a quarter of a worker's share of the total, and has at most max_chunk_files files. A costly
+    file gets a chunk of its own, which starts first rather than last, so the workers finish at about the same time.
+    """
+    order = sorted(range(len(paths)), key=lambda i: -costs[i])
+    target = sum(costs) // (jobs * 4)
+    chunks = []
+    chunk: list = []
+    chunk_cost = 0
+    for i in order:
+        chunk.append(paths[i])
+        chunk_cost += costs[i]
+        if chunk_cost >= target or len(chunk) >= max_chunk_files:
+            chunks.append(chunk)
+            chunk = []
+            chunk_cost = 0
+    if chunk:
+        chunks.append(chunk)
+    return chunks
+
+
+class Budget:
+    """When to stop a check before every file is checked: once max_failures files failed, or time_budget seconds after
+    the budget was made. Either can be None.
+    """
+
+    __slots__ = ("max_failures", "time_budget", "deadline", "checked", "failures", "reason")
+
+    def __init__(self, max_failures: typing.Optional[int] = None, time_budget: typing.Optional[float] = None):
+        self.max_failures = max_failures
+        self.time_budget = time_budget
+        self.deadline = time.monotonic() + time_budget if time_budget is not None else None
+        self.checked = 0
+        self.failures = 0
+        # Why the budget ran out, once it has.
+        self.reason: typing.Optional[str] = None
+
+    def record(self, passed: bool) -> None:
+        self.checked += 1
+        if not passed:
+            self.failures += 1
+
+    def exhausted(self) -> bool:
+        """Return whether the check should stop before the next file."""
+        if self.reason is not None:
+            return True
+        if self.max_failures is not None and self.failures >= self.max_failures:
+            self.reason = f"{self.failures} file(s) failed (--max-failures {self.max_failures})"
+        elif self.deadline is not None and time.monotonic() >= self.deadline:
+            self.reason = f"the time budget of {self.time_budget:g} seconds ran out (--time-budget)"
+        return self.reason is not None
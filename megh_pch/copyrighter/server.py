@@ -0,0 +1,237 @@
+# Copyright (c) 2026 Megh Computing, Inc.
+
+# All rights reserved. No warranty, explicit or implied, provided.
+# Unauthorized use, modification, or distribution is strictly prohibited.
+
+"""A long-lived copyrighter for one repository, which keeps compiled profiles and loaded caches between checks.
+
+Clients send their arguments over a Unix socket and get back the output and exit code. Requests are run one at a
+time. Files that changed between requests are found the way a single run finds them, by comparing their stat with
+the cache.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import signal
+import socket
+import sys
+import traceback
+import typing
+
+from megh_pch.copyrighter import client, copyrighter
+
+# Constants.
+default_idle_timeout = 3600
+max_request_bytes = 16 * 1024 * 1024
+# Seconds to wait on a client that stops sending or receiving, so that one stuck client does not hold up the others.
+connection_timeout = 10
+
+
+class Server:
+    def __init__(self, root: str, path: str, idle_timeout: float = default_idle_timeout):
+        self.root = root
+        self.path = path
+        self.idle_timeout = idle_timeout
+        # Objects kept warm between requests. See copyrighter.run.
+        self.state: dict = {}
+        self.requests = 0
+        self.listener: typing.Optional[socket.socket] = None
+
+    def bind(self) -> bool:
+        """Listen on the socket. Return False if another server is already listening on it. Raise OSError if the
+        socket's directory is not safe to listen in.
+        """
+        os.makedirs(os.path.dirname(self.path), mode=0o700, exist_ok=True)
+        client.check_directory(os.path.dirname(self.path))
+        if os.path.exists(self.path):
+            try:
+                client.request(self.path, {"version": client.protocol_version, "command": "status"})
+            except (client.NoServer, OSError, ValueError):
+                # Left behind by a server that did not exit cleanly.
+                os.unlink(self.path)
+            else:
+                return False
+
+        self.listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.listener.bind(self.path)
+        self.listener.listen()
+        if self.idle_timeout:
+            self.listener.settimeout(self.idle_timeout)
+        return True
+
+    def close(self) -> None:
+        if self.listener is not None:
+            self.listener.close()
+            self.listener = None
+            with contextlib.suppress(OSError):
+                os.unlink(self.path)
+
+    def serve(self) -> None:
+        """Answer requests until stopped or idle for idle_timeout seconds."""
+        while True:
+            try:
+                connection, _ = self.listener.accept()  # type: ignore
+            except socket.timeout:
+                return
+            with connection:
+                connection.settimeout(connection_timeout)
+                try:
+                    message = receive(connection)
+                except OSError:
+                    continue
+                if message is None:
+                    continue
+                response = self.handle(message)
+                with contextlib.suppress(OSError):
+                    connection.sendall(json.dumps(response).encode())
+                if message.get("command") == "stop":
+                    return
+
+    def handle(self, message: dict) -> dict:
+        response: typing.Dict[str, typing.Any] = {"version": client.protocol_version}
+        if message.get("version") != client.protocol_version:
+            return response
+        command = message.get("command", "check")
+        if command == "status":
+            response.update(stdout=f"Serving {self.root} (pid {os.getpid()}, {self.requests} requests)\n", returncode=0)
+        elif command == "stop":
+            response.update(stdout=f"Stopped the server for {self.root}\n", returncode=0)
+        elif message.get("root") != self.root:
+            # Another repository whose root hashes to the same socket. The client checks in process.
+            response.update(root=self.root, stderr=f"This server is for {self.root}, not {message.get('root')}\n", returncode=1)
+        else:
+            self.requests += 1
+            response.update(self.check(message["cwd"], message["argv"], message.get("env", {}), message.get("prog", "copyrighter")))
+        return response
+
+    def check(self, cwd: str, argv: list, env: dict, prog: str = "copyrighter") -> dict:
+        """Run one check as the client would have, and return its output and exit code."""
+        stdout = io.StringIO()
+        stderr = io.StringIO()
+        saved_cwd = os.getcwd()
+        saved_env = {name: value for name, value in os.environ.items() if name.startswith(client.env_prefix)}
+        try:
+            os.chdir(cwd)
+            set_git_env(env)
+            with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+                try:
+                    args = copyrighter.parse_args(argv, prog)
+                    if getattr(args, "files_from", None) == "-":
+                        print("The server cannot read a list of files from standard input. Run copyrighter instead.", file=sys.stderr)
+                        returncode = 1
+                    else:
+                        returncode = copyrighter.run(args, self.state)
+                except SystemExit as e:
+                    # Bad arguments, or --help.
+                    returncode = e.code if isinstance(e.code, int) else 1
+                except Exception:
+                    traceback.print_exc()
+                    returncode = 1
+        except OSError as e:
+            stderr.write(f"Cannot run in {cwd}: {e}\n")
+            returncode = 1
+        finally:
+            set_git_env(saved_env)
+            os.chdir(saved_cwd)
+        return {"stdout": stdout.getvalue(), "stderr": stderr.getvalue(), "returncode": returncode}
+
+
+def receive(connection: socket.socket) -> typing.Optional[dict]:
+    """Read one JSON request, which ends with a newline or when the client shuts down its side."""
+    chunks = []
+    size = 0
+    while True:
+        chunk = connection.recv(client.buffer_size)
+        if not chunk:
+            break
+        chunks.append(chunk)
+        size += len(chunk)
+        if chunk.endswith(b"\n") or size > max_request_bytes:
+            break
+    try:
+        message = json.loads(b"".join(chunks))
+    except ValueError:
+        return None
+    return message if isinstance(message, dict) else None
+
+
+def set_git_env(env: dict) -> None:
+    """Make the GIT_* environment variables exactly the given ones, as git commands run for a request see them."""
+    for name in [name for name in os.environ if name.startswith(client.env_prefix)]:
+        if name not in env:
+            del os.environ[name]
+    os.environ.update({name: value for name, value in env.items() if name.startswith(client.env_prefix)})
+
+
+def detach() -> None:
+    """Keep running in the background, apart from the terminal that started the server."""
+    if os.fork():
+        os._exit(0)
+    os.setsid()
+    if os.fork():
+        os._exit(0)
+    null = os.open(os.devnull, os.O_RDWR)
+    for fd in (0, 1, 2):
+        os.dup2(null, fd)
+    os.close(null)
+
+
+def make_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Serve copyrighter checks for the repository in the working directory, to copyrighter-client.")
+    parser.add_argument(
+        "--idle-timeout",
+        type=float,
+        default=default_idle_timeout,
+        metavar="SECONDS",
+        help=f"Exit after this many seconds without a request. 0 means never. Default: {default_idle_timeout}.",
+    )
+    parser.add_argument("--detach", action="store_true", help="Run in the background.")
+    command = parser.add_mutually_exclusive_group()
+    command.add_argument("--status", action="store_true", help="Show whether a server is running, and exit.")
+    command.add_argument("--stop", action="store_true", help="Stop the running server, and exit.")
+    return parser
+
+
+def main(argv: typing.Optional[list] = None) -> int:
+    args = make_parser().parse_args(argv)
+    root = client.repository_root(os.getcwd())
+    path = client.socket_path(root)
+
+    if args.status or args.stop:
+        try:
+            response = client.request(path, {"version": client.protocol_version, "command": "stop" if args.stop else "status"})
+        except (client.NoServer, OSError, ValueError):
+            print(f"No server is running for {root}")
+            return 1
+        sys.stdout.write(response.get("stdout", ""))
+        return 0
+
+    server = Server(root, path, args.idle_timeout)
+    try:
+        if not server.bind():
+            print(f"A server is already running for {root}")
+            return 0
+    except OSError as e:
+        print(f"Cannot serve {root}: {e}", file=sys.stderr)
+        return 1
+    if args.detach:
+        detach()
+
+    def terminate(signum: int, frame: typing.Any) -> None:
+        raise SystemExit(0)
+
+    signal.signal(signal.SIGTERM, terminate)
+    try:
+        server.serve()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,191 @@
+# Copyright (c) 2026 Megh Computing, Inc.
+
+# All rights reserved. No warranty, explicit or implied, provided.
+# Unauthorized use, modification, or distribution is strictly prohibited.
+
+"""Splitting a check across CI runners with --shard, and the merge command that combines their --results files.
+
+Every runner must see the same files from the same working directory. Files are assigned by a hash of their path
+relative to the working directory, or, with --shard-weight size, by balancing the estimated time of each shard.
+"""
+
+import argparse
+import sys
+import typing
+import zlib
+
+from megh_pch.copyrighter import report
+
+# Constants.
+results_version = 1
+# Checking a file costs about as much as reading this many more bytes of it, measured on a warm page cache.
+file_overhead_bytes = 40960
+
+
+class Shard:
+    """One of count shards, numbered from 1."""
+
+    def __init__(self, index: int, count: int, weight: str = "count"):
+        self.index = index
+        self.count = count
+        self.weight = weight
+
+    def __repr__(self) -> str:
+        return f"{self.index}/{self.count}"
+
+    def owns(self, path: str) -> bool:
+        """Return whether the file is in this shard, by a hash of its path that every runner computes alike."""
+        return zlib.crc32(report.artifact_uri(path).encode(errors="surrogateescape")) % self.count == self.index - 1
+
+    def select(self, expanded: typing.Iterable[tuple], max_bytes: int) -> typing.Iterable[tuple]:
+        """Return the (path, stat, reason) entries of expand_paths that are in this shard, in their order.
+
+        By count, entries are filtered as they come. By size, every file is first assigned to the shard with the least
+        estimated time so far, largest first, so all entries are needed up front. A file's time is estimated from the
+        bytes read of it, at most max_bytes, plus file_overhead_bytes.
+        """
+        if self.weight == "count":
+            return (entry for entry in expanded if self.owns(entry[0]))
+
+        import heapq
+
+        entries = list(expanded)
+        sized = []
+        mine = set()
+        for i, (path, file_stat, reason) in enumerate(entries):
+            if reason is not None or file_stat is None:
+                # Skipped or missing files cost next to nothing.
+                if self.owns(path):
+                    mine.add(i)
+            else:
+                sized.append((-min(file_stat.st_size, max_bytes), report.artifact_uri(path), i))
+        sized.sort()
+        loads = [(0, index) for index in range(1, self.count + 1)]
+        for size, _, i in sized:
+            load, index = heapq.heappop(loads)
+            if index == self.index:
+                mine.add(i)
+            heapq.heappush(loads, (load + file_overhead_bytes - size, index))
+        return [entry for i, entry in enumerate(entries) if i in mine]
+
+
+def parse_shard(value: str) -> Shard:
+    """Parse the --shard argument, INDEX/COUNT with 1 <= INDEX <= COUNT."""
+    try:
+        index, count = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'expected INDEX/COUNT, e.g. "1/4", got "{value}"')
+    if not 1 <= index <= count:
+        raise argparse.ArgumentTypeError(f'expected INDEX/COUNT with 1 <= INDEX <= COUNT, got "{value}"')
+    return Shard(index, count)
+
+
+def write_results(path: str, shard: typing.Optional[Shard], passed: bool, recorder: report.Recorder) -> None:
+    """Write the verdict and findings of a run, with paths relative to the working directory."""
+    import json
+
+    files = []
+    for record in recorder.files:
+        results = []
+        for result in record["results"]:
+            result_dict = result.to_dict()
+            result_dict["path"] = report.artifact_uri(result.path)
+            if result.excerpt is not None:
+                result_dict["excerpt"] = result.excerpt
+            results.append(result_dict)
+        files.append({"path": report.artifact_uri(record["path"]), "passed": record["passed"], "results": results})
+
+    data = {"version": results_version, "shard": [shard.index, shard.count] if shard else [1, 1], "passed": passed, "files": files}
+    with open(path, "w") as file:
+        json.dump(data, file)
+
+
+def read_results(path: str) -> dict:
+    """Read a --results file. Raise ValueError if it is not one."""
+    import json
+
+    with open(path, "r") as file:
+        try:
+            data = json.load(file)
+        except json.JSONDecodeError as e:
+            raise ValueError(f'Could not parse results file "{path}": {e}')
+    if not isinstance(data, dict) or data.get("version") != results_version:
+        raise ValueError(f'"{path}" is not a copyrighter results file of version {results_version}.')
+    return data
+
+
+def make_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Combine the --results files of every shard of a check into one report and exit code.")
+    parser.add_argument("results", nargs="+", metavar="FILE", help="The --results file of each shard, in any order.")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Print the failed files and counts at the end.")
+    parser.add_argument(
+        "--format",
+        choices=report.formats,
+        default="text",
+        help="How findings are printed: text, JSON Lines (one object per finding), or a SARIF log for code scanning. Defaults to text.",
+    )
+    parser.add_argument(
+        "--max-details",
+        type=int,
+        default=None,
+        help="With text output, print full details for this many failing files only, and one line per finding after that.",
+    )
+    parser.set_defaults(command="merge")
+    return parser
+
+
+def parse_args(argv: typing.Optional[list] = None, prog: typing.Optional[str] = None) -> argparse.Namespace:
+    parser = make_parser()
+    if prog:
+        parser.prog = prog
+    return parser.parse_args(argv)
+
+
+def run(args: argparse.Namespace, state: typing.Optional[dict] = None) -> int:
+    """Merge the results files and return the exit code: 1 if any shard failed or is missing."""
+    shards: typing.Dict[int, dict] = {}
+    counts = set()
+    for path in args.results:
+        try:
+            data = read_results(path)
+        except (OSError, ValueError) as e:
+            print(str(e))
+            return 1
+        index, count = data["shard"]
+        if index in shards:
+            print(f'Shard {index}/{count} is given twice, the second time in "{path}".')
+            return 1
+        shards[index] = data
+        counts.add(count)
+    if len(counts) != 1:
+        print(f"The results files are from runs split into different numbers of shards: {', '.join(map(str, sorted(counts)))}.")
+        return 1
+    count = counts.pop()
+    missing = [str(index) for index in range(1, count + 1) if index not in shards]
+    if missing:
+        print(f"Missing the results of shard(s) {', '.join(missing)} of {count}.")
+        return 1
+
+    reporter = report.make_reporter(args.format, args.max_details)
+    failed_paths = []
+    total = 0
+    passed = True
+    for index in sorted(shards):
+        data = shards[index]
+        for record in data["files"]:
+            total += 1
+            for result in record["results"]:
+                reporter.add(report.Result.from_dict(result))
+            reporter.end_file(record["path"], record["passed"])
+            if not record["passed"]:
+                failed_paths.append(record["path"])
+        if not data["passed"]:
+            passed = False
+            if not any(not record["passed"] for record in data["files"]):
+                # Stopped by an error, like a git failure, before its files were checked.
+                reporter.flush()
+                print(f"Shard {index}/{count} did not finish its check.", file=sys.stderr)
+    if args.verbose:
+        reporter.summary(failed_paths, total)
+    reporter.finish()
+    return 0 if passed and not failed_paths else 1
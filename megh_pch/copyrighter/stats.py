@@ -0,0 +1,143 @@
+# Copyright (c) 2026 Megh Computing, Inc.
+
+# All rights reserved. No warranty, explicit or implied, provided.
+# Unauthorized use, modification, or distribution is strictly prohibited.
+
+"""Per-phase timers and counters, enabled with --stats."""
+
+import heapq
+import os
+import time
+import typing
+
+# Constants.
+default_slowest = 10
+counter_names = (
+    "files_seen",
+    "skipped_extension",
+    "skipped_init",
+    "skipped_excluded",
+    "skipped_binary",
+    "bytes_read",
+    "bytes_scanned",
+    "cache_hits",
+    "cache_misses",
+    "header_memo_hits",
+    "header_memo_misses",
+    "trees_skipped",
+    "files_rewritten",
+    "files_failed",
+)
+
+
+def process_age() -> typing.Optional[float]:
+    """Return the seconds since this process started, or None if the OS does not say. Linux only."""
+    try:
+        with open("/proc/self/stat", "rb") as file:
+            # The command name can contain spaces, so count fields from after its closing parenthesis.
+            fields = file.read().rsplit(b")", 1)[1].split()
+        with open("/proc/uptime", "rb") as file:
+            uptime = float(file.read().split()[0])
+        return uptime - int(fields[19]) / os.sysconf("SC_CLK_TCK")
+    except (OSError, IndexError, ValueError, AttributeError):
+        return None
+
+
+class _Phase:
+    __slots__ = ("stats", "name", "wall", "cpu")
+
+    def __init__(self, stats: "Stats", name: str):
+        self.stats = stats
+        self.name = name
+
+    def __enter__(self) -> None:
+        self.wall = time.perf_counter()
+        self.cpu = time.process_time()
+
+    def __exit__(self, *args) -> None:
+        timing = self.stats.phases.setdefault(self.name, [0.0, 0.0, 0])
+        timing[0] += time.perf_counter() - self.wall
+        timing[1] += time.process_time() - self.cpu
+        timing[2] += 1
+
+
+class _NullPhase:
+    """Stands in for a phase timer when stats are off, so timing costs nothing but a with statement."""
+
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        pass
+
+    def __exit__(self, *args) -> None:
+        pass
+
+
+null_phase = _NullPhase()
+
+
+class Stats:
+    """Wall and CPU time per phase, counters, and the slowest files of a run."""
+
+    def __init__(self, slowest: int = default_slowest):
+        self.slowest = slowest
+        # Phase name -> [wall seconds, CPU seconds, times entered].
+        self.phases: typing.Dict[str, list] = {}
+        self.counters = dict.fromkeys(counter_names, 0)
+        # Min-heap of (seconds, path), so the fastest of the slowest is dropped first.
+        self.slowest_files: typing.List[tuple] = []
+
+    def phase(self, name: str) -> _Phase:
+        return _Phase(self, name)
+
+    def count(self, name: str, n: int = 1) -> None:
+        self.counters[name] += n
+
+    def add_phase(self, name: str, wall: float, cpu: float = 0.0) -> None:
+        timing = self.phases.setdefault(name, [0.0, 0.0, 0])
+        timing[0] += wall
+        timing[1] += cpu
+        timing[2] += 1
+
+    def file_done(self, path: str, seconds: float) -> None:
+        if len(self.slowest_files) < self.slowest:
+            heapq.heappush(self.slowest_files, (seconds, path))
+        elif seconds > self.slowest_files[0][0]:
+            heapq.heapreplace(self.slowest_files, (seconds, path))
+
+    def merge(self, other: dict) -> None:
+        """Add the stats of a worker process, as returned by to_dict."""
+        for name, timing in other["phases"].items():
+            mine = self.phases.setdefault(name, [0.0, 0.0, 0])
+            mine[0] += timing["wall"]
+            mine[1] += timing["cpu"]
+            mine[2] += timing["count"]
+        for name, value in other["counters"].items():
+            self.counters[name] = self.counters.get(name, 0) + value
+        for item in other["slowest_files"]:
+            self.file_done(item["path"], item["seconds"])
+
+    def to_dict(self) -> dict:
+        return {
+            "phases": {name: {"wall": wall, "cpu": cpu, "count": count} for name, (wall, cpu, count) in self.phases.items()},
+            "counters": dict(self.counters),
+            "slowest_files": [{"path": path, "seconds": seconds} for seconds, path in sorted(self.slowest_files, reverse=True)],
+        }
+
+    def format(self, output_format: str) -> str:
+        if output_format == "json":
+            import json
+
+            return json.dumps(self.to_dict(), indent=2)
+
+        lines = ["Phases:", f"    {'phase':<12} {'wall (s)':>10} {'cpu (s)':>10} {'count':>10}"]
+        for name, (wall, cpu, count) in self.phases.items():
+            lines.append(f"    {name:<12} {wall:>10.4f} {cpu:>10.4f} {count:>10}")
+        lines.append("Counters:")
+        for name, value in self.counters.items():
+            lines.append(f"    {name:<18} {value:>12}")
+        if self.slowest_files:
+            lines.append(f"Slowest {len(self.slowest_files)} files:")
+            for seconds, path in sorted(self.slowest_files, reverse=True):
+                lines.append(f"    {seconds * 1000:>9.3f} ms  {path}")
+        return "\n".join(lines)
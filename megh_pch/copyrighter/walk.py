@@ -0,0 +1,167 @@
+# Copyright (c) 2026 Megh Computing, Inc.
+
+# All rights reserved. No warranty, explicit or implied, provided.
+# Unauthorized use, modification, or distribution is strictly prohibited.
+
+"""Walking directory arguments with os.scandir, pruning ignored directories before entering them."""
+
+import os
+import re
+import typing
+
+from megh_pch.copyrighter import filters
+
+# Constants.
+# Never entered: version control, dependencies, caches, and build output.
+pruned_dirs = frozenset(
+    (
+        ".git",
+        ".hg",
+        ".svn",
+        "node_modules",
+        "bower_components",
+        "__pycache__",
+        ".mypy_cache",
+        ".pytest_cache",
+        ".tox",
+        ".nox",
+        ".venv",
+        "venv",
+        ".eggs",
+        "build",
+        "dist",
+    )
+)
+gitignore_name = ".gitignore"
+
+
+class IgnoreRules:
+    """The patterns of one .gitignore file, matched against paths relative to its directory."""
+
+    def __init__(self, lines: typing.Iterable[str]):
+        # (regex, negated, directories only), in file order.
+        self.rules: typing.List[tuple] = []
+        for line in lines:
+            line = line.rstrip("\n").rstrip()
+            if not line or line.startswith("#"):
+                continue
+            negated = line.startswith("!")
+            if negated:
+                line = line[1:]
+            dir_only = line.endswith("/")
+            line = line.rstrip("/")
+            if not line:
+                continue
+            # A pattern with a slash before its end is relative to the .gitignore. Others match at any depth.
+            if "/" in line:
+                line = line.lstrip("/")
+            else:
+                line = "**/" + line
+            self.rules.append((re.compile(filters.translate_glob(line) + r"\Z"), negated, dir_only))
+
+    @classmethod
+    def load(cls, directory: str) -> typing.Optional["IgnoreRules"]:
+        """Return the rules of the directory's .gitignore, or None if it has none."""
+        try:
+            with open(os.path.join(directory, gitignore_name), "r", errors="surrogateescape") as file:
+                rules = cls(file)
+        except OSError:
+            return None
+        return rules if rules.rules else None
+
+    def match(self, path: str, is_dir: bool) -> typing.Optional[bool]:
+        """Return True if the path is ignored, False if it is re-included with "!", or None if no pattern matches."""
+        for regex, negated, dir_only in reversed(self.rules):
+            if dir_only and not is_dir:
+                continue
+            if regex.match(path):
+                return not negated
+        return None
+
+
+def is_ignored(levels: list, path: str, is_dir: bool) -> bool:
+    """Check a path against the .gitignore files of its directory and its parents.
+
+    levels holds (directory, rules) pairs from the top down, and the path must be under each directory. A deeper
+    .gitignore overrides a shallower one.
+    """
+    for directory, rules in reversed(levels):
+        ignored = rules.match(path[len(directory) + 1 :].replace(os.sep, "/"), is_dir)
+        if ignored is not None:
+            return ignored
+    return False
+
+
+def find_repository_root(directory: str) -> typing.Optional[str]:
+    """Return the nearest directory at or above the given one that contains .git, or None."""
+    while True:
+        if os.path.exists(os.path.join(directory, ".git")):
+            return directory
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            return None
+        directory = parent
+
+
+def parent_rules(directory: str) -> list:
+    """Return the (directory, rules) levels of the .gitignore files above the directory, up to its repository root."""
+    root = find_repository_root(directory)
+    if root is None:
+        return []
+
+    levels = []
+    current = root
+    for part in os.path.relpath(directory, root).split(os.sep):
+        if part in (".", ""):
+            break
+        rules = IgnoreRules.load(current)
+        if rules is not None:
+            levels.append((current, rules))
+        current = os.path.join(current, part)
+    return levels
+
+
+def walk(directory: str, path_filter: filters.PathFilter, use_gitignore: bool = True) -> typing.Iterator[os.DirEntry]:
+    """Yield the regular files under the directory that the filter accepts, as they are found.
+
+    Directory entries' own type information decides what to enter, so most files are never stat'ed. Symlinks to
+    directories are not followed. Unreadable directories are skipped.
+    """
+    directory = os.path.abspath(directory)
+    levels = parent_rules(directory) if use_gitignore else []
+    # Depth first, so the .gitignore levels can be a stack: (directory, how many levels apply to it).
+    stack = [(directory, len(levels))]
+    while stack:
+        current, depth = stack.pop()
+        del levels[depth:]
+
+        try:
+            with os.scandir(current) as iterator:
+                # Sorted, so the files are checked in the same order on every run.
+                entries = sorted(iterator, key=lambda entry: entry.name)
+        except OSError:
+            continue
+
+        # The listing says whether there is a .gitignore, so directories without one cost no extra syscall.
+        if use_gitignore and any(entry.name == gitignore_name for entry in entries):
+            rules = IgnoreRules.load(current)
+            if rules is not None:
+                levels.append((current, rules))
+        depth = len(levels)
+
+        subdirs = []
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name in pruned_dirs or path_filter.excludes_dir(entry.path):
+                        continue
+                    if not (levels and is_ignored(levels, entry.path, True)):
+                        subdirs.append(entry.path)
+                elif path_filter.reason(entry.path) is None and entry.is_file():
+                    if not (levels and is_ignored(levels, entry.path, False)):
+                        yield entry
+            except OSError:
+                continue
+
+        # Reversed, so subdirectories are entered in the order they were listed.
+        stack.extend((subdir, depth) for subdir in reversed(subdirs))
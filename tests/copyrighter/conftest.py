@@ -0,0 +1,14 @@
+# Copyright (c) 2026 Megh Computing, Inc.
+
+# All rights reserved. No warranty, explicit or implied, provided.
+# Unauthorized use, modification, or distribution is strictly prohibited.
+
+import pytest
+
+from megh_pch.copyrighter import report
+
+
+@pytest.fixture(autouse=True)
+def reporter(mocker):
+    """Give each test its own reporter, so findings buffered by one test never show up in the next."""
+    return mocker.patch("megh_pch.copyrighter.copyrighter.g_reporter", report.TextReporter())
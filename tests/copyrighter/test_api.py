@@ -0,0 +1,84 @@
+# Copyright (c) 2026 Megh Computing, Inc.
+
+# All rights reserved. No warranty, explicit or implied, provided.
+# Unauthorized use, modification, or distribution is strictly prohibited.
+
+import datetime
+import os
+import subprocess  # nosec
+import sys
+
+import pytest
+
+import megh_pch.copyrighter
+from megh_pch.copyrighter import api, copyrighter
+
+current_year = datetime.date.today().year
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(api, "g_checkers", {})
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "good.py").write_text(f"# Copyright (c) 2017-{current_year} Megh Computing, Inc.\n")
+    (tmp_path / "src" / "stale.py").write_text("# Copyright 2017 Megh Computing, Inc.\n# Licensed under the Apache License, Version 2.0\n")
+    (tmp_path / "src" / "none.py").write_text("x = 1\n")
+    (tmp_path / "notes.txt").write_text("Not checked.\n")
+    for path in (tmp_path / "src").iterdir():
+        os.utime(path, (1600000000, 1600000000))
+    return tmp_path
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_check_paths(project, capsys, jobs):
+    results = {os.path.relpath(result.path): result for result in megh_pch.copyrighter.check_paths(["src", "notes.txt", "gone.py"], jobs=jobs)}
+
+    assert [(name, result.status, result.profile, result.start_year, result.end_year) for name, result in sorted(results.items())] == [
+        ("gone.py", "failed", None, None, None),
+        ("notes.txt", "skipped", None, None, None),
+        (os.path.join("src", "good.py"), "passed", "megh", 2017, current_year),
+        (os.path.join("src", "none.py"), "failed", None, None, None),
+        (os.path.join("src", "stale.py"), "failed", "apache-2.0", 2017, 2017),
+    ]
+    assert [finding.rule for finding in results[os.path.join("src", "stale.py")].findings] == ["stale-year"]
+    assert [finding.rule for finding in results["notes.txt"].findings] == ["skipped"]
+    # Nothing is printed, and the command line's globals are as they were.
+    assert capsys.readouterr().out == ""
+    assert copyrighter.g_fixes is None and not copyrighter.g_verbose
+
+
+def test_fix(project):
+    results = list(api.check_paths(["src/stale.py"], fix=True))
+    assert [(result.status, result.fix, result.passed) for result in results] == [("fixed", (2017, current_year), False)]
+    assert f"Copyright 2017-{current_year} Megh Computing, Inc." in (project / "src" / "stale.py").read_text()
+    assert [result.status for result in api.check_paths(["src/stale.py"])] == ["passed"]
+
+
+def test_lazy(project):
+    """Results come as the files are checked, and the command line can run between them."""
+    results = api.check_paths(["src/good.py", "src/stale.py"], fix=True)
+    assert next(results).status == "passed"
+    assert copyrighter.check_file([".py"], "src/stale.py", autofix=False) is False
+    assert next(results).status == "fixed"
+
+
+def test_checker_reused(project, mocker):
+    spy = mocker.spy(api, "Checker")
+    cache_dir = str(project / "cache")
+    for _ in range(3):
+        assert [result.status for result in api.check_paths(["src/good.py"], cache_dir=cache_dir)] == ["passed"]
+    assert spy.call_count == 1
+
+    # The cache vouches for the file, so the profile is not known.
+    result = next(api.check_paths(["src/good.py"], cache_dir=cache_dir))
+    assert (result.status, result.profile, result.start_year, result.end_year) == ("passed", None, 2017, current_year)
+
+    list(api.check_paths(["src/good.py"], extensions=[".py", ".c"]))
+    assert spy.call_count == 2
+
+
+def test_client_startup():
+    """The package's __init__ imports nothing, so the client does not load the checker to start."""
+    code = "import sys, megh_pch.copyrighter.client; print('megh_pch.copyrighter.copyrighter' in sys.modules)"
+    assert subprocess.run([sys.executable, "-c", code], stdout=subprocess.PIPE, check=True).stdout.strip() == b"False"  # nosec
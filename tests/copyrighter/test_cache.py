@@ -0,0 +1,204 @@
+# Copyright (c) 2026 Megh Computing, Inc.
+
+# All rights reserved. No warranty, explicit or implied, provided.
+# Unauthorized use, modification, or distribution is strictly prohibited.
+
+import datetime
+import os
+
+import pytest
+
+from megh_pch.copyrighter import cache, copyrighter
+
+import_base = "megh_pch.copyrighter.copyrighter."
+
+current_year = datetime.date.today().year
+fingerprint = cache.make_fingerprint(current_year, [".py"])
+
+
+def make_file(path, text: str) -> str:
+    """Write the file and back-date it so the cache does not consider it racy."""
+    path.write_text(text)
+    os.utime(path, (1600000000, 1600000000))
+    return str(path)
+
+
+def header(year) -> str:
+    return f"# Copyright (c) {year} Megh Computing, Inc.\n"
+
+
+@pytest.fixture
+def cache_dir(tmp_path):
+    return str(tmp_path / "cache")
+
+
+def test_store_and_lookup(tmp_path, cache_dir):
+    filepath = make_file(tmp_path / "a.py", header(current_year))
+
+    verification_cache = cache.VerificationCache(cache_dir)
+    verification_cache.load(fingerprint)
+    assert verification_cache.lookup(filepath, os.stat(filepath)) is None
+    verification_cache.store(filepath, os.stat(filepath), 2020, current_year, True)
+    verification_cache.save()
+
+    verification_cache = cache.VerificationCache(cache_dir)
+    verification_cache.load(fingerprint)
+    entry = verification_cache.lookup(filepath, os.stat(filepath))
+    assert entry.passed and entry.start_year == 2020 and entry.end_year == current_year
+    assert verification_cache.hits == 1
+
+    # Any change to the file invalidates the entry.
+    make_file(tmp_path / "a.py", header(current_year) + "\n")
+    assert verification_cache.lookup(filepath, os.stat(filepath)) is None
+
+
+def test_past_check_us(tmp_path, cache_dir):
+    passed, failed = make_file(tmp_path / "a.py", header(current_year)), make_file(tmp_path / "b.py", header(2017))
+
+    verification_cache = cache.VerificationCache(cache_dir)
+    verification_cache.load(fingerprint)
+    verification_cache.store(passed, os.stat(passed), current_year, current_year, True, 120)
+    verification_cache.store(failed, os.stat(failed), 2017, 2017, False, 3000)
+    assert verification_cache.past_check_us(failed) == 3000
+    verification_cache.save()
+
+    verification_cache = cache.VerificationCache(cache_dir)
+    verification_cache.load(fingerprint)
+    # Kept for failed files, and after the file changes, as the best guess of its next check.
+    make_file(tmp_path / "a.py", header(current_year) + "\n")
+    assert (verification_cache.past_check_us(passed), verification_cache.past_check_us(failed)) == (120, 3000)
+    assert verification_cache.past_check_us(str(tmp_path / "c.py")) is None
+
+
+def test_fingerprint_change(tmp_path, cache_dir):
+    filepath = make_file(tmp_path / "a.py", header(current_year))
+
+    verification_cache = cache.VerificationCache(cache_dir)
+    verification_cache.load(fingerprint)
+    verification_cache.store(filepath, os.stat(filepath), current_year, current_year, True)
+    verification_cache.save()
+
+    for other in (cache.make_fingerprint(current_year + 1, [".py"]), cache.make_fingerprint(current_year, [".py", ".cpp"])):
+        verification_cache = cache.VerificationCache(cache_dir)
+        verification_cache.load(other)
+        assert verification_cache.lookup(filepath, os.stat(filepath)) is None
+
+
+def test_racy_file_not_stored(tmp_path, cache_dir):
+    path = tmp_path / "a.py"
+    path.write_text(header(current_year))
+    filepath = str(path)
+
+    verification_cache = cache.VerificationCache(cache_dir)
+    verification_cache.load(fingerprint)
+    verification_cache.store(filepath, os.stat(filepath), current_year, current_year, True)
+    assert verification_cache.lookup(filepath, os.stat(filepath)) is None
+
+
+def test_paranoid(tmp_path, cache_dir):
+    filepath = make_file(tmp_path / "a.py", header(current_year))
+
+    verification_cache = cache.VerificationCache(cache_dir, paranoid=True)
+    verification_cache.load(fingerprint)
+    verification_cache.store(filepath, os.stat(filepath), current_year, current_year, True)
+    verification_cache.save()
+
+    # Same size and mtime, different contents.
+    make_file(tmp_path / "a.py", header(current_year - 1))
+    verification_cache = cache.VerificationCache(cache_dir, paranoid=True)
+    verification_cache.load(fingerprint)
+    assert verification_cache.lookup(filepath, os.stat(filepath)) is None
+
+
+def test_concurrent_saves_merge(tmp_path, cache_dir):
+    first = make_file(tmp_path / "a.py", header(current_year))
+    second = make_file(tmp_path / "b.py", header(current_year))
+
+    # Both processes load an empty cache before either saves.
+    caches = [cache.VerificationCache(cache_dir), cache.VerificationCache(cache_dir)]
+    for verification_cache in caches:
+        verification_cache.load(fingerprint)
+    caches[0].store(first, os.stat(first), current_year, current_year, True)
+    caches[1].store(second, os.stat(second), current_year, current_year, True)
+    for verification_cache in caches:
+        verification_cache.save()
+
+    verification_cache = cache.VerificationCache(cache_dir)
+    verification_cache.load(fingerprint)
+    assert verification_cache.lookup(first, os.stat(first)) is not None
+    assert verification_cache.lookup(second, os.stat(second)) is not None
+
+
+@pytest.mark.parametrize("max_entries", [4, 0])
+def test_eviction(tmp_path, cache_dir, max_entries):
+    paths = [make_file(tmp_path / f"{i}.py", header(current_year)) for i in range(10)]
+
+    verification_cache = cache.VerificationCache(cache_dir, max_entries=max_entries)
+    verification_cache.load(fingerprint)
+    for i, filepath in enumerate(paths):
+        verification_cache.store(filepath, os.stat(filepath), current_year, current_year, True)
+        verification_cache.add_verified_blob(f"{i:040x}")
+    verification_cache.save()
+
+    verification_cache = cache.VerificationCache(cache_dir)
+    verification_cache.load(fingerprint)
+    assert len(list(verification_cache.entries())) == max_entries
+    # The newest blobs are kept.
+    assert [verification_cache.is_verified_blob(f"{i:040x}") for i in range(10)] == [i >= 10 - max_entries for i in range(10)]
+
+
+def test_max_entries_at_least_one():
+    with pytest.raises(SystemExit):
+        copyrighter.parse_args(["--cache-dir", "cache", "--cache-max-entries", "0", "a.py"])
+
+
+def test_corrupt_file(cache_dir):
+    os.makedirs(cache_dir)
+    with open(os.path.join(cache_dir, cache.cache_filename), "wb") as file:
+        file.write(b"not a cache")
+
+    verification_cache = cache.VerificationCache(cache_dir)
+    verification_cache.load(fingerprint)
+    assert list(verification_cache.entries()) == []
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_check_all_skips_cached(mocker, tmp_path, cache_dir, jobs):
+    paths = [make_file(tmp_path / f"{i}.py", header(current_year)) for i in range(4)]
+    paths.append(make_file(tmp_path / "stale.py", header(2017)))
+    mocker.patch(f"{import_base}g_cache", cache.VerificationCache(cache_dir))
+
+    assert copyrighter.check_all(None, paths, autofix=False, jobs=jobs) is False
+    assert copyrighter.g_cache.misses == 5
+    # Timed, in the workers too, for ordering the next parallel check.
+    assert all(copyrighter.g_cache.past_check_us(path) for path in paths)
+
+    # Warm run: only the failing file is read again.
+    mocker.patch(f"{import_base}g_cache", cache.VerificationCache(cache_dir))
+    spy = mocker.spy(copyrighter, "check_header")
+    assert copyrighter.check_all(None, paths, autofix=False) is False
+    # The failing file's entry is found, but does not save the read.
+    assert (copyrighter.g_cache.hits, copyrighter.g_cache.misses) == (4, 1)
+    assert spy.call_count == 1
+
+
+def test_load_again_reuses_entries(tmp_path, cache_dir, mocker):
+    filepath = make_file(tmp_path / "a.py", header(current_year))
+    verification_cache = cache.VerificationCache(cache_dir)
+    verification_cache.load(fingerprint)
+    verification_cache.store(filepath, os.stat(filepath), current_year, current_year, True)
+    verification_cache.save()
+    spy = mocker.spy(verification_cache, "_read")
+
+    verification_cache.load(fingerprint)
+    assert verification_cache.lookup(filepath, os.stat(filepath)).passed
+    assert spy.call_count == 0
+
+    # Another process saved since, so the file is read again.
+    other = cache.VerificationCache(cache_dir)
+    other.load(fingerprint)
+    other.store(filepath, os.stat(filepath), current_year, current_year, False)
+    other.save()
+    verification_cache.load(fingerprint)
+    assert spy.call_count == 1
+    assert not verification_cache.lookup(filepath, os.stat(filepath)).passed
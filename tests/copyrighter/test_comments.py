@@ -0,0 +1,57 @@
+# Copyright (c) 2026 Megh Computing, Inc.
+
+# All rights reserved. No warranty, explicit or implied, provided.
+# Unauthorized use, modification, or distribution is strictly prohibited.
+
+import pytest
+
+from megh_pch.copyrighter import comments, copyrighter
+
+notice = "Copyright (c) 2017 Megh Computing, Inc."
+
+
+@pytest.mark.parametrize(
+    "filepath, header, code",
+    [
+        ("a.py", f"#!/usr/bin/env python\n# -*- coding: utf-8 -*-\n\n\n# {notice}\n#\n", "import os\n# Not a header.\n"),
+        ("a.py", "", "import os\n"),
+        ("a.py", "\n\n", ""),
+        ("a.py", f'#!/usr/bin/env python\n"""{notice}\n\nThe module.\n"""\n\n', "import os\n"),
+        ("a.pyi", f"# More.\nr'''{notice}'''\n", "x = '''Not a header.'''\n"),
+        ("a.cpp", f"/****\n * {notice}\n ****/\n// More.\n\n", "#include <cstdio>\n/* Not a header. */\n"),
+        ("a.cpp", f"/* {notice}\n", ""),
+        ("a.css", f"/* {notice} */\n", "// Not a comment in CSS.\n"),
+        ("a.php", f"<?php\n// {notice}\n# More.\n", "echo 1;\n"),
+        ("a.html", f'<?xml version="1.0"?>\n<!DOCTYPE html>\n<!--\n  {notice}\n-->\n', "<html>\n"),
+        ("a.lua", f"--[[\n{notice}\n]]\n-- More.\n", "print(1)\n"),
+        ("a.sql", f"-- {notice}\n", "SELECT 1;\n"),
+    ],
+)
+def test_header_end(filepath, header, code):
+    text = header + code
+    assert comments.header_end(filepath, text) == len(header)
+    data = b"\xef\xbb\xbf" + text.encode()
+    assert comments.header_end(filepath, data, 3, len(data) - len(code)) == len(data) - len(code)
+    assert comments.header_end(filepath, data, 3) == len(data) - len(code)
+
+
+def test_header_end_unknown_extension():
+    text = "line\n" * 20
+    assert comments.header_end("a.unknown", text) == len("line\n") * comments.fallback_lines
+    assert comments.header_end("Makefile", text.encode(), 0, 12) == 12
+
+
+@pytest.mark.parametrize(
+    "text, passed",
+    [
+        # Pushed down past the ninth line by a shebang, an encoding cookie, and blank lines.
+        ("#!/usr/bin/env python\n# -*- coding: utf-8 -*-\n" + "\n" * 10 + f"# {notice.replace('2017', '2017-{year}')}\n", True),
+        (f"import os\n# {notice.replace('2017', '2017-{year}')}\n", False),
+        # In the module docstring.
+        ('"""The module.\n\n' + notice.replace("2017", "2017-{year}") + '\n"""\nimport os\n', True),
+    ],
+)
+def test_check_file(tmp_path, text, passed):
+    path = tmp_path / "a.py"
+    path.write_text(text.format(year=copyrighter.time.localtime().tm_year))
+    assert copyrighter.check_file([".py"], str(path), autofix=False) is passed
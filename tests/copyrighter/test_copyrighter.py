@@ -1,9 +1,12 @@
-# Copyright (c) 2022 Megh Computing, Inc.
+# Copyright (c) 2022-2026 Megh Computing, Inc.
 
 # All rights reserved. No warranty, explicit or implied, provided.
 # Unauthorized use, modification, or distribution is strictly prohibited.
 
+import argparse
+import codecs
 import datetime
+import io
 import os
 
 import pytest
@@ -210,57 +213,145 @@ def test_parse_bad_format(optional_shebang: str):
     # fmt: on
 
 
-@pytest.mark.parametrize(*shebang_params)
-def test_write_year_1(mocker, optional_shebang):
-    given = copyright_megh_python.format(optional_shebang, "2021").split("\n")
-    expected = copyright_megh_python.format(optional_shebang, "2021-2022").split("\n")
-    mocker.patch(f"{import_base}read_file", return_value=given)
-    mocker.patch(f"{import_base}write_file")
-    copyrighter.write_current_year("", 2021, 2022)
-    copyrighter.write_file.assert_called_once_with("", expected)
+def write_year(tmp_path, given: str, start_year: int, current_year: int, newline: str = "\n") -> str:
+    path = tmp_path / "file.py"
+    path.write_bytes(given.replace("\n", newline).encode())
+    copyrighter.write_current_year(str(path), start_year, current_year)
+    return path.read_bytes().decode()
 
 
 @pytest.mark.parametrize(*shebang_params)
-def test_write_year_2(mocker, optional_shebang):
-    given = copyright_apache_python.format(optional_shebang, "2020").split("\n")
-    expected = copyright_apache_python.format(optional_shebang, "1912-1954").split("\n")
-    mocker.patch(f"{import_base}read_file", return_value=given)
-    mocker.patch(f"{import_base}write_file")
-    copyrighter.write_current_year("", 1912, 1954)
-    copyrighter.write_file.assert_called_once_with("", expected)
+def test_write_year_1(tmp_path, optional_shebang):
+    given = copyright_megh_python.format(optional_shebang, "2021")
+    expected = copyright_megh_python.format(optional_shebang, "2021-2022")
+    assert write_year(tmp_path, given, 2021, 2022) == expected
 
 
 @pytest.mark.parametrize(*shebang_params)
-def test_write_year_3(mocker, optional_shebang):
-    given = copyright_megh_cpp.format(optional_shebang, "2021-2022").split("\n")
-    expected = copyright_megh_cpp.format(optional_shebang, "1903-1995").split("\n")
-    mocker.patch(f"{import_base}read_file", return_value=given)
-    mocker.patch(f"{import_base}write_file")
-    copyrighter.write_current_year("", 1903, 1995)
-    copyrighter.write_file.assert_called_once_with("", expected)
+def test_write_year_2(tmp_path, optional_shebang):
+    given = copyright_apache_python.format(optional_shebang, "2020")
+    expected = copyright_apache_python.format(optional_shebang, "1912-1954")
+    assert write_year(tmp_path, given, 1912, 1954) == expected
 
 
 @pytest.mark.parametrize(*shebang_params)
-def test_write_year_4(mocker, optional_shebang):
-    given = copyright_apache_cpp.format(optional_shebang, "2017").split("\n")
-    expected = copyright_apache_cpp.format(optional_shebang, "1906-1992").split("\n")
-    mocker.patch(f"{import_base}read_file", return_value=given)
-    mocker.patch(f"{import_base}write_file")
-    copyrighter.write_current_year("", 1906, 1992)
-    copyrighter.write_file.assert_called_once_with("", expected)
+def test_write_year_3(tmp_path, optional_shebang):
+    given = copyright_megh_cpp.format(optional_shebang, "2021-2022")
+    expected = copyright_megh_cpp.format(optional_shebang, "1903-1995")
+    assert write_year(tmp_path, given, 1903, 1995) == expected
 
 
 @pytest.mark.parametrize(*shebang_params)
-def test_write_year_5(mocker, optional_shebang):
-    # Make sure that other lines in the file aren't changed.
-    body = [str(i) + alphanums + "\n" for i in range(300)] + ["\n"]
-    given = copyright_megh_python.format(optional_shebang, "2021").split("\n") + body
-    expected = copyright_megh_python.format(optional_shebang, "2021-2022").split("\n") + body
+def test_write_year_4(tmp_path, optional_shebang):
+    given = copyright_apache_cpp.format(optional_shebang, "2017")
+    expected = copyright_apache_cpp.format(optional_shebang, "1906-1992")
+    assert write_year(tmp_path, given, 1906, 1992) == expected
+
 
-    mocker.patch(f"{import_base}read_file", return_value=given)
-    mocker.patch(f"{import_base}write_file")
-    copyrighter.write_current_year("", 2021, 2022)
-    copyrighter.write_file.assert_called_once_with("", expected)
+@pytest.mark.parametrize(*shebang_params)
+def test_write_year_5(tmp_path, optional_shebang):
+    # Make sure that other lines in the file aren't changed, including past the header budget.
+    body = "".join(str(i) + alphanums + "\n" for i in range(3000)) + "\n"
+    given = copyright_megh_python.format(optional_shebang, "2021") + body
+    expected = copyright_megh_python.format(optional_shebang, "2021-2022") + body
+    assert write_year(tmp_path, given, 2021, 2022) == expected
+
+    # Same length years are overwritten in place.
+    given = copyright_megh_python.format(optional_shebang, "2020-2021") + body
+    expected = copyright_megh_python.format(optional_shebang, "2020-2022") + body
+    assert write_year(tmp_path, given, 2020, 2022) == expected
+
+
+@pytest.mark.parametrize("newline", ["\n", "\r\n"])
+def test_write_year_keeps_file(tmp_path, newline):
+    path = tmp_path / "file.py"
+    given = copyright_megh_python.format(shebang, "2021")
+    expected = copyright_megh_python.format(shebang, "2021-2022").replace("\n", newline)
+    assert write_year(tmp_path, given, 2021, 2022, newline) == expected
+
+    path.chmod(0o751)
+    inode = path.stat().st_ino
+    copyrighter.write_current_year(str(path), 2020, 2023)
+    assert path.stat().st_mode & 0o777 == 0o751
+    # Same length, so the file was patched in place.
+    assert path.stat().st_ino == inode
+
+    copyrighter.write_current_year(str(path), 2020, 2023)
+    copyrighter.write_current_year(str(path), 2023, 2023)
+    assert path.stat().st_mode & 0o777 == 0o751
+    # A single year is written without a range.
+    assert path.read_bytes().decode() == copyright_megh_python.format(shebang, "2023").replace("\n", newline)
+
+
+def test_write_year_encodings(tmp_path):
+    path = tmp_path / "file.cpp"
+    text = "// caf\u00e9\n" + copyright_megh_cpp.format("", "2021")
+    for encoding, prefix in (("utf-8", b""), ("utf-8", codecs.BOM_UTF8), ("utf-16-le", codecs.BOM_UTF16_LE), ("utf-32-be", codecs.BOM_UTF32_BE), ("latin-1", b"")):
+        path.write_bytes(prefix + text.encode(encoding))
+        copyrighter.write_current_year(str(path), 2021, 2022)
+        assert path.read_bytes() == prefix + text.replace("2021", "2021-2022").encode(encoding)
+
+
+def test_write_year_reuses_match(tmp_path, mocker):
+    path = tmp_path / "file.py"
+    given = copyright_megh_python.format(shebang, "2021")
+    path.write_text(given)
+    match = copyrighter.g_registry.match(given)
+    spy = mocker.spy(copyrighter.g_registry, "match")
+    copyrighter.write_current_year(str(path), 2021, 2022, match)
+    assert spy.call_count == 0
+    assert path.read_text() == copyright_megh_python.format(shebang, "2021-2022")
+
+
+@pytest.mark.parametrize("data", [b"import os\n", b"\x00\x01\x02"])
+def test_write_year_changed(tmp_path, data):
+    path = tmp_path / "file.py"
+    given = copyright_megh_python.format(shebang, "2021")
+    match = copyrighter.g_registry.match(given)
+    # The notice is gone, or the file turned binary, since it was checked.
+    path.write_bytes(data)
+    with pytest.raises(ValueError, match="changed after it was checked"):
+        copyrighter.write_current_year(str(path), 2021, 2022, match)
+    assert path.read_bytes() == data
+
+
+class TestReadTombstone:
+    def test_max_lines(self):
+        text = copyright_apache_python.format(shebang, 2021)
+        lines = copyrighter.read_tombstone(io.BytesIO(text.encode()))
+        assert lines == "".join(text.splitlines(keepends=True)[:9])
+
+        assert copyrighter.read_tombstone(io.BytesIO(b"")) == ""
+        assert copyrighter.read_tombstone(io.BytesIO(b"one\ntwo")) == "one\ntwo"
+        assert copyrighter.read_tombstone(io.BytesIO(b"one\r\ntwo\r\n"), max_lines=1) == "one\r\n"
+
+    def test_max_bytes(self):
+        # A single line much longer than the budget.
+        text = copyright_megh_python.format("", 2021).replace("\n", " ") + "x" * 100000
+        file = io.BytesIO(text.encode())
+        lines = copyrighter.read_tombstone(file, max_bytes=4096)
+        assert lines == text[:4096]
+        assert file.tell() == 4096
+        assert copyrighter.parse_copyright_megh(lines) == (2021, 2021)
+
+    def test_split_character(self):
+        # The budget ends in the middle of a two byte character.
+        data = b"# Copyright (c) 2021 Megh Computing, Inc. \xc3\xa9"
+        assert copyrighter.read_tombstone(io.BytesIO(data), max_bytes=len(data) - 1) == "# Copyright (c) 2021 Megh Computing, Inc. "
+
+    def test_encodings(self):
+        text = copyright_megh_cpp.format("", 2021) + "// caf\u00e9\n"
+        for data in (text.encode("utf-8"), codecs.BOM_UTF8 + text.encode("utf-8"), text.encode("utf-16"), text.encode("utf-32"), text.encode("latin-1")):
+            lines = copyrighter.read_tombstone(io.BytesIO(data))
+            assert copyrighter.parse_copyright_megh(lines) == (2021, 2021)
+
+    def test_binary(self):
+        assert copyrighter.read_tombstone(io.BytesIO(b"\x7fELF\x02\x01\x01\x00\x00\x00")) is None
+
+    def test_check_binary_file(self, tmp_path):
+        path = tmp_path / "blob.cpp"
+        path.write_bytes(b"\x00\x01\x02" * 1000)
+        assert copyrighter.check_file([".cpp"], str(path), autofix=False) is True
 
 
 class TestCheckFile:
@@ -275,69 +366,73 @@ class TestCheckFile:
         assert os.path.isfile(self.filename)
         os.remove(self.filename)
 
+    def write(self, text: str) -> None:
+        with open(self.filename, "w") as file:
+            file.write(text)
+
     @pytest.mark.parametrize(*shebang_params)
-    def test_check_file(self, mocker, optional_shebang):
+    def test_check_file(self, optional_shebang):
         for copyright in (copyright_megh_python, copyright_apache_python):
             given = copyright.format(optional_shebang, self.current_year)
-            mocker.patch(f"{import_base}read_tombstone", return_value=given)
+            self.write(given)
             assert copyrighter.check_file([".py"], self.filename, autofix=False) is True
 
         for copyright in (copyright_megh_python, copyright_apache_python):
             given = copyright.format(optional_shebang, f"2017-{self.current_year}")
-            mocker.patch(f"{import_base}read_tombstone", return_value=given)
+            self.write(given)
             assert copyrighter.check_file([".py"], self.filename, autofix=False) is True
 
         for copyright in (copyright_megh_python, copyright_apache_python):
             given = copyright.format(optional_shebang, f"207-{self.current_year}")
-            mocker.patch(f"{import_base}read_tombstone", return_value=given)
+            self.write(given)
             assert copyrighter.check_file([".py"], self.filename, autofix=False) is False
 
         for copyright in (copyright_megh_python, copyright_apache_python):
             given = copyright.format(optional_shebang, f"blah-{self.current_year}")
-            mocker.patch(f"{import_base}read_tombstone", return_value=given)
+            self.write(given)
             assert copyrighter.check_file([".py"], self.filename, autofix=False) is False
 
     @pytest.mark.parametrize(*shebang_params)
-    def test_check_file_future_year(self, mocker, optional_shebang):
+    def test_check_file_future_year(self, optional_shebang):
         for copyright in (copyright_megh_python, copyright_apache_python):
             given = copyright.format(optional_shebang, "2071")
-            mocker.patch(f"{import_base}read_tombstone", return_value=given)
+            self.write(given)
             assert copyrighter.check_file([".py"], self.filename, autofix=False) is False
 
         for copyright in (copyright_megh_python, copyright_apache_python):
             given = copyright.format(optional_shebang, f"2071-{self.current_year}")
-            mocker.patch(f"{import_base}read_tombstone", return_value=given)
+            self.write(given)
             assert copyrighter.check_file([".py"], self.filename, autofix=False) is False
 
     @pytest.mark.parametrize(*shebang_params)
-    def test_check_file_backward_year(self, mocker, optional_shebang):
+    def test_check_file_backward_year(self, optional_shebang):
         for copyright in (copyright_megh_python, copyright_apache_python):
             given = copyright.format(optional_shebang, "2021-2017")
-            mocker.patch(f"{import_base}read_tombstone", return_value=given)
+            self.write(given)
             assert copyrighter.check_file([".py"], self.filename, autofix=False) is False
 
     @pytest.mark.parametrize(*shebang_params)
     def test_check_file_auto_fix(self, mocker, optional_shebang):
         for copyright in (copyright_megh_python, copyright_apache_python):
             given = copyright.format(optional_shebang, "2017")
-            mocker.patch(f"{import_base}read_tombstone", return_value=given)
+            self.write(given)
             mocker.patch(f"{import_base}write_current_year")
             assert copyrighter.check_file([".py"], self.filename, autofix=True) is False
-            copyrighter.write_current_year.assert_called_once_with(self.filename, 2017, self.current_year)
+            copyrighter.write_current_year.assert_called_once_with(self.filename, 2017, self.current_year, mocker.ANY)
 
         for copyright in (copyright_megh_python, copyright_apache_python):
             given = copyright.format(optional_shebang, "2020-2021")
-            mocker.patch(f"{import_base}read_tombstone", return_value=given)
+            self.write(given)
             mocker.patch(f"{import_base}write_current_year")
             assert copyrighter.check_file([".py"], self.filename, autofix=True) is False
-            copyrighter.write_current_year.assert_called_once_with(self.filename, 2020, self.current_year)
+            copyrighter.write_current_year.assert_called_once_with(self.filename, 2020, self.current_year, mocker.ANY)
 
         for copyright in (copyright_megh_python, copyright_apache_python):
             given = copyright.format(optional_shebang, "2020-2071")
-            mocker.patch(f"{import_base}read_tombstone", return_value=given)
+            self.write(given)
             mocker.patch(f"{import_base}write_current_year")
             assert copyrighter.check_file([".py"], self.filename, autofix=True) is False
-            copyrighter.write_current_year.assert_called_once_with(self.filename, 2020, self.current_year)
+            copyrighter.write_current_year.assert_called_once_with(self.filename, 2020, self.current_year, mocker.ANY)
 
     def test_check_file_ext_list(self):
         assert copyrighter.check_file([".x"], self.filename, autofix=False) is True
@@ -375,3 +470,148 @@ class TestExtensions:
         file_lines = ["x.\n"]
         mocker.patch(f"{import_base}read_file", return_value=file_lines)
         assert not copyrighter.get_extensions(self.filename)
+
+
+class TestJobs:
+    current_year = datetime.date.today().year
+
+    def test_parse_jobs(self, mocker):
+        assert copyrighter.parse_jobs("1") == 1
+        assert copyrighter.parse_jobs("12") == 12
+        mocker.patch("os.cpu_count", return_value=6)
+        assert copyrighter.parse_jobs("auto") == 6
+
+        for value in ("0", "-2", "blah", ""):
+            with pytest.raises(argparse.ArgumentTypeError):
+                copyrighter.parse_jobs(value)
+
+    def test_parallel_matches_sequential(self, tmp_path, capsys):
+        filenames = []
+        for i in range(20):
+            year = self.current_year if i % 3 else 2017
+            path = tmp_path / f"file_{i}.py"
+            # Files larger than the header buffer cost more, and are submitted first.
+            path.write_text(copyright_megh_python.format("", year) + "x = 1\n" * (2000 if i % 4 == 0 else 0))
+            filenames.append(str(path))
+        # Repeated paths are reported once.
+        filenames.append(filenames[1])
+
+        assert copyrighter.check_all(None, filenames, autofix=False, jobs=1) is False
+        sequential = capsys.readouterr().out
+
+        assert copyrighter.check_all(None, filenames, autofix=False, jobs=4) is False
+        parallel = capsys.readouterr().out
+        assert parallel == sequential
+        assert parallel.index("file_0.py") < parallel.index("file_3.py") < parallel.index("file_18.py")
+
+    def test_parallel_fix(self, tmp_path):
+        filenames = []
+        for i in range(10):
+            path = tmp_path / f"file_{i}.py"
+            path.write_text(copyright_megh_python.format("", 2017))
+            filenames.append(str(path))
+        filenames += filenames
+
+        assert copyrighter.check_all(None, filenames, autofix=True, jobs=3) is False
+        for filename in filenames:
+            with open(filename) as file:
+                assert f"Copyright (c) 2017-{self.current_year} Megh Computing, Inc." in file.read()
+        assert copyrighter.check_all(None, filenames, autofix=False, jobs=3) is True
+
+
+class TestBudget:
+    current_year = datetime.date.today().year
+
+    @pytest.fixture
+    def names(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        names = []
+        for i in range(10):
+            (tmp_path / f"file_{i}.py").write_text(copyright_megh_python.format("", 2017 if i in (2, 5, 8) else self.current_year))
+            names.append(f"file_{i}.py")
+        return names
+
+    @pytest.mark.parametrize("jobs", [1, 3])
+    def test_max_failures(self, names, capsys, jobs):
+        assert copyrighter.main(["-j", str(jobs), "--max-failures", "2", *names]) == copyrighter.stopped_exit_code
+        captured = capsys.readouterr()
+        assert "file_5.py" in captured.out and "file_8.py" not in captured.out
+        assert "Stopped after checking 6 files, since 2 file(s) failed (--max-failures 2)." in captured.err
+
+        # Not stopped by a failure with no file after it, nor by a limit that is not reached.
+        assert copyrighter.main(["-j", str(jobs), "--max-failures", "1", "file_2.py"]) == 1
+        assert copyrighter.main(["-j", str(jobs), "--max-failures", "4", *names]) == 1
+        assert "Stopped" not in capsys.readouterr().err
+
+    def test_time_budget(self, names, capsys, mocker):
+        check_notice = copyrighter.check_notice
+        # A clock that only moves when a file is checked, 0.1 seconds each.
+        clock = [100.0]
+
+        def slow_check_notice(*args):
+            clock[0] += 0.1
+            return check_notice(*args)
+
+        mocker.patch("time.monotonic", lambda: clock[0])
+        mocker.patch(import_base + "check_notice", slow_check_notice)
+        assert copyrighter.main(["--time-budget", "0.15", *names]) == copyrighter.stopped_exit_code
+        assert "Stopped after checking 2 files, since the time budget of 0.15 seconds ran out" in capsys.readouterr().err
+        assert copyrighter.main(["--time-budget", "10", *names[:3]]) == 1
+
+    def test_parse(self):
+        for argv in (["--max-failures", "0", "a.py"], ["--time-budget", "0", "a.py"]):
+            with pytest.raises(SystemExit):
+                copyrighter.parse_args(argv)
+
+
+class TestFilesFrom:
+    current_year = datetime.date.today().year
+
+    @pytest.mark.parametrize("separator", [b"\n", b"\r\n", b"\0"])
+    def test_read_filenames(self, mocker, separator):
+        # Entries split across chunks, empty entries, and a name that is not valid UTF-8.
+        mocker.patch(import_base + "files_from_chunk_bytes", 3)
+        names = [b"a.py", b"dir/b.py", b"", b"c\xff.py"]
+        data = separator.join(names)
+        expected = ["a.py", "dir/b.py", os.fsdecode(b"c\xff.py")]
+        assert list(copyrighter.read_filenames(io.BytesIO(data), separator.strip(b"\r"))) == expected
+        assert list(copyrighter.read_filenames(io.BytesIO(data + separator), separator.strip(b"\r"))) == expected
+
+    @pytest.mark.parametrize("jobs", [1, 3])
+    def test_files_from(self, tmp_path, monkeypatch, capsys, mocker, jobs):
+        # Windows smaller than the list, so the process pool takes several.
+        mocker.patch(import_base + "parallel_window", 4)
+        monkeypatch.chdir(tmp_path)
+        names = []
+        for i in range(10):
+            (tmp_path / f"file_{i}.py").write_text(copyright_megh_python.format("", self.current_year if i != 7 else 2017))
+            names.append(f"file_{i}.py")
+        (tmp_path / "list").write_bytes("\0".join(names[1:]).encode())
+
+        assert copyrighter.main(["-j", str(jobs), "--files-from", "list", "-0", "file_0.py"]) == 1
+        output = capsys.readouterr().out
+        assert "file_7.py" in output and "file_6.py" not in output
+
+        monkeypatch.setattr("sys.stdin", io.TextIOWrapper(io.BytesIO("\n".join(names[:5]).encode())))
+        assert copyrighter.main(["-j", str(jobs), "--stdin"]) == 0
+
+    def test_files_from_errors(self, tmp_path, capsys):
+        assert copyrighter.main(["--files-from", str(tmp_path / "missing")]) == 1
+        assert "Could not read the list of files" in capsys.readouterr().out
+        with pytest.raises(SystemExit):
+            copyrighter.parse_args(["-0", "a.py"])
+
+    def test_memory_flat(self, tmp_path):
+        """Paths are checked as they are read, so a long list costs no more memory than a short one."""
+        import tracemalloc
+
+        def peak(count: int) -> int:
+            data = io.BytesIO(b"".join(b"%d.txt\n" % i for i in range(count)))
+            tracemalloc.start()
+            try:
+                assert copyrighter.check_all(None, copyrighter.read_filenames(data), autofix=False) is True
+                return tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+
+        assert peak(100000) < peak(20000) * 1.25
@@ -0,0 +1,84 @@
+# Copyright (c) 2026 Megh Computing, Inc.
+
+# All rights reserved. No warranty, explicit or implied, provided.
+# Unauthorized use, modification, or distribution is strictly prohibited.
+
+import datetime
+import json
+import mmap
+
+import pytest
+
+from megh_pch.copyrighter import copyrighter, deep, fixer, profiles
+
+current_year = datetime.date.today().year
+header = f"# Copyright (c) 2017-{current_year} Megh Computing, Inc.\n"
+
+
+def notices_of(found: list) -> list:
+    return [(notice.profile.name, notice.start_year, notice.end_year, notice.years_start, notice.years_end, line) for notice, line in found]
+
+
+@pytest.mark.parametrize("anchored", [True, False])
+def test_find_notices_windows(tmp_path, monkeypatch, anchored):
+    """Notices across window boundaries are found once each, with the offsets and lines of a search of the whole file."""
+    registry = profiles.HeaderRegistry()
+    if not anchored:
+        monkeypatch.setattr(registry, "_notices_anchor", b"")
+    monkeypatch.setattr(deep, "window_bytes", mmap.ALLOCATIONGRANULARITY * 2)
+    data = header.encode()
+    while len(data) < mmap.ALLOCATIONGRANULARITY * 12:
+        data += b"x = 1\n" * (len(data) % 997) + b"# Copyright 2015 Megh Computing, Inc. # Copyright (c) 2016-2019 Megh Computing, Inc.\n"
+    path = tmp_path / "big.py"
+    path.write_bytes(data)
+
+    found = notices_of(deep.find_notices(registry, str(path), data[:100], 100, len(data)))
+    assert found == notices_of(deep.number_lines(data, registry.find_notices_bytes(data)))
+    assert found == notices_of(deep.find_notices(registry, str(path), data, len(data), len(data)))
+    assert len(found) > 20 and found[0][:3] == ("megh", 2017, current_year)
+    assert [line for *_, line in found[1:3]] == [data.count(b"\n", 0, found[1][3]) + 1] * 2
+
+
+def test_deep(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    text = header + "x = 1\n" * 3000 + f"# Copyright (c) 2019 Megh Computing, Inc.\n{header}# Copyright 2012-2015 Megh Computing, Inc.\n"
+    (tmp_path / "a.py").write_text(text)
+    (tmp_path / "b.py").write_text(header + header)
+
+    # Without --deep, only the header is checked.
+    assert copyrighter.main(["a.py"]) == 0
+    assert copyrighter.main(["--deep", "--format", "jsonl", "a.py", "b.py"]) == 1
+    findings = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [(finding["path"][-4:], finding["rule"], finding["level"], finding["line"]) for finding in findings] == [
+        ("a.py", "stray-notice", "error", 3002),
+        ("a.py", "duplicate-notice", "warning", 3003),
+        ("a.py", "stray-notice", "error", 3004),
+        ("b.py", "duplicate-notice", "warning", 2),
+    ]
+    assert f"at byte {len(header) + 6 * 3000 + 16}" in findings[0]["message"]
+
+    assert copyrighter.main(["--deep", "--fix", "a.py", "b.py"]) == 1
+    assert (tmp_path / "a.py").read_text() == header + "x = 1\n" * 3000 + header * 2 + f"# Copyright 2017-{current_year} Megh Computing, Inc.\n"
+    assert copyrighter.main(["--deep", "a.py", "b.py"]) == 0
+
+
+def test_deep_fix_changed_file(tmp_path, monkeypatch, mocker, capsys):
+    monkeypatch.chdir(tmp_path)
+    path = tmp_path / "a.py"
+    text = "# Copyright (c) 2017 Megh Computing, Inc.\nx = 1\n# Copyright (c) 2016 Megh Computing, Inc.\n"
+    path.write_text(text)
+    commit = fixer.FixBatch.commit
+
+    def edit_then_commit(batch, rewrite):
+        path.write_text(text.replace("2016", "2015"))
+        commit(batch, rewrite)
+
+    mocker.patch.object(fixer.FixBatch, "commit", edit_then_commit)
+    assert copyrighter.main(["--deep", "--fix", "a.py"]) == 1
+    assert "Could not fix the files, none were changed" in capsys.readouterr().out
+    assert path.read_text() == text.replace("2016", "2015")
+
+
+def test_deep_git():
+    with pytest.raises(SystemExit):
+        copyrighter.parse_args(["--deep", "--staged", "a.py"])
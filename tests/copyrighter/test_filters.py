@@ -0,0 +1,96 @@
+# Copyright (c) 2026 Megh Computing, Inc.
+
+# All rights reserved. No warranty, explicit or implied, provided.
+# Unauthorized use, modification, or distribution is strictly prohibited.
+
+import datetime
+import os
+
+import pytest
+
+from megh_pch.copyrighter import copyrighter, filters
+
+current_year = datetime.date.today().year
+
+
+@pytest.mark.parametrize(
+    "pattern, path, matched",
+    [
+        # Names match a file or a directory at any depth.
+        ("vendor", "vendor/a.py", True),
+        ("vendor", "src/vendor/a.py", True),
+        ("vendor", "src/vendored/a.py", False),
+        ("vendor/", "vendor/a.py", True),
+        ("a.py/", "a.py", False),
+        # Suffixes.
+        ("*_pb2.py", "gen/x_pb2.py", True),
+        ("*_pb2.py", "gen/x_pb3.py", False),
+        ("*.egg-info", "pkg.egg-info/a.py", True),
+        # Anything else goes through the regular expression.
+        ("src/*.py", "src/a.py", True),
+        ("src/*.py", "lib/src/a.py", False),
+        ("/src/gen", "src/gen/a.py", True),
+        ("docs/**/*.py", "docs/a/b.py", True),
+        ("test_?.py", "tests/test_1.py", True),
+        ("third_party/*/", "third_party/lib/a.py", True),
+        ("third_party/*/", "third_party/a.py", False),
+    ],
+)
+def test_pattern_set(pattern, path, matched):
+    assert filters.PatternSet([pattern]).match(path) is matched
+
+
+def test_pattern_set_many():
+    patterns = [f"third_party/lib{i}/" for i in range(2000)] + [f"*.gen{i}" for i in range(2000)] + [f"name{i}" for i in range(2000)]
+    pattern_set = filters.PatternSet(patterns + ["# comment", ""])
+    assert len(pattern_set.suffixes) == 2000
+    assert len(pattern_set.names) == 2000
+    assert pattern_set.match("third_party/lib1999/a.py")
+    assert pattern_set.match("src/a.gen7")
+    assert pattern_set.match("src/name5/a.py")
+    assert not pattern_set.match("src/a.py")
+    assert not filters.PatternSet([])
+
+
+def test_path_filter(tmp_path):
+    path_filter = filters.PathFilter([".py", ".cpp"], include=["src/"], exclude=["vendor/", "*_pb2.py"], root=str(tmp_path))
+    assert path_filter.reason(str(tmp_path / "src" / "a.py")) is None
+    assert path_filter.reason(str(tmp_path / "src" / "a.txt")) == "extension"
+    assert path_filter.reason(str(tmp_path / "src" / "__init__.py")) == "name"
+    assert path_filter.reason(str(tmp_path / "src" / "vendor" / "a.py")) == "excluded"
+    assert path_filter.reason(str(tmp_path / "src" / "x_pb2.py")) == "excluded"
+    assert path_filter.reason(str(tmp_path / "lib" / "a.py")) == "not-included"
+    assert path_filter.excludes_dir(str(tmp_path / "src" / "vendor"))
+    assert not path_filter.excludes_dir(str(tmp_path / "src"))
+
+
+def test_rejected_paths_not_stated(mocker, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "a.py").write_text(f"# Copyright (c) {current_year} Megh Computing, Inc.\n")
+    spy = mocker.spy(os, "stat")
+
+    paths = ["a.py", "notes.md", "__init__.py", "vendor/b.py", "missing.txt"]
+    assert copyrighter.check_all(None, paths, autofix=False, exclude=["vendor/"]) is True
+    assert [call.args[0] for call in spy.call_args_list] == [str(tmp_path / "a.py")]
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_check_all_excludes(mocker, tmp_path, monkeypatch, jobs):
+    monkeypatch.chdir(tmp_path)
+    for name in ("src/a.py", "src/third_party/b.py", "src/c_pb2.py"):
+        path = tmp_path.joinpath(*name.split("/"))
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("# Copyright (c) 2017 Megh Computing, Inc.\n")
+    spy = mocker.spy(copyrighter, "check_notice")
+
+    excludes = copyrighter.get_excludes(["*_pb2.py"], [], ["third_party"])
+    assert copyrighter.check_all(None, ["src", "src/c_pb2.py"], autofix=False, jobs=jobs, exclude=excludes) is False
+    if jobs == 1:
+        assert [os.path.basename(call.args[0]) for call in spy.call_args_list] == ["a.py"]
+
+
+def test_get_excludes(tmp_path):
+    exclude_file = tmp_path / "excludes"
+    exclude_file.write_text("gen/\n*.min.js\n")
+    assert copyrighter.get_excludes(["a.py"], [str(exclude_file)], ["vendor/"]) == ["a.py", "gen/\n", "*.min.js\n", "vendor/"]
+    assert copyrighter.get_excludes([], [str(tmp_path / "missing")], []) is None
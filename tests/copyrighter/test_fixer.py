@@ -0,0 +1,134 @@
+# Copyright (c) 2026 Megh Computing, Inc.
+
+# All rights reserved. No warranty, explicit or implied, provided.
+# Unauthorized use, modification, or distribution is strictly prohibited.
+
+import datetime
+import os
+
+import pytest
+
+from megh_pch.copyrighter import copyrighter, fixer
+
+current_year = datetime.date.today().year
+
+header = """\
+# Copyright (c) {0} Megh Computing, Inc.
+
+# All rights reserved. No warranty, explicit or implied, provided.
+# Unauthorized use, modification, or distribution is strictly prohibited.
+print("hello")
+"""
+
+
+@pytest.fixture
+def tree(tmp_path, monkeypatch):
+    """Ten stale files, with the working directory (where the journal goes) set to their directory."""
+    monkeypatch.chdir(tmp_path)
+    paths = []
+    for i in range(10):
+        path = tmp_path / f"file_{i}.py"
+        path.write_text(header.format(2017))
+        paths.append(path)
+    return paths
+
+
+def make_batch(paths: list) -> fixer.FixBatch:
+    batch = fixer.FixBatch()
+    for path in paths:
+        batch.add(str(path), 2017, current_year, None)
+    return batch
+
+
+def leftovers(directory) -> list:
+    return sorted(name for name in os.listdir(directory) if name.startswith(fixer.temp_prefix))
+
+
+@pytest.mark.parametrize("count", [3, fixer.min_parallel_fixes + 2])
+def test_commit(tree, tmp_path, count):
+    paths = tree[:count]
+    os.chmod(paths[0], 0o755)
+    batch = make_batch(paths + paths[:1])
+
+    batch.commit(copyrighter.fix_edits)
+
+    for path in paths:
+        assert path.read_text() == header.format(f"2017-{current_year}")
+    for path in tree[count:]:
+        assert path.read_text() == header.format(2017)
+    assert os.stat(paths[0]).st_mode & 0o777 == 0o755
+    assert leftovers(tmp_path) == []
+    assert len(batch) == 0
+
+
+def test_commit_failure_rolls_back(tree, tmp_path, mocker):
+    replace = os.replace
+    calls = []
+
+    def failing_replace(source, target):
+        calls.append(target)
+        if len(calls) == 4:
+            raise OSError("disk full")
+        replace(source, target)
+
+    mocker.patch.object(fixer.os, "replace", side_effect=failing_replace)
+    with pytest.raises(OSError):
+        make_batch(tree).commit(copyrighter.fix_edits)
+
+    for path in tree:
+        assert path.read_text() == header.format(2017)
+    assert leftovers(tmp_path) == []
+
+
+def test_commit_refuses_journal(tree, tmp_path):
+    (tmp_path / fixer.journal_filename).write_text("{}")
+    with pytest.raises(FileExistsError):
+        make_batch(tree).commit(copyrighter.fix_edits)
+    assert tree[0].read_text() == header.format(2017)
+
+
+@pytest.mark.parametrize("mode", copyrighter.recover_modes)
+def test_recover(tree, tmp_path, mode):
+    # Interrupted after the journal was written and the first half of the files were replaced.
+    prepared = [fixer.prepare(copyrighter.fix_edits, str(path), [(2017, current_year, None)]) for path in tree]
+    fixer.write_journal(fixer.journal_path(), prepared)
+    for target, temp, _ in prepared[:5]:
+        os.replace(temp, target)
+
+    # Resuming replaces the other half, and rolling back restores the first half.
+    assert fixer.recover(fixer.journal_path(), mode) == 5
+
+    expected = header.format(f"2017-{current_year}" if mode == "resume" else 2017)
+    for path in tree:
+        assert path.read_text() == expected
+    assert leftovers(tmp_path) == []
+    assert not os.path.exists(fixer.journal_path())
+
+
+def test_read_journal_malformed(tmp_path):
+    path = tmp_path / fixer.journal_filename
+    path.write_text('{"version": 0, "entries": []}')
+    with pytest.raises(ValueError):
+        fixer.read_journal(str(path))
+    path.write_text("{")
+    with pytest.raises(ValueError):
+        fixer.read_journal(str(path))
+
+
+def test_main_with_journal(tree, tmp_path, capsys):
+    (tmp_path / fixer.journal_filename).write_text('{"version": 1, "entries": []}')
+    filenames = [str(path) for path in tree]
+
+    assert copyrighter.main(["--fix"] + filenames) == 1
+    assert "--recover" in capsys.readouterr().out
+    assert tree[0].read_text() == header.format(2017)
+
+    assert copyrighter.main(["--recover", "rollback", "--fix"] + filenames) == 1
+    assert not os.path.exists(fixer.journal_path())
+    for path in tree:
+        assert path.read_text() == header.format(f"2017-{current_year}")
+
+    assert copyrighter.main(["--recover", "resume"]) == 0
+    assert "no interrupted" in capsys.readouterr().out
+    with pytest.raises(SystemExit):
+        copyrighter.main([])
@@ -0,0 +1,277 @@
+# Copyright (c) 2026 Megh Computing, Inc.
+
+# All rights reserved. No warranty, explicit or implied, provided.
+# Unauthorized use, modification, or distribution is strictly prohibited.
+
+import datetime
+import os
+import subprocess  # nosec
+
+import pytest
+
+from megh_pch.copyrighter import cache, copyrighter, gitio, manifest
+
+import_base = "megh_pch.copyrighter.copyrighter."
+
+current_year = datetime.date.today().year
+
+
+def git(root, *args) -> str:
+    return subprocess.run(["git", *args], cwd=str(root), stdout=subprocess.PIPE, check=True).stdout.decode()  # nosec
+
+
+def header(year) -> str:
+    return f"# Copyright (c) {year} Megh Computing, Inc.\n"
+
+
+@pytest.fixture
+def repo(tmp_path, monkeypatch):
+    root = tmp_path / "repo"
+    root.mkdir()
+    git(root, "init", "-q")
+    git(root, "config", "user.name", "Test")
+    git(root, "config", "user.email", "test@example.com")
+    (root / "src").mkdir()
+    (root / "src" / "good.py").write_text(header(current_year))
+    (root / "src" / "stale.py").write_text(header(2017))
+    git(root, "add", ".")
+    git(root, "commit", "-q", "-m", "Initial")
+    monkeypatch.chdir(root)
+    return root
+
+
+def test_list_blobs(repo):
+    os.symlink("good.py", str(repo / "src" / "link.py"))
+    git(repo, "add", ".")
+    blobs = gitio.list_blobs(str(repo), gitio.index_rev)
+    assert sorted(blobs) == ["src/good.py", "src/stale.py"]
+    assert blobs["src/good.py"] == git(repo, "rev-parse", ":src/good.py").strip()
+
+    blobs = gitio.list_blobs(str(repo), "HEAD")
+    assert blobs["src/stale.py"] == git(repo, "rev-parse", "HEAD:src/stale.py").strip()
+
+    with pytest.raises(gitio.GitError):
+        gitio.list_blobs(str(repo), "no-such-rev")
+
+
+def test_blob_reader(repo):
+    big = b"x" * 100000 + b"\n"
+    (repo / "big.py").write_bytes(big)
+    git(repo, "add", "big.py")
+    blobs = gitio.list_blobs(str(repo), gitio.index_rev)
+
+    oids = [blobs["big.py"], blobs["src/good.py"], "0" * 40, blobs["big.py"]]
+    with gitio.BlobReader(str(repo)) as reader:
+        headers = list(reader.read_headers(oids, 10))
+    assert headers == [(oids[0], b"x" * 10), (oids[1], header(current_year).encode()[:10]), (oids[2], None), (oids[0], b"x" * 10)]
+
+
+def test_staged(repo):
+    # The working tree is fixed, but the fix is not staged.
+    (repo / "src" / "stale.py").write_text(header(current_year))
+    assert copyrighter.check_all(None, ["src/good.py"], autofix=False, rev=gitio.index_rev) is True
+    assert copyrighter.check_all(None, ["src/good.py", "src/stale.py"], autofix=False) is True
+    assert copyrighter.check_all(None, ["src/good.py", "src/stale.py"], autofix=False, rev=gitio.index_rev) is False
+
+    git(repo, "add", ".")
+    assert copyrighter.check_all(None, ["src/good.py", "src/stale.py"], autofix=False, rev=gitio.index_rev) is True
+    assert copyrighter.check_all(None, ["src/good.py", "src/stale.py"], autofix=False, rev="HEAD") is False
+
+
+def test_staged_fix(repo):
+    assert copyrighter.check_all(None, ["src/stale.py"], autofix=True, rev=gitio.index_rev) is False
+    assert (repo / "src" / "stale.py").read_text() == header(f"2017-{current_year}")
+
+
+def test_staged_missing(repo, capsys):
+    (repo / "new.py").write_text(header(current_year))
+    assert copyrighter.check_all(None, ["new.py"], autofix=False, rev=gitio.index_rev) is False
+    assert "File does not exist in the index" in capsys.readouterr().out
+
+    # Exempt files are not looked up.
+    assert copyrighter.check_all(None, ["src/__init__.py", "notes.txt"], autofix=False, rev=gitio.index_rev) is True
+
+
+def test_staged_directory(repo, mocker):
+    (repo / "src" / "notes.txt").write_text("")
+    git(repo, "add", ".")
+    spy = mocker.spy(copyrighter, "check_header")
+
+    assert copyrighter.check_all(None, ["src"], autofix=False, rev=gitio.index_rev) is False
+    assert sorted(os.path.basename(call.args[0]) for call in spy.call_args_list) == ["good.py", "stale.py"]
+    assert copyrighter.check_all(None, ["."], autofix=False, rev="HEAD") is False
+    assert spy.call_count == 4
+
+
+def test_verified_blobs_skipped(repo, mocker, tmp_path):
+    mocker.patch(f"{import_base}g_cache", cache.VerificationCache(str(tmp_path / "cache")))
+    assert copyrighter.check_all(None, ["src/good.py", "src/stale.py"], autofix=False, rev=gitio.index_rev) is False
+
+    mocker.patch(f"{import_base}g_cache", cache.VerificationCache(str(tmp_path / "cache")))
+    spy = mocker.spy(gitio.BlobReader, "read_headers")
+    assert copyrighter.check_all(None, ["src/good.py", "src/stale.py"], autofix=False, rev=gitio.index_rev) is False
+    # Only the failing blob is read again.
+    assert spy.call_args[0][1] == [git(repo, "rev-parse", ":src/stale.py").strip()]
+
+
+def test_verified_blob_other_syntax(repo, mocker, tmp_path):
+    # A notice in a module docstring is a header in Python, and code in C.
+    (repo / "src" / "doc.py").write_text(f'"""{header(current_year)}"""\n')
+    git(repo, "add", ".")
+    mocker.patch(f"{import_base}g_cache", cache.VerificationCache(str(tmp_path / "cache")))
+    assert copyrighter.check_all(None, ["src/doc.py"], autofix=False, rev=gitio.index_rev) is True
+
+    git(repo, "mv", "src/doc.py", "src/doc.c")
+    mocker.patch(f"{import_base}g_cache", cache.VerificationCache(str(tmp_path / "cache")))
+    assert copyrighter.check_all(None, ["src/doc.c"], autofix=False, rev=gitio.index_rev) is False
+
+
+def commit(root, year: int, message: str = "Change") -> None:
+    date = f"{year}-06-01T12:00:00"
+    env = dict(os.environ, GIT_AUTHOR_DATE=date, GIT_COMMITTER_DATE=date)
+    subprocess.run(["git", "add", "-A"], cwd=str(root), check=True)  # nosec
+    subprocess.run(["git", "commit", "-q", "-m", message], cwd=str(root), env=env, check=True)  # nosec
+
+
+@pytest.fixture
+def history_repo(tmp_path, monkeypatch):
+    root = tmp_path / "history"
+    root.mkdir()
+    git(root, "init", "-q")
+    git(root, "config", "user.name", "Test")
+    git(root, "config", "user.email", "test@example.com")
+    monkeypatch.chdir(root)
+
+    body = "".join(f"line {i}\n" for i in range(50))
+    (root / "old.py").write_text(header(2015) + body)
+    (root / "gone.py").write_text(header(2015) + "gone\n")
+    commit(root, 2015)
+
+    (root / "old.py").write_text(header(2015) + body + "more\n")
+    (root / "pkg").mkdir()
+    # A rename keeps the year the file was first added.
+    git(root, "mv", "old.py", "pkg/renamed.py")
+    commit(root, 2018)
+
+    # A file re-added at a deleted path is a new file.
+    (root / "gone.py").unlink()
+    commit(root, 2019)
+    (root / "gone.py").write_text(header(2020) + "back\n")
+    (root / "weird name\twith tab.py").write_text(header(2020))
+    commit(root, 2020)
+    return root
+
+
+def test_read_first_years(history_repo):
+    years = gitio.read_first_years(str(history_repo))
+    assert years["pkg/renamed.py"] == 2015
+    assert years["gone.py"] == 2020
+    assert years["weird name\twith tab.py"] == 2020
+    assert "old.py" not in years
+
+
+def test_history_cache(history_repo, tmp_path, mocker):
+    cache_dir = str(tmp_path / "cache")
+    history = gitio.History.load(str(history_repo), cache_dir)
+    assert history.first_year(str(history_repo / "pkg" / "renamed.py"), 0) == 2015
+    assert history.first_year(str(history_repo / "new.py"), 2030) == 2030
+
+    spy = mocker.spy(gitio, "read_first_years")
+    assert gitio.History.load(str(history_repo), cache_dir).years == history.years
+    assert spy.call_count == 0
+
+    # A new HEAD builds a new index and replaces the old one.
+    (history_repo / "new.py").write_text(header(2021))
+    commit(history_repo, 2021)
+    assert gitio.History.load(str(history_repo), cache_dir).years["new.py"] == 2021
+    assert spy.call_count == 1
+    assert len([name for name in os.listdir(cache_dir) if name.startswith(gitio.history_prefix)]) == 1
+
+    restricted = history.restrict([str(history_repo / "gone.py")])
+    assert restricted.years == {"gone.py": 2020}
+
+
+def test_empty_repo(tmp_path):
+    git(tmp_path, "init", "-q")
+    assert gitio.History.load(str(tmp_path)).years == {}
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_check_start_year(history_repo, mocker, capsys, jobs):
+    mocker.patch(f"{import_base}g_history", gitio.History.load(str(history_repo)))
+    renamed = str(history_repo / "pkg" / "renamed.py")
+    assert copyrighter.check_all(None, [renamed], autofix=False, jobs=jobs) is False
+    assert "start year 2015 does not match year 2015" not in capsys.readouterr().out
+
+    # Wrong start year, current end year.
+    (history_repo / "gone.py").write_text(header(f"2018-{current_year}"))
+    # New files start this year.
+    (history_repo / "new.py").write_text(header(2019))
+    assert copyrighter.check_all(None, ["gone.py", "new.py"], autofix=False, jobs=jobs) is False
+    output = capsys.readouterr().out
+    assert "start year 2018 does not match year 2020 the file was added to git" in output
+    assert f"start year 2019 does not match year {current_year} the file was added to git" in output
+
+    assert copyrighter.check_all(None, ["gone.py", "new.py", renamed], autofix=True, jobs=jobs) is False
+    assert (history_repo / "gone.py").read_text() == header(f"2020-{current_year}")
+    assert (history_repo / "new.py").read_text() == header(current_year)
+    assert (history_repo / "pkg" / "renamed.py").read_text().startswith(header(f"2015-{current_year}"))
+    assert copyrighter.check_all(None, ["gone.py", "new.py", renamed], autofix=False, jobs=jobs) is True
+
+
+def test_tree_walk(repo):
+    (repo / "src" / "sub").mkdir()
+    (repo / "src" / "sub" / "a.py").write_text(header(current_year))
+    (repo / "docs").mkdir()
+    (repo / "docs" / "b.py").write_text(header(current_year))
+    git(repo, "add", ".")
+    tree = gitio.root_tree(str(repo), gitio.index_rev)
+    sub = git(repo, "rev-parse", f"{tree}:src/sub").strip()
+
+    with gitio.BlobReader(str(repo)) as reader:
+        walk = gitio.TreeWalk(reader, tree, ["src", "docs/b.py"], lambda oid: False)
+        assert sorted(walk.blobs) == ["docs/b.py", "src/good.py", "src/stale.py", "src/sub/a.py"]
+        assert [(directory, oid) for directory, oid, _, _ in walk.trees][1] == ("src/sub", sub)
+        assert [directory for directory, _, _, _ in walk.trees] == ["src", "src/sub"]
+
+        walk = gitio.TreeWalk(reader, tree, [""], lambda oid: oid == sub)
+        assert sorted(walk.blobs) == ["docs/b.py", "src/good.py", "src/stale.py"]
+        assert walk.skipped == {"src/sub": sub}
+        assert walk.is_skipped("src/sub/a.py") and not walk.is_skipped("src/good.py")
+
+        walk = gitio.TreeWalk(reader, tree, [""], lambda oid: oid == tree)
+        assert walk.blobs == {} and walk.is_skipped("docs")
+
+
+def test_tree_manifest(repo, tmp_path, mocker):
+    (repo / "lib").mkdir()
+    (repo / "lib" / "a.py").write_text(header(current_year))
+    (repo / "lib" / "notes.txt").write_text("Not checked.\n")
+    git(repo, "add", ".")
+    lib = git(repo, "rev-parse", f"{gitio.root_tree(str(repo), gitio.index_rev)}:lib").strip()
+    mocker.patch(f"{import_base}g_manifest", manifest.TreeManifest(str(tmp_path / "trees")))
+    spy = mocker.spy(copyrighter, "check_header")
+
+    assert copyrighter.check_all(None, ["."], autofix=False, rev=gitio.index_rev) is False
+    assert spy.call_count == 3
+    # Only lib passed. src has the stale file, and the root contains src.
+    assert list(copyrighter.g_manifest.trees) == [lib]
+
+    spy.reset_mock()
+    assert copyrighter.check_all(None, [".", "lib/a.py"], autofix=False, rev=gitio.index_rev) is False
+    assert spy.call_count == 2
+    assert copyrighter.g_manifest.hits == 1
+
+    (repo / "src" / "stale.py").write_text(header(current_year))
+    git(repo, "add", ".")
+    assert copyrighter.check_all(None, ["."], autofix=False, rev=gitio.index_rev) is True
+    spy.reset_mock()
+    assert copyrighter.check_all(None, ["src", "."], autofix=False, rev=gitio.index_rev) is True
+    assert spy.call_count == 0
+
+
+def test_tree_manifest_excluded(repo, tmp_path, mocker):
+    mocker.patch(f"{import_base}g_manifest", manifest.TreeManifest(str(tmp_path / "trees")))
+    # The excluded file could be checked where the same tree is found elsewhere, so the tree is not recorded.
+    assert copyrighter.check_all(None, ["."], autofix=False, rev="HEAD", exclude=["src/stale.py"]) is True
+    assert copyrighter.g_manifest.trees == {}
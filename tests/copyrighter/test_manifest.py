@@ -0,0 +1,55 @@
+# Copyright (c) 2026 Megh Computing, Inc.
+
+# All rights reserved. No warranty, explicit or implied, provided.
+# Unauthorized use, modification, or distribution is strictly prohibited.
+
+from megh_pch.copyrighter import manifest
+
+trees = [f"{i:040x}" for i in range(1, 6)]
+
+
+def test_save_load(tmp_path):
+    path = str(tmp_path / "ci" / "trees")
+    fingerprint = manifest.make_fingerprint(2026, [".py", ".c"], "profiles")
+    assert fingerprint == manifest.make_fingerprint(2026, [".c", ".py"], "profiles")
+
+    saved = manifest.TreeManifest(path, max_trees=4)
+    saved.load(fingerprint)
+    for oid in trees:
+        saved.add(oid)
+    saved.save()
+    # A header line, then 20 bytes per tree.
+    with open(path, "rb") as file:
+        header, data = file.read().split(b"\n", 1)
+    assert header.split()[2:] == [fingerprint.encode(), b"20"]
+    assert len(data) == 4 * 20
+
+    loaded = manifest.TreeManifest(path, max_trees=4)
+    loaded.load(fingerprint)
+    assert list(loaded.trees) == trees[:4]
+    assert loaded.is_verified(trees[3]) and not loaded.is_verified(trees[4])
+    assert loaded.hits == 1
+
+    # Trees seen by the last run are kept first.
+    loaded.add(f"{9:040x}")
+    loaded.save()
+    loaded.load(fingerprint)
+    assert list(loaded.trees) == [trees[3], f"{9:040x}"] + trees[:2]
+
+
+def test_load_outdated(tmp_path):
+    path = tmp_path / "trees"
+    saved = manifest.TreeManifest(str(path))
+    saved.load(manifest.make_fingerprint(2026, [".py"]))
+    saved.add("ab" * 32)
+    saved.save()
+
+    loaded = manifest.TreeManifest(str(path))
+    loaded.load(manifest.make_fingerprint(2027, [".py"]))
+    assert loaded.trees == {}
+    loaded.load(manifest.make_fingerprint(2026, [".py"]))
+    assert list(loaded.trees) == ["ab" * 32]
+
+    path.write_bytes(path.read_bytes()[:-1])
+    loaded.load(manifest.make_fingerprint(2026, [".py"]))
+    assert loaded.trees == {}
@@ -0,0 +1,108 @@
+# Copyright (c) 2026 Megh Computing, Inc.
+
+# All rights reserved. No warranty, explicit or implied, provided.
+# Unauthorized use, modification, or distribution is strictly prohibited.
+
+import json
+
+import pytest
+
+from megh_pch.copyrighter import copyrighter, profiles
+
+from .test_copyrighter import copyright_apache_cpp, copyright_apache_python, copyright_megh_cpp, copyright_megh_python, shebang_params
+
+mit_profile = profiles.HeaderProfile("mit", "Copyright (c) {years} Megh Computing, Inc.", marker="SPDX-License-Identifier: MIT")
+other_profile = profiles.HeaderProfile("other", "(C) Copyright {years} Megh Computing")
+
+
+@pytest.mark.parametrize(*shebang_params)
+def test_match_defaults(optional_shebang: str):
+    registry = profiles.HeaderRegistry()
+    for copyright, name in ((copyright_megh_python, "megh"), (copyright_megh_cpp, "megh"), (copyright_apache_python, "apache-2.0"), (copyright_apache_cpp, "apache-2.0")):
+        header = copyright.format(optional_shebang, "2017-2021")
+        match = registry.match(header)
+        assert match is not None and match.profile.name == name
+        assert (match.start_year, match.end_year) == (2017, 2021)
+        assert header[match.years_start : match.years_end] == "2017-2021"
+
+        header = copyright.format(optional_shebang, "2019")
+        match = registry.match(header)
+        assert match is not None and (match.start_year, match.end_year) == (2019, 2019)
+        assert header[match.years_start : match.years_end] == "2019"
+
+        for years in ("", "blah", "202", "2017, 2019-2022", "2023-blah"):
+            assert registry.match(copyright.format(optional_shebang, years)) is None
+
+
+def test_match_bytes():
+    registry = profiles.HeaderRegistry([mit_profile, other_profile, *profiles.default_profiles])
+    for header in (copyright_apache_python.format("", "2017-2021"), "// (C) Copyright 2020 Megh Computing\n", "# SPDX-License-Identifier: MIT\n# Copyright (c) 2019 Megh Computing, Inc.\n"):
+        match = registry.match(header)
+        data = bytearray(header.encode() + b"trailing bytes past the end")
+        bytes_match = registry.match_bytes(data, len(header))
+        assert (bytes_match.profile, bytes_match.start_year, bytes_match.end_year, bytes_match.years_start) == (match.profile, match.start_year, match.end_year, match.years_start)
+    assert registry.match_bytes(b"# Copyright (c) 2019 Megh Computing, Inc.", 10) is None
+
+
+def test_header_memo(mocker):
+    registry = profiles.HeaderRegistry()
+    memo = profiles.HeaderMemo(size=2)
+    spy = mocker.spy(registry, "match_bytes")
+    headers = [bytearray(f"# Copyright (c) {year} Megh Computing, Inc.\nx = {year}\n".encode()) for year in (2017, 2018, 2019)]
+    end = len(headers[0]) - 9
+
+    for data in (headers[0], headers[0], headers[1], headers[0], headers[2], headers[1], b"x = 1\n", b"x = 1\n"):
+        found, match = memo.match_bytes(registry, data, end), registry.match_bytes(data, end)
+        assert (found and (found.profile.name, found.start_year, found.years_start)) == (match and (match.profile.name, match.start_year, match.years_start))
+    # headers[1] was the least recently used when headers[2] was added, so it was matched again.
+    assert (memo.hits, memo.misses, len(memo.table)) == (3, 5, 2)
+    assert spy.call_count == 5 + 8
+
+    # A registry with other profiles does not reuse the matches of this one.
+    other = profiles.HeaderRegistry([other_profile])
+    assert memo.match_bytes(other, headers[0], end) is None
+    assert memo.misses == 6
+
+
+def test_marker_decides_profile():
+    registry = profiles.HeaderRegistry()
+    # An Apache header with the proprietary notice is not accepted, and vice versa.
+    assert registry.match(copyright_apache_python.format("", "2021").replace("Copyright 2021", "Copyright (c) 2021")) is None
+    assert registry.match("# Copyright 2021 Megh Computing, Inc.\n") is None
+
+
+def test_extra_profiles():
+    registry = profiles.HeaderRegistry(list(profiles.default_profiles) + [mit_profile, other_profile])
+
+    match = registry.match("// SPDX-License-Identifier: MIT\n// Copyright (c) 2020-2022 Megh Computing, Inc.\n")
+    assert match.profile.name == "mit" and (match.start_year, match.end_year) == (2020, 2022)
+
+    match = registry.match("# (C) Copyright 2018 Megh Computing\n")
+    assert match.profile.name == "other" and (match.start_year, match.end_year) == (2018, 2018)
+
+    # Without the marker, the same notice is the proprietary header.
+    assert registry.match(copyright_megh_python.format("", "2021")).profile.name == "megh"
+
+
+def test_bad_profiles():
+    with pytest.raises(ValueError):
+        profiles.HeaderProfile("bad", "Copyright Megh Computing, Inc.")
+    with pytest.raises(ValueError):
+        profiles.HeaderProfile("bad", "Copyright {years}-{years} Megh Computing, Inc.")
+    with pytest.raises(ValueError):
+        profiles.HeaderRegistry([mit_profile, mit_profile])
+
+
+def test_load_profiles(tmp_path):
+    path = tmp_path / "profiles.json"
+    path.write_text(json.dumps([{"name": "mit", "notice": mit_profile.notice, "marker": mit_profile.marker}]))
+    registry = copyrighter.get_registry(str(path))
+    assert [profile.name for profile in registry.profiles] == ["apache-2.0", "mit", "megh"]
+
+    for contents in ("{", "{}", '[{"name": "x"}]', '[{"name": "x", "notice": "no years"}]'):
+        path.write_text(contents)
+        with pytest.raises(ValueError):
+            profiles.load_profiles(str(path))
+        assert copyrighter.get_registry(str(path)) is None
+
+    assert copyrighter.get_registry(str(tmp_path / "missing.json")) is None
@@ -0,0 +1,69 @@
+# Copyright (c) 2026 Megh Computing, Inc.
+
+# All rights reserved. No warranty, explicit or implied, provided.
+# Unauthorized use, modification, or distribution is strictly prohibited.
+
+import codecs
+import datetime
+import io
+
+import pytest
+
+from megh_pch.copyrighter import comments, copyrighter, reader, report
+
+import_base = "megh_pch.copyrighter.copyrighter."
+
+current_year = datetime.date.today().year
+
+
+def test_read(tmp_path, mocker):
+    (tmp_path / "short.py").write_bytes(b"abc")
+    (tmp_path / "long.py").write_bytes(b"x" * 100)
+    fadvise = mocker.patch.object(reader, "fadvise")
+    header_reader = reader.HeaderReader(16)
+    buffer = header_reader.buffer
+
+    assert header_reader.read(str(tmp_path / "long.py"), 100) == 16
+    assert header_reader.buffer == b"x" * 16
+    assert fadvise.call_count == 1
+    assert header_reader.read(str(tmp_path / "short.py"), 3) == 3
+    assert header_reader.buffer[:3] == b"abc"
+    assert fadvise.call_count == 1
+    # The same buffer is reused for every file.
+    assert header_reader.buffer is buffer
+
+    with pytest.raises(FileNotFoundError):
+        header_reader.read(str(tmp_path / "missing.py"))
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        f"# Copyright (c) {current_year} Megh Computing, Inc.\n".encode(),
+        f"#!/usr/bin/env python\r\n# Copyright (c) 2017-{current_year} Megh Computing, Inc.\r\n".encode(),
+        "# Copyright (c) 2017 Megh Computing, Inc.\n".encode(),
+        codecs.BOM_UTF8 + "# Café\n# Copyright (c) 2017 Megh Computing, Inc.\n".encode(),
+        "# Café\n# Copyright (c) 2017 Megh Computing, Inc.\n".encode("latin-1"),
+        codecs.BOM_UTF16_LE + "# Copyright (c) 2017 Megh Computing, Inc.\n".encode("utf-16-le"),
+        b"\n" * 9 + b"# Copyright (c) 2017 Megh Computing, Inc.\n",
+        b"print()\n",
+        b"print()\n# Copyright (c) 2017 Megh Computing, Inc.\n",
+        b"",
+        b"\x7fELF\x02\x01\x01\x00\x00\x00",
+    ],
+)
+def test_check_header_matches_text_check(mocker, data):
+    """Checking the bytes finds the same as decoding them first."""
+    mocker.patch(f"{import_base}g_reporter", report.Collector())
+    expected = None
+    lines = copyrighter.read_tombstone(io.BytesIO(data))
+    if lines is not None:
+        header = copyrighter.decode_header(data)
+        expected = copyrighter.check_tombstone("a.py", lines, False, header[: comments.header_end("a.py", header)])
+    expected_results = [result.to_dict() for result in copyrighter.g_reporter.take()]
+
+    checked = copyrighter.check_header("a.py", bytearray(data) + bytearray(10), len(data), autofix=False)
+    assert [result.to_dict() for result in copyrighter.g_reporter.take()] == expected_results
+    assert (checked and checked[0]) == (expected and expected[0])
+    if expected and expected[1]:
+        assert (checked[1].profile, checked[1].start_year, checked[1].end_year) == (expected[1].profile, expected[1].start_year, expected[1].end_year)
@@ -0,0 +1,107 @@
+# Copyright (c) 2026 Megh Computing, Inc.
+
+# All rights reserved. No warranty, explicit or implied, provided.
+# Unauthorized use, modification, or distribution is strictly prohibited.
+
+import datetime
+import io
+import json
+
+import pytest
+
+from megh_pch.copyrighter import copyrighter, report
+
+import_base = "megh_pch.copyrighter.copyrighter."
+
+current_year = datetime.date.today().year
+
+
+def stale(path: str) -> report.Result:
+    return report.Result(path, "stale-year", f"File header copyright year 2017 does not match current year {current_year}.", line=1)
+
+
+def test_text_groups_findings():
+    stream = io.StringIO()
+    reporter = report.TextReporter(stream)
+    reporter.add(report.Result("a.py", "wrong-start-year", "Start year message.", line=1))
+    reporter.add(stale("a.py"))
+    reporter.end_file("a.py", False)
+    reporter.end_file("b.py", True)
+    assert stream.getvalue() == ""
+
+    reporter.finish()
+    assert stream.getvalue() == f"Copyright header check failed for file: a.py\nStart year message.\nFile header copyright year 2017 does not match current year {current_year}.\n\n"
+
+
+def test_text_excerpt():
+    stream = io.StringIO()
+    reporter = report.TextReporter(stream)
+    reporter.add(report.Result("a.py", "missing-notice", "Copyright message not found in file header.", excerpt="one\ntwo"))
+    reporter.finish()
+    assert "Beginning of file:\n    > one\n    > two\n" in stream.getvalue()
+
+
+def test_text_max_details():
+    stream = io.StringIO()
+    reporter = report.TextReporter(stream, max_details=1)
+    for path in ("a.py", "b.py", "c.py"):
+        reporter.add(stale(path))
+        reporter.end_file(path, False)
+    reporter.finish()
+
+    lines = stream.getvalue().splitlines()
+    assert lines[0] == "Copyright header check failed for file: a.py"
+    assert lines[3] == f"b.py: File header copyright year 2017 does not match current year {current_year}."
+    assert lines[5] == "Details were shown for the first 1 failing files. 2 more are listed without details."
+
+
+def test_batched_writes(mocker):
+    stream = io.StringIO()
+    spy = mocker.spy(stream, "write")
+    reporter = report.JsonLinesReporter(stream)
+    for i in range(report.batch_lines * 2 + 1):
+        reporter.add(stale(f"{i}.py"))
+    reporter.finish()
+
+    assert spy.call_count == 3
+    records = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert records[0] == {"path": "0.py", "rule": "stale-year", "level": "error", "message": stale("0.py").message, "line": 1}
+
+
+def test_sarif():
+    stream = io.StringIO()
+    reporter = report.SarifReporter(stream)
+    reporter.add(stale("a.py"))
+    reporter.add(report.Result("b.py", "skipped", "File is binary: b.py (automatic success)", level="note"))
+    reporter.finish()
+
+    log = json.loads(stream.getvalue())
+    assert log["version"] == "2.1.0"
+    (result,) = log["runs"][0]["results"]
+    assert result["ruleId"] == "stale-year"
+    assert log["runs"][0]["tool"]["driver"]["rules"][result["ruleIndex"]]["id"] == "stale-year"
+    assert result["locations"][0]["physicalLocation"]["artifactLocation"]["uri"] == "a.py"
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_check_all_jsonl(mocker, tmp_path, capsys, jobs):
+    (tmp_path / "good.py").write_text(f"# Copyright (c) {current_year} Megh Computing, Inc.\n")
+    (tmp_path / "stale.py").write_text("#!/usr/bin/env python\n# Copyright (c) 2017 Megh Computing, Inc.\n")
+    (tmp_path / "none.py").write_text("print()\n")
+    paths = [str(tmp_path / name) for name in ("good.py", "stale.py", "none.py", "gone.py")]
+    mocker.patch(f"{import_base}g_reporter", report.JsonLinesReporter())
+
+    assert copyrighter.check_all(None, paths, autofix=True, jobs=jobs) is False
+
+    records = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [(record["path"], record["rule"], record.get("line")) for record in records] == [
+        (paths[1], "stale-year", 2),
+        (paths[1], "fixed", 2),
+        (paths[2], "missing-notice", None),
+        (paths[3], "missing-file", None),
+    ]
+
+
+def test_reporter_needs_add():
+    with pytest.raises(TypeError):
+        report.Reporter()
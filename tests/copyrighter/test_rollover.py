@@ -0,0 +1,72 @@
+# Copyright (c) 2026 Megh Computing, Inc.
+
+# All rights reserved. No warranty, explicit or implied, provided.
+# Unauthorized use, modification, or distribution is strictly prohibited.
+
+import codecs
+import os
+
+import pytest
+
+from megh_pch.copyrighter import copyrighter, rollover
+
+header = """\
+# Copyright (c) {0} Megh Computing, Inc.
+
+# All rights reserved. No warranty, explicit or implied, provided.
+# Unauthorized use, modification, or distribution is strictly prohibited.
+print("hello")
+"""
+
+
+@pytest.fixture
+def tree(tmp_path, monkeypatch):
+    """Stale, current, and headerless files, with the working directory (where the checkpoint goes) set to them."""
+    monkeypatch.chdir(tmp_path)
+    for i in range(12):
+        directory = tmp_path / f"dir_{i % 3}"
+        directory.mkdir(exist_ok=True)
+        (directory / f"file_{i}.py").write_text(header.format(2017 if i % 2 else "2020-2030"))
+    (tmp_path / "missing.py").write_text("print('hello')\n")
+    (tmp_path / "utf16.py").write_bytes(codecs.BOM_UTF16_LE + header.format("2019-2020").encode("utf-16-le"))
+    return tmp_path
+
+
+def test_rollover(tree, capsys):
+    assert copyrighter.main(["rollover", "--year", "2030", "-q"]) == 0
+    assert "Updated 7 of 14 files to 2030" in capsys.readouterr().out
+
+    assert (tree / "dir_1" / "file_1.py").read_text() == header.format("2017-2030")
+    assert (tree / "dir_0" / "file_0.py").read_text() == header.format("2020-2030")
+    assert (tree / "missing.py").read_text() == "print('hello')\n"
+    assert (tree / "utf16.py").read_bytes() == codecs.BOM_UTF16_LE + header.format("2019-2030").encode("utf-16-le")
+    assert not os.path.exists(rollover.checkpoint_filename)
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_resume(tree, mocker, jobs):
+    mocker.patch.object(rollover, "checkpoint_files", 4)
+    fail = mocker.patch.object(rollover.fixer.FixBatch, "commit", autospec=True, side_effect=[None, None, OSError("disk full")])
+    assert rollover.run(rollover.parse_args(["--year", "2030", "-q", "-j", str(jobs)])) == 1
+    with open(rollover.checkpoint_filename) as file:
+        assert len(file.readlines()) == 1 + 2 * 4
+
+    fail.side_effect = None
+    fail.reset_mock()
+    scan = mocker.spy(rollover, "find_stale")
+    assert copyrighter.main(["rollover", "--year", "2030", "-q"]) == 0
+    # Only the files not recorded in the checkpoint are read again.
+    assert scan.call_count == 14 - 8
+    assert not os.path.exists(rollover.checkpoint_filename)
+
+
+def test_checkpoint_other_year(tree):
+    checkpoint = rollover.Checkpoint(str(tree / "checkpoint"), 2029)
+    checkpoint.add(["/a", "/b\nc"])
+    checkpoint.close()
+
+    checkpoint.load()
+    assert checkpoint.done == {"/a"}
+    checkpoint = rollover.Checkpoint(str(tree / "checkpoint"), 2030)
+    checkpoint.load()
+    assert checkpoint.done == set()
@@ -0,0 +1,56 @@
+# Copyright (c) 2026 Megh Computing, Inc.
+
+# All rights reserved. No warranty, explicit or implied, provided.
+# Unauthorized use, modification, or distribution is strictly prohibited.
+
+import os
+
+from megh_pch.copyrighter import schedule, shard
+
+
+def test_predicted_cost(tmp_path):
+    path = tmp_path / "big.py"
+    path.write_bytes(b"x" * 100000)
+    file_stat = os.stat(path)
+    assert schedule.predicted_cost(file_stat, 8192) == 8192 + shard.file_overhead_bytes
+    assert schedule.predicted_cost(file_stat, None) == 100000 + shard.file_overhead_bytes
+    assert schedule.predicted_cost(None, 8192) == shard.file_overhead_bytes
+    # A past time outweighs the size.
+    assert schedule.predicted_cost(file_stat, None, 500) == 500 * schedule.bytes_per_microsecond
+
+
+def test_plan_chunks():
+    paths = [f"{i}.py" for i in range(200)]
+    costs = [1] * 200
+    costs[150] = 1000
+    chunks = schedule.plan_chunks(paths, costs, jobs=2)
+    # The costly file comes first, alone, and the rest keep their order.
+    assert chunks[0] == ["150.py"]
+    assert [path for chunk in chunks[1:] for path in chunk] == paths[:150] + paths[151:]
+    assert max(len(chunk) for chunk in chunks) <= schedule.max_chunk_files
+
+    # Like equal chunks of 64 files at most, when every file costs the same.
+    assert [len(chunk) for chunk in schedule.plan_chunks(paths[:40], [1] * 40, jobs=2)] == [5] * 8
+    assert [len(chunk) for chunk in schedule.plan_chunks(paths, [1] * 200, jobs=1)] == [50] * 4
+    assert schedule.plan_chunks([], [], jobs=4) == []
+
+
+def test_budget(mocker):
+    monotonic = mocker.patch("time.monotonic", return_value=100.0)
+    budget = schedule.Budget(max_failures=2, time_budget=5)
+    budget.record(False)
+    assert not budget.exhausted()
+    budget.record(True)
+    budget.record(False)
+    assert budget.exhausted() and budget.reason == "2 file(s) failed (--max-failures 2)"
+    assert budget.checked == 3
+
+    budget = schedule.Budget(time_budget=0.5)
+    monotonic.return_value = 100.4
+    assert not budget.exhausted()
+    monotonic.return_value = 100.5
+    assert budget.exhausted() and "0.5 seconds" in budget.reason
+    # Once out, it stays out.
+    monotonic.return_value = 0
+    assert budget.exhausted()
+    assert not schedule.Budget().exhausted()
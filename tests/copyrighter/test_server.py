@@ -0,0 +1,174 @@
+# Copyright (c) 2026 Megh Computing, Inc.
+
+# All rights reserved. No warranty, explicit or implied, provided.
+# Unauthorized use, modification, or distribution is strictly prohibited.
+
+import datetime
+import io
+import os
+import shutil
+import socket
+import tempfile
+import threading
+
+import pytest
+
+from megh_pch.copyrighter import cache, client, copyrighter, server
+
+current_year = datetime.date.today().year
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    (tmp_path / "good.py").write_text(f"# Copyright (c) {current_year} Megh Computing, Inc.\n")
+    (tmp_path / "stale.py").write_text("# Copyright (c) 2017 Megh Computing, Inc.\n")
+    for path in (tmp_path / "good.py", tmp_path / "stale.py"):
+        os.utime(path, (1600000000, 1600000000))
+    monkeypatch.chdir(tmp_path)
+    # Socket paths are limited to about 100 bytes, which pytest's tmp_path can exceed.
+    runtime_dir = tempfile.mkdtemp()
+    monkeypatch.setenv("XDG_RUNTIME_DIR", runtime_dir)
+    yield tmp_path
+    shutil.rmtree(runtime_dir)
+
+
+@pytest.fixture
+def running(project):
+    root = client.repository_root(str(project))
+    instance = server.Server(root, client.socket_path(root), idle_timeout=0)
+    assert instance.bind()
+    thread = threading.Thread(target=instance.serve)
+    thread.start()
+    yield instance
+    client.request(instance.path, {"version": client.protocol_version, "command": "stop"})
+    thread.join()
+    instance.close()
+
+
+def test_round_trip(running, project, capsys, mocker):
+    spy = mocker.spy(copyrighter, "get_registry")
+
+    assert client.main(["good.py"]) == 0
+    assert client.main(["stale.py"]) == 1
+    assert f"Copyright header check failed for file: {project / 'stale.py'}" in capsys.readouterr().out
+    assert running.requests == 2
+    # The profiles were compiled once, for the first request.
+    assert spy.call_count == 1
+
+
+def test_cache_kept_warm(running, project, mocker):
+    spy = mocker.spy(cache.VerificationCache, "_read")
+
+    for _ in range(3):
+        assert client.main(["--cache-dir", str(project / "cache"), "good.py"]) == 0
+    # Read when first loaded, and once more when saving the first run's entries. Later runs use the entries in memory.
+    assert spy.call_count == 2
+
+
+def test_bad_arguments(running, capsys):
+    assert client.main(["--bogus", "good.py"]) == 2
+    assert "unrecognized arguments: --bogus" in capsys.readouterr().err
+
+
+def test_git_env(running, mocker):
+    seen = []
+    mocker.patch.object(copyrighter, "run", lambda args, state: seen.append(os.environ.get("GIT_DIR")) or 0)
+    os.environ["GIT_DIR"] = "/elsewhere/.git"
+    try:
+        assert client.main(["good.py"]) == 0
+    finally:
+        del os.environ["GIT_DIR"]
+    assert seen == ["/elsewhere/.git"]
+
+
+def test_fallback_without_server(project, capsys, mocker):
+    spy = mocker.spy(copyrighter, "main")
+
+    assert client.main(["stale.py"]) == 1
+    assert spy.call_count == 1
+    assert "stale.py" in capsys.readouterr().out
+
+
+def test_second_server(running):
+    assert not server.Server(running.root, running.path).bind()
+
+
+def test_stale_socket(project):
+    root = client.repository_root(str(project))
+    path = client.socket_path(root)
+    os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
+    open(path, "w").close()
+
+    instance = server.Server(root, path)
+    assert instance.bind()
+    instance.close()
+    assert not os.path.exists(path)
+
+
+def test_stdin_checked_in_process(running, project, capsys, mocker, monkeypatch):
+    spy = mocker.spy(copyrighter, "main")
+    monkeypatch.setattr("sys.stdin", io.TextIOWrapper(io.BytesIO(b"good.py\nstale.py\n")))
+
+    assert client.main(["--stdin"]) == 1
+    assert spy.call_count == 1 and running.requests == 0
+    assert "stale.py" in capsys.readouterr().out
+    assert client.reads_stdin(["--files-from", "-"]) and not client.reads_stdin(["--", "--stdin"])
+
+    response = running.check(str(project), ["--files-from=-"], {})
+    assert response["returncode"] == 1 and "standard input" in response["stderr"]
+
+
+@pytest.mark.parametrize("mode", [0o755, 0o777])
+def test_unsafe_directory(project, capsys, mocker, mode):
+    root = client.repository_root(str(project))
+    path = client.socket_path(root)
+    os.makedirs(os.path.dirname(path), mode=0o700)
+    os.chmod(os.path.dirname(path), mode)
+
+    with pytest.raises(PermissionError):
+        server.Server(root, path).bind()
+    assert server.main([]) == 1
+    assert "must be a directory with mode 0700" in capsys.readouterr().err
+    # The client checks in process rather than connect.
+    spy = mocker.spy(copyrighter, "main")
+    assert client.main(["good.py"]) == 0
+    assert spy.call_count == 1
+
+
+def test_symlinked_directory(project, tmp_path_factory):
+    root = client.repository_root(str(project))
+    path = client.socket_path(root)
+    elsewhere = tmp_path_factory.mktemp("elsewhere")
+    elsewhere.chmod(0o700)
+    os.symlink(str(elsewhere), os.path.dirname(path))
+
+    with pytest.raises(PermissionError):
+        server.Server(root, path).bind()
+    with pytest.raises(client.NoServer):
+        client.request(path, {"version": client.protocol_version, "command": "status"})
+
+
+def test_stuck_client(running, mocker):
+    mocker.patch.object(server, "connection_timeout", 0.1)
+    stuck = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stuck.connect(running.path)
+    try:
+        # Sends nothing, and does not shut down its side.
+        assert client.main(["good.py"]) == 0
+    finally:
+        stuck.close()
+    assert running.requests == 1
+
+
+def test_other_repository(running, project, tmp_path_factory, capsys, mocker, monkeypatch):
+    other = tmp_path_factory.mktemp("other")
+    (other / ".git").mkdir()
+    (other / "stale.py").write_text("# Copyright (c) 2017 Megh Computing, Inc.\n")
+    monkeypatch.chdir(other)
+    # Its root hashes to the same socket as the running server's.
+    mocker.patch.object(client, "socket_path", lambda root: running.path)
+    spy = mocker.spy(copyrighter, "main")
+
+    assert client.main(["stale.py"]) == 1
+    assert spy.call_count == 1
+    assert f"Copyright header check failed for file: {other / 'stale.py'}" in capsys.readouterr().out
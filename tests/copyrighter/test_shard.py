@@ -0,0 +1,95 @@
+# Copyright (c) 2026 Megh Computing, Inc.
+
+# All rights reserved. No warranty, explicit or implied, provided.
+# Unauthorized use, modification, or distribution is strictly prohibited.
+
+import argparse
+import json
+import os
+import subprocess
+
+import pytest
+
+from megh_pch.copyrighter import copyrighter, shard
+
+header = """\
+# Copyright (c) {0} Megh Computing, Inc.
+
+# All rights reserved. No warranty, explicit or implied, provided.
+# Unauthorized use, modification, or distribution is strictly prohibited.
+"""
+
+
+@pytest.fixture
+def tree(tmp_path, monkeypatch):
+    """Files of different sizes, a few stale, with the working directory set to them."""
+    monkeypatch.chdir(tmp_path)
+    current_year = copyrighter.time.localtime().tm_year
+    for i in range(40):
+        year = 2017 if i % 10 == 3 else current_year
+        (tmp_path / f"file_{i}.py").write_text(header.format(year) + "x = 1\n" * (i * 500))
+    (tmp_path / "notes.txt").write_text("Not checked.\n")
+    return tmp_path
+
+
+def test_parse_shard():
+    assert repr(shard.parse_shard("2/8")) == "2/8"
+    for value in ("0/8", "9/8", "2", "a/b", "1/2/3"):
+        with pytest.raises(argparse.ArgumentTypeError):
+            shard.parse_shard(value)
+
+
+@pytest.mark.parametrize("weight", copyrighter.shard_weights)
+def test_select(tree, weight):
+    path_filter = copyrighter.filters.PathFilter([".py"])
+    expanded = list(copyrighter.expand_paths(["."], path_filter))
+    selected = [list(shard.Shard(index, 3, weight).select(iter(expanded), copyrighter.header_bytes)) for index in (1, 2, 3)]
+
+    # Every file is in exactly one shard, and each shard keeps the order of the files.
+    assert sorted(entry for entries in selected for entry in entries) == sorted(expanded)
+    for entries in selected:
+        assert entries == [entry for entry in expanded if entry in entries]
+    if weight == "size":
+        assert max(len(entries) for entries in selected) - min(len(entries) for entries in selected) <= 1
+
+
+def test_staged_directory(tree, capsys):
+    subprocess.run(["git", "init", "-q"], check=True)  # nosec
+    subprocess.run(["git", "add", "."], check=True)  # nosec
+
+    shards = []
+    for index in (1, 2, 3):
+        copyrighter.main(["--staged", "--shard", f"{index}/3", "--results", f"{index}.json", "."])
+        with open(f"{index}.json") as file:
+            shards.append({record["path"] for record in json.load(file)["files"]})
+    # The directory is split by the files in it, not given whole to one shard.
+    assert all(shards)
+    assert not (shards[0] & shards[1] or shards[0] & shards[2] or shards[1] & shards[2])
+    assert set.union(*shards) == {f"file_{i}.py" for i in range(40)}
+
+    with pytest.raises(SystemExit):
+        copyrighter.parse_args(["--staged", "--shard", "1/3", "--shard-weight", "size", "."])
+
+
+def test_merge(tree, capsys):
+    expected = copyrighter.main(["--format", "jsonl", "."])
+    unsharded = sorted(json.loads(line)["path"] for line in capsys.readouterr().out.splitlines())
+
+    for index in (1, 2, 3):
+        copyrighter.main(["--shard", f"{index}/3", "--results", f"{index}.json", "--format", "jsonl", "."])
+    capsys.readouterr()
+    assert copyrighter.main(["merge", "--format", "jsonl", "3.json", "1.json", "2.json"]) == expected == 1
+    merged = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert sorted(os.path.abspath(finding["path"]) for finding in merged) == unsharded
+    assert {finding["rule"] for finding in merged} == {"stale-year"}
+
+    assert copyrighter.main(["merge", "1.json", "2.json"]) == 1
+    assert "Missing the results of shard(s) 3 of 3." in capsys.readouterr().out
+    assert copyrighter.main(["merge", "1.json", "1.json", "2.json"]) == 1
+    assert "given twice" in capsys.readouterr().out
+
+
+def test_merge_passed(tree, capsys):
+    assert copyrighter.main(["--results", "all.json", "file_0.py", "file_1.py"]) == 0
+    assert copyrighter.main(["merge", "-v", "all.json"]) == 0
+    assert "0/2 files failed." in capsys.readouterr().out
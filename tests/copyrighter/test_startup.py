@@ -0,0 +1,52 @@
+# Copyright (c) 2026 Megh Computing, Inc.
+
+# All rights reserved. No warranty, explicit or implied, provided.
+# Unauthorized use, modification, or distribution is strictly prohibited.
+
+import os
+import subprocess  # nosec
+import sys
+import typing
+
+import pytest
+
+# Imported only by the features that need them: --jobs, --profile, --fix, git sources, JSON output, and --cache-paranoid.
+deferred_modules: typing.Tuple[str, ...] = ("concurrent.futures", "cProfile", "tempfile", "shutil", "subprocess", "threading", "json", "hashlib", "datetime", "logging")
+# And this package's modules for the same options, and for --cache-dir, --deep, --tree-manifest, --shard,
+# --max-failures, and directory arguments.
+deferred_modules += tuple(f"megh_pch.copyrighter.{name}" for name in ("cache", "deep", "fixer", "gitio", "manifest", "schedule", "shard", "walk"))
+# The least time of a few runs that importing the console entry point may take, with everything it imports. It takes
+# about 20 ms on a developer machine. The default is loose enough for a loaded CI runner, and catches a heavy module
+# imported by accident. CI sets a tighter budget with COPYRIGHTER_IMPORT_BUDGET_MS.
+import_budget_ms = float(os.environ.get("COPYRIGHTER_IMPORT_BUDGET_MS") or 100)
+entry_module = "megh_pch.copyrighter.copyrighter"
+# -X importtime was added in Python 3.7. Before, it prints nothing.
+needs_importtime = pytest.mark.skipif(sys.version_info < (3, 7), reason="-X importtime needs Python 3.7")
+
+
+def import_times(statement: str) -> dict:
+    """Return {module: cumulative microseconds} from python -X importtime."""
+    env = dict(os.environ)
+    # Let the first run write bytecode, so later runs do not time the compiler.
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", statement], stderr=subprocess.PIPE, env=env, check=True)  # nosec
+    times = {}
+    for line in result.stderr.decode().splitlines()[1:]:
+        _, cumulative, name = line.split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+@needs_importtime
+def test_deferred_imports():
+    baseline = import_times("pass")
+    imported = import_times(f"import {entry_module}")
+    assert entry_module in imported
+    assert [name for name in deferred_modules if name in imported and name not in baseline] == []
+
+
+@needs_importtime
+def test_import_budget():
+    import_times(f"import {entry_module}")
+    best = min(import_times(f"import {entry_module}")[entry_module] for _ in range(7))
+    assert best / 1000 <= import_budget_ms
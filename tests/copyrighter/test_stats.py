@@ -0,0 +1,105 @@
+# Copyright (c) 2026 Megh Computing, Inc.
+
+# All rights reserved. No warranty, explicit or implied, provided.
+# Unauthorized use, modification, or distribution is strictly prohibited.
+
+import datetime
+import json
+
+import pytest
+
+from megh_pch.copyrighter import copyrighter, stats
+
+import_base = "megh_pch.copyrighter.copyrighter."
+
+current_year = datetime.date.today().year
+
+
+def test_phase_and_counters():
+    run_stats = stats.Stats()
+    with run_stats.phase("read"):
+        pass
+    with run_stats.phase("read"):
+        pass
+    run_stats.count("bytes_read", 10)
+
+    assert run_stats.phases["read"][2] == 2
+    assert run_stats.phases["read"][0] >= 0
+    assert run_stats.counters["bytes_read"] == 10
+
+
+def test_slowest_files():
+    run_stats = stats.Stats(slowest=2)
+    for i, seconds in enumerate([0.3, 0.1, 0.5, 0.2]):
+        run_stats.file_done(f"{i}.py", seconds)
+
+    assert [item["path"] for item in run_stats.to_dict()["slowest_files"]] == ["2.py", "0.py"]
+
+
+def test_merge():
+    worker = stats.Stats(slowest=2)
+    with worker.phase("parse"):
+        pass
+    worker.count("files_rewritten")
+    worker.file_done("a.py", 0.5)
+
+    run_stats = stats.Stats(slowest=2)
+    run_stats.file_done("b.py", 0.1)
+    run_stats.merge(worker.to_dict())
+    run_stats.merge(worker.to_dict())
+
+    assert run_stats.phases["parse"][2] == 2
+    assert run_stats.counters["files_rewritten"] == 2
+    assert [item["path"] for item in run_stats.to_dict()["slowest_files"]] == ["a.py", "a.py"]
+
+
+def test_format():
+    run_stats = stats.Stats()
+    with run_stats.phase("stat"):
+        pass
+    run_stats.file_done("slow.py", 0.25)
+
+    text = run_stats.format("text")
+    assert "stat" in text
+    assert "250.000 ms  slow.py" in text
+    assert json.loads(run_stats.format("json"))["counters"]["files_seen"] == 0
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_check_all_counts(mocker, tmp_path, jobs):
+    (tmp_path / "good.py").write_text(f"# Copyright (c) {current_year} Megh Computing, Inc.\n")
+    (tmp_path / "stale.py").write_text("# Copyright (c) 2017 Megh Computing, Inc.\n")
+    (tmp_path / "__init__.py").write_text("")
+    (tmp_path / "notes.txt").write_text("")
+    (tmp_path / "blob.h").write_bytes(b"\0\1\2")
+    paths = [str(tmp_path / name) for name in ("good.py", "stale.py", "__init__.py", "notes.txt", "blob.h")]
+    mocker.patch(f"{import_base}g_stats", stats.Stats())
+
+    assert copyrighter.check_all(None, paths, autofix=True, jobs=jobs) is False
+
+    counters = copyrighter.g_stats.counters
+    assert counters["files_seen"] == 5
+    assert counters["skipped_init"] == 1
+    assert counters["skipped_extension"] == 1
+    assert counters["skipped_binary"] == 1
+    assert counters["files_rewritten"] == 1
+    assert counters["files_failed"] == 1
+    assert counters["bytes_read"] > 0
+    assert counters["header_memo_hits"] + counters["header_memo_misses"] == 2
+    assert copyrighter.g_stats.phases["parse"][2] == 2
+    # Files rejected by the path filter are not timed.
+    assert len(copyrighter.g_stats.slowest_files) == 3
+
+
+def test_stats_off(mocker, tmp_path):
+    (tmp_path / "good.py").write_text(f"# Copyright (c) {current_year} Megh Computing, Inc.\n")
+    spy = mocker.spy(stats.Stats, "phase")
+
+    assert copyrighter.check_all(None, [str(tmp_path / "good.py")], autofix=False) is True
+    assert spy.call_count == 0
+
+
+@pytest.mark.parametrize("slowest", ["0", "-1"])
+def test_slowest_at_least_one(slowest):
+    with pytest.raises(SystemExit):
+        copyrighter.parse_args(["--stats", "text", "--stats-slowest", slowest, "a.py"])
@@ -0,0 +1,88 @@
+# Copyright (c) 2026 Megh Computing, Inc.
+
+# All rights reserved. No warranty, explicit or implied, provided.
+# Unauthorized use, modification, or distribution is strictly prohibited.
+
+import datetime
+import os
+
+import pytest
+
+from megh_pch.copyrighter import copyrighter, filters, walk
+
+current_year = datetime.date.today().year
+
+
+def make_tree(root, files: list) -> None:
+    for name in files:
+        path = root.joinpath(*name.split("/"))
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(f"# Copyright (c) {current_year} Megh Computing, Inc.\n")
+
+
+def walked(root, **kwargs) -> list:
+    path_filter = filters.PathFilter([".py"], root=str(root), **kwargs)
+    return [os.path.relpath(entry.path, str(root)).replace(os.sep, "/") for entry in walk.walk(str(root), path_filter)]
+
+
+@pytest.mark.parametrize(
+    "pattern, path, is_dir, ignored",
+    [
+        ("*.py", "a.py", False, True),
+        ("*.py", "sub/a.py", False, True),
+        ("/a.py", "sub/a.py", False, None),
+        ("sub/*.py", "sub/a.py", False, True),
+        ("sub/*.py", "sub/deeper/a.py", False, None),
+        ("gen/", "gen", True, True),
+        ("gen/", "gen", False, None),
+        ("docs/**/*.py", "docs/a/b/c.py", False, True),
+        ("docs/**", "docs/a.py", False, True),
+        ("a[0-9].py", "a1.py", False, True),
+        ("a[!0-9].py", "a1.py", False, None),
+        ("\\#a.py", "#a.py", False, True),
+    ],
+)
+def test_ignore_rules(pattern, path, is_dir, ignored):
+    assert walk.IgnoreRules([pattern]).match(path, is_dir) is ignored
+
+
+def test_ignore_rules_negation():
+    rules = walk.IgnoreRules(["# comment", "", "*.py", "!keep.py"])
+    assert rules.match("a.py", False) is True
+    assert rules.match("keep.py", False) is False
+
+
+def test_walk_prunes(tmp_path):
+    make_tree(tmp_path, ["a.py", "b.txt", "sub/c.py", "node_modules/d.py", "build/e.py", ".git/f.py", "sub/__pycache__/g.py"])
+    assert walked(tmp_path) == ["a.py", "sub/c.py"]
+
+
+def test_walk_gitignore(tmp_path):
+    (tmp_path / ".git").mkdir()
+    make_tree(tmp_path, ["a.py", "gen/b.py", "sub/c_pb2.py", "sub/keep_pb2.py", "sub/d.py", "sub/inner/e.py"])
+    (tmp_path / ".gitignore").write_text("gen/\n*_pb2.py\n")
+    (tmp_path / "sub" / ".gitignore").write_text("!keep_pb2.py\ninner\n")
+
+    assert walked(tmp_path) == ["a.py", "sub/d.py", "sub/keep_pb2.py"]
+    # The .gitignore files above a walked directory still apply.
+    assert walked(tmp_path / "sub") == ["d.py", "keep_pb2.py"]
+    assert [entry.name for entry in walk.walk(str(tmp_path), filters.PathFilter([".py"]), use_gitignore=False)] == ["a.py", "b.py", "c_pb2.py", "d.py", "keep_pb2.py", "e.py"]
+
+
+def test_walk_skips_symlinked_dirs(tmp_path):
+    make_tree(tmp_path, ["real/a.py"])
+    os.symlink(str(tmp_path / "real"), str(tmp_path / "link"))
+    assert walked(tmp_path) == ["real/a.py"]
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_check_all_directory(mocker, tmp_path, jobs):
+    make_tree(tmp_path, ["a.py", "sub/b.py", "node_modules/c.py"])
+    (tmp_path / "sub" / "stale.py").write_text("# Copyright (c) 2017 Megh Computing, Inc.\n")
+    spy = mocker.spy(copyrighter, "check_notice")
+
+    assert copyrighter.check_all(None, [str(tmp_path)], autofix=False, jobs=jobs) is False
+    if jobs == 1:
+        assert [os.path.basename(call.args[0]) for call in spy.call_args_list] == ["a.py", "b.py", "stale.py"]
+        # The walker's stat is passed along, so the file is not stat'ed again.
+        assert all(call.args[2] is not None for call in spy.call_args_list)